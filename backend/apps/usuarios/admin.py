@@ -1,7 +1,12 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 from django.contrib.auth.models import User
-from .models import Usuario
+from django.db import connections
+from django.utils.text import smart_split, unescape_string_literal
+
+from core.paginacao.estimada import PaginadorContagemEstimada
+from .managers import TextoBuscaUsuario
+from .models import Usuario, EmailOutbox
 
 
 # Desregistra o admin padrão do User
@@ -21,6 +26,34 @@ class UsuarioAdmin(UserAdmin):
     search_fields = ('email', 'first_name', 'last_name', 'username')
     ordering = ('email',)
 
+    # Sem o COUNT(*) da tabela inteira e com total estimado nas listagens grandes
+    show_full_result_count = False
+    paginator = PaginadorContagemEstimada
+
+    def get_search_results(self, request, queryset, search_term):
+        """
+        No PostgreSQL cada termo vira um único LIKE '%TERMO%' sobre a expressão
+        do índice trigram (todos os termos devem aparecer, como na busca padrão).
+        Nos demais bancos (SQLite de desenvolvimento) usa a busca padrão do admin.
+        """
+        if connections[queryset.db].vendor != 'postgresql':
+            return super().get_search_results(request, queryset, search_term)
+
+        termos = []
+        for termo in smart_split(search_term):
+            if termo.startswith(('"', "'")) and termo[0] == termo[-1]:
+                termo = unescape_string_literal(termo)
+            if termo:
+                termos.append(termo.upper())
+
+        if not termos:
+            return queryset, False
+
+        queryset = queryset.alias(texto_busca=TextoBuscaUsuario())
+        for termo in termos:
+            queryset = queryset.filter(texto_busca__contains=termo)
+        return queryset, False
+
     # Destaca o email como campo principal
     def get_fieldsets(self, request, obj=None):
         fieldsets = super().get_fieldsets(request, obj)
@@ -52,3 +85,16 @@ class UsuarioAdmin(UserAdmin):
             if not obj.email:
                 raise ValueError("Email é obrigatório para novos usuários")
         super().save_model(request, obj, form, change)
+
+
+@admin.register(EmailOutbox)
+class EmailOutboxAdmin(admin.ModelAdmin):
+    """
+    Acompanhamento da outbox de emails transacionais.
+    O corpo fica fora do admin: pode conter links de reset de senha.
+    """
+    list_display = ('assunto', 'status', 'tentativas',
+                    'proxima_tentativa', 'criado_em', 'enviado_em')
+    list_filter = ('status',)
+    exclude = ('corpo',)
+    readonly_fields = ('criado_em', 'enviado_em', 'ultimo_erro')
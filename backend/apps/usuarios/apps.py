@@ -5,3 +5,7 @@ class UsuariosConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.usuarios'
     verbose_name = 'Usuários'
+
+    def ready(self):
+        # Registra os signals de invalidação do cache de usuários
+        from . import signals  # noqa: F401
@@ -0,0 +1,122 @@
+"""
+Classes de autenticação DRF com cache de usuário
+"""
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from dj_rest_auth.app_settings import api_settings as rest_auth_settings
+from dj_rest_auth.jwt_auth import JWTCookieAuthentication
+from rest_framework import exceptions
+from rest_framework.authentication import (
+    BaseAuthentication,
+    SessionAuthentication,
+    TokenAuthentication,
+    get_authorization_header,
+)
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from core.metricas.registro import Contador
+from core.perfil.tempos import medir
+from core.tenancy.context import set_current_user
+from ..services.cache_usuario_service import obter_snapshot
+
+AUTENTICACOES = Contador(
+    'auth_requests_total',
+    'Autenticações por método (jwt, jwt_cookie, token, sessao, anonimo) e resultado',
+    rotulos=('metodo', 'resultado'),
+)
+
+
+class SnapshotUsuarioMixin:
+    """
+    Resolve o usuário do token pelo snapshot em cache em vez de um SELECT por requisição.
+    request.user é um User de verdade (permissões, set_password, serializers de model),
+    montado a cada requisição a partir dos valores em cache.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        snapshot = obter_snapshot(user_id)
+        if snapshot is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        if not snapshot.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        return snapshot.para_usuario()
+
+
+class CachedJWTAuthentication(SnapshotUsuarioMixin, JWTAuthentication):
+    """JWTAuthentication (header Authorization) com cache de usuário"""
+
+
+class CachedJWTCookieAuthentication(SnapshotUsuarioMixin, JWTCookieAuthentication):
+    """JWTCookieAuthentication (cookie auth-token) com cache de usuário"""
+
+
+class DispatchAuthentication(BaseAuthentication):
+    """
+    Escolhe o autenticador pela credencial presente na requisição em vez de
+    tentar JWT, cookie JWT, sessão e token em sequência.
+
+    Ordem de precedência (a mesma da lista anterior de classes):
+    header Authorization (Bearer/Token) > cookie auth-token > cookie de sessão.
+    O JWT é decodificado no máximo uma vez por requisição.
+    """
+
+    def __init__(self):
+        self.jwt = CachedJWTAuthentication()
+        self.jwt_cookie = CachedJWTCookieAuthentication()
+        self.session = SessionAuthentication()
+        self.token = TokenAuthentication()
+        self.esquemas_jwt = {
+            tipo.lower().encode() for tipo in api_settings.AUTH_HEADER_TYPES
+        }
+        self.esquema_token = self.token.keyword.lower().encode()
+
+    def authenticate(self, request):
+        metodo, autenticador = self._escolher(request)
+        if autenticador is None:
+            AUTENTICACOES.incrementar(metodo=metodo, resultado='anonimo')
+            return None
+
+        try:
+            with medir('auth'):
+                resultado = autenticador.authenticate(request)
+        except exceptions.APIException:
+            AUTENTICACOES.incrementar(metodo=metodo, resultado='falha')
+            raise
+
+        if resultado is None:
+            AUTENTICACOES.incrementar(metodo=metodo, resultado='anonimo')
+            return None
+
+        AUTENTICACOES.incrementar(metodo=metodo, resultado='sucesso')
+        # Disponibiliza o usuário para logs e serviços via core.tenancy.context
+        set_current_user(resultado[0])
+        return resultado
+
+    def _escolher(self, request):
+        """Retorna (método, autenticador) pela credencial presente na requisição"""
+        partes = get_authorization_header(request).split(None, 1)
+        if partes:
+            esquema = partes[0].lower()
+            if esquema in self.esquemas_jwt:
+                return 'jwt', self.jwt
+            if esquema == self.esquema_token:
+                return 'token', self.token
+        elif rest_auth_settings.JWT_AUTH_COOKIE in request.COOKIES:
+            return 'jwt_cookie', self.jwt_cookie
+
+        if settings.SESSION_COOKIE_NAME in request.COOKIES:
+            return 'sessao', self.session
+
+        return 'anonimo', None
+
+    def authenticate_header(self, request):
+        return self.jwt.authenticate_header(request)
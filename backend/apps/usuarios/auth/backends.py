@@ -3,24 +3,64 @@ Backends de autenticação personalizados
 """
 from django.contrib.auth.backends import ModelBackend
 from django.contrib.auth.models import User
+from django.db.models import Q
+
+from ..managers import EmailNormalizado, filtrar_por_email
+from ..services.senha_service import definir_senha, verificar_senha
 
 
 class EmailBackend(ModelBackend):
     """
     Backend de autenticação personalizado que permite login com email.
+
+    Resolve e verifica o usuário a partir de uma única linha buscada no banco
+    (um SELECT por tentativa), aceitando tanto `email=` quanto `username=`.
+    O email é comparado sem diferenciar maiúsculas, pelo índice funcional
+    usuarios_user_email_ci_uniq. A verificação da senha roda no pool limitado
+    de apps.usuarios.services.senha_service.
     """
 
-    def authenticate(self, request, username=None, password=None, **kwargs):
-        try:
-            # Tenta encontrar o usuário pelo email
-            user = User.objects.get(email=username)
-        except User.DoesNotExist:
-            # Se não encontrar pelo email, tenta pelo username
-            try:
-                user = User.objects.get(username=username)
-            except User.DoesNotExist:
-                return None
-
-        if user.check_password(password) and self.user_can_authenticate(user):
+    def authenticate(self, request, username=None, password=None, email=None, **kwargs):
+        if username is None and email is None:
+            username = kwargs.get(User.USERNAME_FIELD)
+        if password is None or (username is None and email is None):
+            return None
+
+        user = self._buscar_usuario(email=email, username=username)
+
+        if user is None:
+            # Executa o hasher padrão uma vez para reduzir a diferença de tempo
+            # entre usuário existente e inexistente (Django #20760)
+            definir_senha(User(), password)
+            return None
+
+        # Hashing no pool limitado (senha_service): saturado, levanta PoolSenhaSaturadoErro (503)
+        if verificar_senha(user, password) and self.user_can_authenticate(user):
             return user
         return None
+
+    def _consulta_email(self, email):
+        return filtrar_por_email(User._default_manager.all(), email)
+
+    def _consulta_generica(self, identificador):
+        """Email (pelo índice funcional) ou username, no máximo duas linhas"""
+        return User._default_manager.alias(
+            email_normalizado=EmailNormalizado('email')
+        ).filter(
+            Q(email_normalizado=identificador.lower()) | Q(username=identificador)
+        ).order_by('pk')[:2]
+
+    def _escolher_candidato(self, candidatos, identificador):
+        """Prioriza o match por email sobre o match por username"""
+        for candidato in candidatos:
+            if candidato.email.lower() == identificador.lower():
+                return candidato
+        return candidatos[0] if candidatos else None
+
+    def _buscar_usuario(self, email=None, username=None):
+        """Busca o usuário em uma única consulta, priorizando o match por email"""
+        if email is not None:
+            return self._consulta_email(email).first()
+
+        # Identificador genérico: pode ser email ou username
+        return self._escolher_candidato(list(self._consulta_generica(username)), username)
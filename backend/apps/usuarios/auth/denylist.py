@@ -0,0 +1,227 @@
+"""
+Denylist de refresh tokens por jti
+Armazena revogações no cache (TTL = vida restante do token) com um filtro de
+Bloom em memória na frente, para que a verificação "não revogado" não custe
+ida à rede.
+
+Sincronização entre processos:
+- cada revogação recebe um número de sequência (`denylist:seq`) e grava uma
+  entrada de log `denylist:log:<seq>` com o mesmo TTL do token;
+- cada processo reaplica o log no seu filtro local no máximo a cada
+  SINCRONIZACAO_SEGUNDOS (uma leitura de `denylist:seq` quando nada mudou);
+- o seq é publicado antes da entrada de log existir: uma entrada ausente é
+  tentada de novo nas sincronizações seguintes por PRAZO_ENTRADA_AUSENTE
+  segundos antes de ser tratada como expirada;
+- o comando `limpar_denylist_tokens` compacta o log em um snapshot do filtro,
+  usado por processos novos em vez de reaplicar o log inteiro.
+"""
+
+import hashlib
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+CHAVE_JTI = 'denylist:jti:{}'
+CHAVE_LOG = 'denylist:log:{}'
+CHAVE_SEQ = 'denylist:seq'
+CHAVE_SEQ_MINIMO = 'denylist:seq_minimo'
+CHAVE_SNAPSHOT = 'denylist:snapshot'
+
+TAMANHO_LOTE = 1000
+
+_CONFIGURACAO_PADRAO = {
+    'CAPACIDADE': 1_000_000,
+    'TAXA_FALSO_POSITIVO': 0.001,
+    'SINCRONIZACAO_SEGUNDOS': 5,
+    # Bem maior que o intervalo entre o incr do seq e a gravação da entrada de log
+    'PRAZO_ENTRADA_AUSENTE': 60,
+    'CACHE_ALIAS': 'default',
+}
+
+
+class FiltroBloom:
+    """Filtro de Bloom simples sobre bytearray (double hashing com blake2b)"""
+
+    __slots__ = ('bits', 'num_bits', 'num_hashes')
+
+    def __init__(self, capacidade: int, taxa_falso_positivo: float, bits: bytes = None):
+        self.num_bits = max(8, int(-capacidade * math.log(taxa_falso_positivo) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacidade * math.log(2)))
+        tamanho = (self.num_bits + 7) // 8
+        self.bits = bytearray(bits) if bits is not None and len(bits) == tamanho else bytearray(tamanho)
+
+    def _posicoes(self, chave: str):
+        digest = hashlib.blake2b(chave.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def adicionar(self, chave: str):
+        for posicao in self._posicoes(chave):
+            self.bits[posicao >> 3] |= 1 << (posicao & 7)
+
+    def __contains__(self, chave: str) -> bool:
+        bits = self.bits
+        for posicao in self._posicoes(chave):
+            if not bits[posicao >> 3] & (1 << (posicao & 7)):
+                return False
+        return True
+
+
+class DenylistTokens:
+    """Store de revogação de refresh tokens (cache + filtro de Bloom local)"""
+
+    def __init__(self, configuracao: dict = None):
+        self.configuracao = dict(_CONFIGURACAO_PADRAO)
+        self.configuracao.update(configuracao or {})
+        self._lock = threading.Lock()
+        self._filtro = self._novo_filtro()
+        self._seq_visto = None  # None = ainda não inicializado
+        self._ausentes = {}  # seq -> instante (monotonic) em que deixa de ser tentado
+        self._proxima_sincronizacao = 0.0
+
+    @property
+    def cache(self):
+        return caches[self.configuracao['CACHE_ALIAS']]
+
+    def _novo_filtro(self, bits: bytes = None) -> FiltroBloom:
+        return FiltroBloom(
+            self.configuracao['CAPACIDADE'],
+            self.configuracao['TAXA_FALSO_POSITIVO'],
+            bits,
+        )
+
+    def revogar(self, jti: str, exp: int):
+        """Revoga o token até a sua expiração"""
+        ttl = int(exp - time.time())
+        if ttl <= 0:
+            return  # Token já expirado, nada a revogar
+
+        cache = self.cache
+        cache.set(CHAVE_JTI.format(jti), 1, ttl)
+
+        cache.add(CHAVE_SEQ, 0, None)
+        seq = cache.incr(CHAVE_SEQ)
+        cache.set(CHAVE_LOG.format(seq), jti, ttl)
+
+        with self._lock:
+            self._filtro.adicionar(jti)
+
+    def esta_revogado(self, jti: str) -> bool:
+        """Verifica a revogação; só consulta o cache se o filtro indicar possível match"""
+        self._sincronizar_se_necessario()
+        if jti not in self._filtro:
+            return False
+        return self.cache.get(CHAVE_JTI.format(jti)) is not None
+
+    def _sincronizar_se_necessario(self):
+        agora = time.monotonic()
+        if agora < self._proxima_sincronizacao:
+            return
+        with self._lock:
+            if agora < self._proxima_sincronizacao:
+                return
+            self._sincronizar()
+            self._proxima_sincronizacao = agora + self.configuracao['SINCRONIZACAO_SEGUNDOS']
+
+    def _sincronizar(self):
+        """Reaplica no filtro local as revogações feitas por outros processos"""
+        cache = self.cache
+        agora = time.monotonic()
+
+        if self._seq_visto is None:
+            snapshot = cache.get(CHAVE_SNAPSHOT)
+            if snapshot is not None:
+                # Snapshots antigos não tinham a lista de ausentes
+                seq_snapshot, bits, *ausentes = snapshot
+                self._filtro = self._novo_filtro(bits)
+                self._seq_visto = seq_snapshot
+                prazo = agora + self.configuracao['PRAZO_ENTRADA_AUSENTE']
+                for seq in (ausentes[0] if ausentes else ()):
+                    self._ausentes[seq] = prazo
+            else:
+                self._seq_visto = cache.get(CHAVE_SEQ_MINIMO, 0)
+
+        seq_atual = cache.get(CHAVE_SEQ, 0)
+        seqs = list(self._ausentes) + list(range(self._seq_visto + 1, seq_atual + 1))
+        for inicio in range(0, len(seqs), TAMANHO_LOTE):
+            lote = seqs[inicio:inicio + TAMANHO_LOTE]
+            entradas = cache.get_many([CHAVE_LOG.format(seq) for seq in lote])
+            for seq in lote:
+                jti = entradas.get(CHAVE_LOG.format(seq))
+                if jti is not None:
+                    self._filtro.adicionar(jti)
+                    self._ausentes.pop(seq, None)
+                elif seq not in self._ausentes:
+                    # Expirada junto com o token ou ainda não gravada por quem revogou
+                    self._ausentes[seq] = agora + self.configuracao['PRAZO_ENTRADA_AUSENTE']
+                elif self._ausentes[seq] <= agora:
+                    del self._ausentes[seq]
+        self._seq_visto = max(self._seq_visto, seq_atual)
+
+    def compactar(self) -> dict:
+        """
+        Reconstrói o filtro apenas com revogações ainda válidas, publica o
+        snapshot para novos processos e avança o início do log.
+        """
+        cache = self.cache
+        seq_minimo = cache.get(CHAVE_SEQ_MINIMO, 0)
+        seq_atual = cache.get(CHAVE_SEQ, 0)
+
+        filtro = self._novo_filtro()
+        ativos = 0
+        primeiro_ativo = None
+        # Ausências no fim do log podem ser revogações ainda sendo gravadas
+        ausentes = []
+        for inicio in range(seq_minimo + 1, seq_atual + 1, TAMANHO_LOTE):
+            fim = min(inicio + TAMANHO_LOTE, seq_atual + 1)
+            chaves = {CHAVE_LOG.format(seq): seq for seq in range(inicio, fim)}
+            entradas = cache.get_many(list(chaves))
+            for chave, seq in chaves.items():
+                jti = entradas.get(chave)
+                if jti is not None:
+                    filtro.adicionar(jti)
+                    ativos += 1
+                    if primeiro_ativo is None:
+                        primeiro_ativo = seq
+                elif seq > seq_atual - TAMANHO_LOTE:
+                    ausentes.append(seq)
+
+        limites = [seq - 1 for seq in (primeiro_ativo, ausentes[0] if ausentes else None) if seq is not None]
+        novo_minimo = min(limites) if limites else seq_atual
+        cache.set(CHAVE_SNAPSHOT, (seq_atual, bytes(filtro.bits), ausentes), None)
+        cache.set(CHAVE_SEQ_MINIMO, novo_minimo, None)
+
+        with self._lock:
+            prazo = time.monotonic() + self.configuracao['PRAZO_ENTRADA_AUSENTE']
+            for seq in ausentes:
+                self._ausentes.setdefault(seq, prazo)
+            self._filtro = filtro
+            self._seq_visto = seq_atual
+
+        return {
+            'revogacoes_ativas': ativos,
+            'entradas_descartadas': (seq_atual - seq_minimo) - ativos,
+            'seq_atual': seq_atual,
+            'seq_minimo': novo_minimo,
+            'entradas_ausentes_recentes': len(ausentes),
+            'tamanho_filtro_bytes': len(filtro.bits),
+        }
+
+
+_denylist = None
+_denylist_lock = threading.Lock()
+
+
+def obter_denylist() -> DenylistTokens:
+    """Instância única por processo, configurada por TOKEN_DENYLIST"""
+    global _denylist
+    if _denylist is None:
+        with _denylist_lock:
+            if _denylist is None:
+                _denylist = DenylistTokens(getattr(settings, 'TOKEN_DENYLIST', {}))
+    return _denylist
@@ -0,0 +1,28 @@
+"""
+Tokens JWT com suporte à denylist de refresh tokens
+"""
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .denylist import obter_denylist
+
+
+class DenylistRefreshToken(RefreshToken):
+    """
+    RefreshToken que consulta e alimenta a denylist em cache, substituindo o
+    app token_blacklist (uma linha por token, sem limpeza automática).
+    """
+
+    def verify(self, *args, **kwargs):
+        super().verify(*args, **kwargs)
+        if obter_denylist().esta_revogado(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_("Token is blacklisted"))
+
+    def blacklist(self):
+        """Revoga o token até a sua expiração (chamado na rotação e no logout)"""
+        obter_denylist().revogar(
+            self.payload[api_settings.JTI_CLAIM],
+            self.payload['exp'],
+        )
@@ -1,42 +1,158 @@
-from django.core.management.base import BaseCommand
+import json
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
 from django.contrib.auth import get_user_model
-from django.db import transaction
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+
+from apps.usuarios.services.cache_usuario_service import invalidar_snapshots
+from apps.usuarios.services.username_service import base_username, gerar_username_unico
+
+CAMPOS = ['email', 'username']
 
 
 class Command(BaseCommand):
-    help = 'Atualiza usuários existentes para o novo modelo de usuário customizado'
+    help = (
+        'Atualiza usuários existentes para o novo modelo de usuário customizado, '
+        'em lotes por chave primária e com checkpoint para retomada'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000,
+                            help='Quantidade de usuários lidos por lote (padrão: 1000)')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Mostra o que seria alterado sem gravar nada')
+        parser.add_argument('--checkpoint', default='.atualizar_usuarios.checkpoint',
+                            help='Arquivo com o último id processado, usado para retomar')
+        parser.add_argument('--reiniciar', action='store_true',
+                            help='Ignora o checkpoint existente e começa do início')
 
     def handle(self, *args, **options):
-        User = get_user_model()
-
-        with transaction.atomic():
-            # Atualiza usuários que não possuem email definido ou têm username vazio
-            usuarios_atualizados = 0
-
-            for user in User.objects.all():
-                precisa_atualizar = False
-
-                # Se não tem email, usa o username como email (para casos de teste)
-                if not user.email and user.username:
-                    user.email = f"{user.username}@exemplo.com"
-                    precisa_atualizar = True
-
-                # Se username está vazio, pode deixar como null
-                if user.username == '':
-                    user.username = None
-                    precisa_atualizar = True
-
-                if precisa_atualizar:
-                    user.save()
-                    usuarios_atualizados += 1
-                    self.stdout.write(
-                        self.style.SUCCESS(
-                            f'Usuário {user.email} atualizado'
-                        )
-                    )
-
-            self.stdout.write(
-                self.style.SUCCESS(
-                    f'Migração concluída! {usuarios_atualizados} usuários atualizados.'
+        self.User = get_user_model()
+        chunk_size = options['chunk_size']
+        dry_run = options['dry_run']
+        checkpoint = options['checkpoint']
+
+        if chunk_size < 1:
+            raise CommandError('--chunk-size deve ser maior que zero')
+
+        estado = {'ultimo_pk': 0, 'processados': 0, 'atualizados': 0, 'falhas': 0}
+        if not options['reiniciar']:
+            estado.update(self._ler_checkpoint(checkpoint))
+            if estado['ultimo_pk']:
+                self.stdout.write(f"Retomando a partir do id {estado['ultimo_pk']}")
+
+        # Só lê as linhas que precisam de ajuste; o índice da PK mantém cada lote barato
+        pendentes = self.User._default_manager.filter(
+            (Q(email='') & ~Q(username='')) | Q(username='')
+        ).only('pk', *CAMPOS).order_by('pk')
+
+        inicio = time.monotonic()
+        try:
+            while True:
+                lote = list(pendentes.filter(pk__gt=estado['ultimo_pk'])[:chunk_size])
+                if not lote:
+                    break
+
+                reservados = set()
+                alterados = [user for user in lote if self._ajustar(user, reservados)]
+                if dry_run:
+                    for user in alterados:
+                        self.stdout.write(f'[dry-run] Usuário {user.pk}: {user.username} <{user.email}>')
+                    atualizados, falhas = len(alterados), 0
+                else:
+                    atualizados, falhas = self._gravar(alterados)
+
+                estado['ultimo_pk'] = lote[-1].pk
+                estado['processados'] += len(lote)
+                estado['atualizados'] += atualizados
+                estado['falhas'] += falhas
+                if not dry_run:
+                    self._salvar_checkpoint(checkpoint, estado)
+
+                decorrido = time.monotonic() - inicio
+                self.stdout.write(
+                    f"Lote até id {estado['ultimo_pk']}: {estado['processados']} processados, "
+                    f"{estado['atualizados']} atualizados, {estado['falhas']} falhas "
+                    f"({estado['processados'] / decorrido if decorrido else 0:.0f} usuários/s)"
                 )
+
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING(
+                f"Interrompido no id {estado['ultimo_pk']}; execute novamente para retomar"))
+            return
+
+        if not dry_run and os.path.exists(checkpoint):
+            os.remove(checkpoint)
+
+        prefixo = '[dry-run] ' if dry_run else ''
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{prefixo}Migração concluída! {estado['atualizados']} usuários atualizados, "
+                f"{estado['falhas']} falhas em {time.monotonic() - inicio:.1f}s."
             )
+        )
+
+    def _ajustar(self, user, reservados) -> bool:
+        """Aplica as correções em memória e indica se o usuário mudou"""
+        precisa_atualizar = False
+
+        # Se não tem email, usa o username como email (para casos de teste)
+        if not user.email and user.username:
+            user.email = f"{user.username}@exemplo.com"
+            precisa_atualizar = True
+
+        # Username vazio recebe um username único derivado do email
+        # (auth_user.username é NOT NULL, então None não é uma opção)
+        if user.username == '' and user.email:
+            user.username = gerar_username_unico(
+                base_username(user.email), exclude_pk=user.pk, reservados=reservados)
+            reservados.add(user.username)
+            precisa_atualizar = True
+
+        return precisa_atualizar
+
+    def _gravar(self, alterados):
+        """
+        Grava o lote em uma transação curta com bulk_update. Se alguma linha
+        violar uma constraint, regrava linha a linha para isolar as falhas.
+        """
+        if not alterados:
+            return 0, 0
+
+        try:
+            with transaction.atomic():
+                self.User._default_manager.bulk_update(alterados, CAMPOS)
+            gravados = alterados
+        except IntegrityError:
+            gravados = []
+            for user in alterados:
+                try:
+                    with transaction.atomic():
+                        self.User._default_manager.filter(pk=user.pk).update(
+                            email=user.email, username=user.username)
+                    gravados.append(user)
+                except IntegrityError as exc:
+                    self.stderr.write(self.style.ERROR(f'Usuário {user.pk} não atualizado: {exc}'))
+
+        # bulk_update não dispara post_save
+        invalidar_snapshots(user.pk for user in gravados)
+        return len(gravados), len(alterados) - len(gravados)
+
+    def _ler_checkpoint(self, caminho) -> dict:
+        if not os.path.exists(caminho):
+            return {}
+        try:
+            with open(caminho, encoding='utf-8') as arquivo:
+                return json.load(arquivo)
+        except (OSError, ValueError) as exc:
+            raise CommandError(f'Checkpoint inválido em {caminho}: {exc}')
+
+    def _salvar_checkpoint(self, caminho, estado):
+        # Grava em arquivo temporário e renomeia para não corromper em caso de queda
+        temporario = f'{caminho}.tmp'
+        with open(temporario, 'w', encoding='utf-8') as arquivo:
+            json.dump(estado, arquivo)
+        os.replace(temporario, caminho)
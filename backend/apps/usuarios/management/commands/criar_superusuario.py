@@ -1,5 +1,7 @@
 from django.core.management.base import BaseCommand
 from django.contrib.auth import get_user_model
+
+from apps.usuarios.managers import filtrar_por_email
 from django.core.management.utils import get_random_secret_key
 import getpass
 
@@ -23,7 +25,7 @@ class Command(BaseCommand):
             email = input('Email: ')
 
         # Verifica se usuário já existe
-        if User.objects.filter(email=email).exists():
+        if filtrar_por_email(User.objects.all(), email).exists():
             self.stdout.write(
                 self.style.ERROR(f'Usuário com email {email} já existe!')
             )
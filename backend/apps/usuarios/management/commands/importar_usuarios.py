@@ -0,0 +1,228 @@
+import csv
+import itertools
+import json
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
+
+from apps.usuarios.managers import EmailNormalizado, violacao_email_unico
+from apps.usuarios.services.senha_service import criar_pool_processos
+from apps.usuarios.services.username_service import (
+    MAX_TENTATIVAS,
+    AlocadorUsernames,
+    base_username,
+    colisao_username,
+)
+
+CAMPOS = ('email', 'first_name', 'last_name', 'password')
+# Mantém o IN abaixo do limite de 999 parâmetros do SQLite, qualquer que seja o --lote
+EMAILS_POR_CONSULTA = 500
+
+
+class Command(BaseCommand):
+    help = (
+        'Importa usuários em massa de um arquivo CSV ou JSONL '
+        '(colunas: email, first_name, last_name, password)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('arquivo', help='Caminho do arquivo .csv ou .jsonl')
+        parser.add_argument('--formato', choices=['csv', 'jsonl'],
+                            help='Formato do arquivo (padrão: pela extensão)')
+        parser.add_argument('--lote', type=int, default=500,
+                            help='Usuários por INSERT em lote (padrão: 500)')
+        parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                            help='Processos para o hashing das senhas (padrão: número de CPUs)')
+        parser.add_argument('--relatorio', default='importacao_usuarios_erros.jsonl',
+                            help='Arquivo JSONL com as linhas rejeitadas')
+
+    def handle(self, *args, **options):
+        self.User = get_user_model()
+        caminho = options['arquivo']
+        formato = options['formato'] or os.path.splitext(caminho)[1].lstrip('.').lower()
+        if formato not in ('csv', 'jsonl'):
+            raise CommandError('Formato não reconhecido; use --formato csv ou jsonl')
+        if options['lote'] < 1:
+            raise CommandError('--lote deve ser maior que zero')
+        if not os.path.exists(caminho):
+            raise CommandError(f'Arquivo não encontrado: {caminho}')
+
+        self.alocador = AlocadorUsernames()
+        self.emails_vistos = set()
+        self.erros = []
+        totais = {'lidos': 0, 'criados': 0, 'rejeitados': 0}
+        tempos = {'hash': 0.0, 'insert': 0.0}
+
+        inicio = time.monotonic()
+        with open(caminho, encoding='utf-8', newline='') as arquivo, \
+                criar_pool_processos(options['workers']) as pool:
+            registros = self._ler_csv(arquivo) if formato == 'csv' else self._ler_jsonl(arquivo)
+
+            while True:
+                lote = list(itertools.islice(registros, options['lote']))
+                if not lote:
+                    break
+                totais['lidos'] += len(lote)
+
+                validos = self._validar(lote)
+
+                marca = time.monotonic()
+                senhas = [registro['password'] or None for _, registro in validos]
+                hashes = pool.map(make_password, senhas, chunksize=self._chunksize(len(senhas), options['workers']))
+                usuarios = [
+                    (linha, self._montar_usuario(registro, senha))
+                    for (linha, registro), senha in zip(validos, hashes)
+                ]
+                tempos['hash'] += time.monotonic() - marca
+
+                marca = time.monotonic()
+                totais['criados'] += self._inserir(usuarios)
+                tempos['insert'] += time.monotonic() - marca
+
+                decorrido = time.monotonic() - inicio
+                self.stdout.write(
+                    f"{totais['lidos']} lidos, {totais['criados']} criados, "
+                    f"{len(self.erros)} rejeitados ({totais['criados'] / decorrido:.0f} usuários/s)"
+                )
+
+        totais['rejeitados'] = len(self.erros)
+        if self.erros:
+            with open(options['relatorio'], 'w', encoding='utf-8') as relatorio:
+                for erro in self.erros:
+                    relatorio.write(json.dumps(erro, ensure_ascii=False) + '\n')
+            self.stdout.write(self.style.WARNING(
+                f"{totais['rejeitados']} linhas rejeitadas; detalhes em {options['relatorio']}"))
+
+        decorrido = time.monotonic() - inicio
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Importação concluída! {totais['criados']} usuários criados em {decorrido:.1f}s "
+                f"({totais['criados'] / decorrido if decorrido else 0:.0f} usuários/s; "
+                f"hashing {tempos['hash']:.1f}s, inserts {tempos['insert']:.1f}s)."
+            )
+        )
+
+    def _chunksize(self, total, workers):
+        """Divide o lote entre os processos, reduzindo o IPC por senha"""
+        return max(1, total // ((workers or 1) * 4))
+
+    def _ler_csv(self, arquivo):
+        """Gera (número da linha, registro) sem carregar o arquivo inteiro"""
+        for linha, registro in enumerate(csv.DictReader(arquivo), start=2):
+            yield linha, registro
+
+    def _ler_jsonl(self, arquivo):
+        for linha, conteudo in enumerate(arquivo, start=1):
+            if not conteudo.strip():
+                continue
+            try:
+                registro = json.loads(conteudo)
+            except ValueError as exc:
+                registro = {'_erro': f'JSON inválido: {exc}'}
+            if not isinstance(registro, dict):
+                registro = {'_erro': 'Cada linha deve ser um objeto JSON'}
+            yield linha, registro
+
+    def _rejeitar(self, linha, registro, motivo):
+        self.erros.append({'linha': linha, 'email': registro.get('email'), 'erro': motivo})
+
+    def _validar(self, lote):
+        """
+        Normaliza e valida o lote. Emails repetidos no arquivo são detectados
+        em memória; os já cadastrados, com uma consulta pelo índice de email.
+        """
+        candidatos = []
+        for linha, registro in lote:
+            if '_erro' in registro:
+                self._rejeitar(linha, registro, registro['_erro'])
+                continue
+
+            registro = {campo: str(registro.get(campo) or '').strip() for campo in CAMPOS}
+            email = self.User.objects.normalize_email(registro['email'])
+            try:
+                validate_email(email)
+            except ValidationError:
+                self._rejeitar(linha, registro, 'Email inválido')
+                continue
+
+            chave = email.lower()
+            if chave in self.emails_vistos:
+                self._rejeitar(linha, registro, 'Email repetido no arquivo')
+                continue
+            self.emails_vistos.add(chave)
+            registro['email'] = email
+            candidatos.append((linha, registro))
+
+        emails = [registro['email'].lower() for _, registro in candidatos]
+        existentes = set()
+        for inicio in range(0, len(emails), EMAILS_POR_CONSULTA):
+            existentes.update(
+                self.User._default_manager.annotate(email_normalizado=EmailNormalizado('email'))
+                .filter(email_normalizado__in=emails[inicio:inicio + EMAILS_POR_CONSULTA])
+                .values_list('email_normalizado', flat=True)
+            )
+
+        validos = []
+        for linha, registro in candidatos:
+            if registro['email'].lower() in existentes:
+                self._rejeitar(linha, registro, 'Email já está em uso')
+            else:
+                validos.append((linha, registro))
+
+        self.alocador.carregar(base_username(registro['email']) for _, registro in validos)
+        return validos
+
+    def _montar_usuario(self, registro, senha):
+        return self.User(
+            username=self.alocador.alocar(base_username(registro['email'])),
+            email=registro['email'],
+            first_name=registro['first_name'][:150],
+            last_name=registro['last_name'][:150],
+            password=senha,
+        )
+
+    def _inserir(self, usuarios) -> int:
+        """
+        Um INSERT em lote por transação. Se um cadastro concorrente ocupar um
+        email ou username do lote, insere linha a linha para isolar a falha:
+        username ocupado recebe outro do alocador; email ocupado rejeita a linha.
+        """
+        if not usuarios:
+            return 0
+
+        try:
+            with transaction.atomic():
+                self.User._default_manager.bulk_create([user for _, user in usuarios])
+            return len(usuarios)
+        except IntegrityError:
+            pass
+
+        criados = 0
+        for linha, user in usuarios:
+            if self._inserir_linha(linha, user):
+                criados += 1
+        return criados
+
+    def _inserir_linha(self, linha, user) -> bool:
+        for _ in range(MAX_TENTATIVAS):
+            try:
+                with transaction.atomic():
+                    user.save(force_insert=True)
+                return True
+            except IntegrityError as exc:
+                if violacao_email_unico(exc):
+                    self._rejeitar(linha, {'email': user.email}, 'Email já está em uso')
+                    return False
+                if not colisao_username(exc):
+                    self._rejeitar(linha, {'email': user.email}, f'Conflito ao gravar: {exc}')
+                    return False
+                user.username = self.alocador.realocar(base_username(user.email))
+
+        self._rejeitar(linha, {'email': user.email}, 'Não foi possível alocar um username livre')
+        return False
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from apps.usuarios.auth.denylist import obter_denylist
+
+
+class Command(BaseCommand):
+    help = (
+        'Compacta a denylist de refresh tokens: descarta revogações expiradas, '
+        'reconstrói o filtro de Bloom e publica o snapshot para novos processos'
+    )
+
+    def handle(self, *args, **options):
+        resultado = obter_denylist().compactar()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Denylist compactada! {resultado['revogacoes_ativas']} revogações ativas, "
+                f"{resultado['entradas_descartadas']} entradas expiradas descartadas "
+                f"(filtro com {resultado['tamanho_filtro_bytes']} bytes)."
+            )
+        )
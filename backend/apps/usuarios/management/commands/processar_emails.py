@@ -0,0 +1,65 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.usuarios.services.email_service import processar_lote, purgar_finalizados
+
+# Intervalo entre limpezas da outbox no modo contínuo
+INTERVALO_PURGA_SEGUNDOS = 3600
+
+
+class Command(BaseCommand):
+    help = (
+        'Envia os emails da outbox em lotes, reutilizando uma conexão SMTP por lote, '
+        'e remove os emails finalizados além do período de retenção'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=50,
+                            help='Quantidade de emails por lote (padrão: 50)')
+        parser.add_argument('--max-tentativas', type=int, default=5,
+                            help='Tentativas antes de marcar o email como falho (padrão: 5)')
+        parser.add_argument('--continuo', action='store_true',
+                            help='Mantém o worker rodando, aguardando novos emails')
+        parser.add_argument('--intervalo', type=float, default=5,
+                            help='Segundos de espera quando a fila está vazia (modo contínuo)')
+        parser.add_argument('--retencao-dias', type=int, default=None,
+                            help='Dias que emails enviados/falhos ficam na outbox '
+                                 '(padrão: EMAIL_OUTBOX_RETENCAO_DIAS)')
+
+    def handle(self, *args, **options):
+        total = {'enviados': 0, 'reagendados': 0, 'falhas': 0, 'removidos': 0}
+        proxima_purga = 0.0
+
+        try:
+            while True:
+                if time.monotonic() >= proxima_purga:
+                    total['removidos'] += purgar_finalizados(options['retencao_dias'])
+                    proxima_purga = time.monotonic() + INTERVALO_PURGA_SEGUNDOS
+
+                resultado = processar_lote(options['lote'], options['max_tentativas'])
+                for chave, valor in resultado.items():
+                    total[chave] += valor
+
+                if any(resultado.values()):
+                    self.stdout.write(
+                        f"Lote processado: {resultado['enviados']} enviados, "
+                        f"{resultado['reagendados']} reagendados, {resultado['falhas']} falhas"
+                    )
+                    continue
+
+                # Fila vazia
+                if not options['continuo']:
+                    break
+                time.sleep(options['intervalo'])
+
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING('Worker interrompido'))
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Outbox processada! {total['enviados']} enviados, "
+                f"{total['reagendados']} reagendados, {total['falhas']} falhas, "
+                f"{total['removidos']} removidos pela retenção."
+            )
+        )
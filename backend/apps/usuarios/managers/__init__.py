@@ -1,8 +1,20 @@
 """
 Managers do app usuarios
 """
-from .usuario_manager import UsuarioManager
+from .usuario_manager import (
+    UsuarioManager,
+    INDICE_EMAIL_UNICO,
+    EmailNormalizado,
+    TextoBuscaUsuario,
+    filtrar_por_email,
+    violacao_email_unico,
+)
 
 __all__ = [
     'UsuarioManager',
+    'INDICE_EMAIL_UNICO',
+    'EmailNormalizado',
+    'TextoBuscaUsuario',
+    'filtrar_por_email',
+    'violacao_email_unico',
 ]
@@ -1,4 +1,6 @@
 from django.contrib.auth.models import BaseUserManager
+from django.db import IntegrityError
+from django.db.models import CharField, Func
 
 
 class UsuarioManager(BaseUserManager):
@@ -32,3 +34,42 @@ class UsuarioManager(BaseUserManager):
             raise ValueError('Superusuário deve ter is_superuser=True.')
 
         return self.create_user(email, password, **extra_fields)
+
+
+# Índice único criado pela migração 0004_email_case_insensitive_index
+INDICE_EMAIL_UNICO = 'usuarios_user_email_ci_uniq'
+
+
+class EmailNormalizado(Func):
+    """
+    NULLIF(LOWER(email), '') — a mesma expressão do índice único
+    usuarios_user_email_ci_uniq (migração 0004). O template não usa parâmetros
+    para que o SQL gerado seja idêntico ao do índice também no SQLite.
+    """
+    template = "NULLIF(LOWER(%(expressions)s), '')"
+    output_field = CharField()
+
+
+class TextoBuscaUsuario(Func):
+    """
+    UPPER(email || ' ' || first_name || ' ' || last_name || ' ' || username) —
+    a mesma expressão do índice trigram usuarios_user_busca_trgm_idx (migração 0006).
+    """
+    template = 'UPPER(%(expressions)s)'
+    arg_joiner = " || ' ' || "
+    output_field = CharField()
+
+    def __init__(self, **extra):
+        super().__init__('email', 'first_name', 'last_name', 'username', **extra)
+
+
+def filtrar_por_email(queryset, email: str):
+    """Filtra usuários por email sem diferenciar maiúsculas, usando o índice funcional"""
+    return queryset.alias(
+        email_normalizado=EmailNormalizado('email')
+    ).filter(email_normalizado=email.lower())
+
+
+def violacao_email_unico(exc: IntegrityError) -> bool:
+    """Identifica violação do índice único de email (Postgres e SQLite)"""
+    return INDICE_EMAIL_UNICO in str(exc).lower()
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.5 on 2026-10-18 11:47
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('usuarios', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmailOutbox',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('assunto', models.CharField(max_length=255)),
+                ('corpo', models.TextField()),
+                ('remetente', models.CharField(max_length=254)),
+                ('destinatarios', models.JSONField(default=list)),
+                ('status', models.CharField(choices=[('pendente', 'Pendente'), ('enviado', 'Enviado'), ('falhou', 'Falhou')], default='pendente', max_length=10)),
+                ('tentativas', models.PositiveSmallIntegerField(default=0)),
+                ('proxima_tentativa', models.DateTimeField(default=django.utils.timezone.now)),
+                ('ultimo_erro', models.TextField(blank=True)),
+                ('criado_em', models.DateTimeField(auto_now_add=True)),
+                ('enviado_em', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Email na fila',
+                'verbose_name_plural': 'Emails na fila',
+                'db_table': 'usuarios_email_outbox',
+                'ordering': ('proxima_tentativa', 'id'),
+                'indexes': [models.Index(fields=['status', 'proxima_tentativa'], name='usuarios_outbox_fila_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,67 @@
+"""
+Índice único em NULLIF(LOWER(email), '') na tabela auth_user
+
+Garante unicidade de email sem diferenciar maiúsculas (emails vazios viram NULL
+e ficam fora da restrição) e atende às buscas feitas por
+apps.usuarios.managers.filtrar_por_email. No PostgreSQL o índice é criado com
+CONCURRENTLY para não bloquear escritas; no SQLite de desenvolvimento
+(USE_SQLITE_DEV) é um CREATE INDEX comum.
+"""
+
+from django.db import migrations
+
+NOME_INDICE = 'usuarios_user_email_ci_uniq'
+EXPRESSAO = "NULLIF(LOWER(email), '')"
+
+
+def _verificar_duplicados(schema_editor):
+    """Aborta com uma mensagem legível se já existirem emails repetidos"""
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT {EXPRESSAO}, COUNT(*) FROM auth_user "
+            f"WHERE {EXPRESSAO} IS NOT NULL GROUP BY {EXPRESSAO} HAVING COUNT(*) > 1"
+        )
+        duplicados = cursor.fetchall()
+    if duplicados:
+        exemplos = ', '.join(email for email, _ in duplicados[:10])
+        raise RuntimeError(
+            f"Existem {len(duplicados)} emails duplicados (sem diferenciar maiúsculas) "
+            f"em auth_user. Corrija-os antes de aplicar a migração: {exemplos}"
+        )
+
+
+def criar_indice(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor not in ('postgresql', 'sqlite'):
+        return
+
+    _verificar_duplicados(schema_editor)
+    concorrente = 'CONCURRENTLY ' if vendor == 'postgresql' else ''
+    schema_editor.execute(
+        f"CREATE UNIQUE INDEX {concorrente}IF NOT EXISTS {NOME_INDICE} "
+        f"ON auth_user (({EXPRESSAO}))"
+    )
+
+
+def remover_indice(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor not in ('postgresql', 'sqlite'):
+        return
+
+    concorrente = 'CONCURRENTLY ' if vendor == 'postgresql' else ''
+    schema_editor.execute(f"DROP INDEX {concorrente}IF EXISTS {NOME_INDICE}")
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY não pode rodar dentro de uma transação
+    atomic = False
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('usuarios', '0003_email_outbox'),
+    ]
+
+    operations = [
+        migrations.RunPython(criar_indice, remover_indice),
+    ]
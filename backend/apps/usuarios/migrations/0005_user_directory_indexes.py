@@ -0,0 +1,46 @@
+"""
+Índices do diretório de usuários (apps.usuarios.views.diretorio_views)
+
+- usuarios_user_joined_id_idx (date_joined, id): paginação por keyset
+- usuarios_user_email_prefixo_idx: busca por prefixo do email normalizado
+  (text_pattern_ops, somente PostgreSQL; o prefixo do username já usa o
+  índice auth_user_username_*_like criado pelo Django)
+"""
+
+from django.db import migrations
+
+INDICES = [
+    ('usuarios_user_joined_id_idx', "(date_joined, id)", ('postgresql', 'sqlite')),
+    ('usuarios_user_email_prefixo_idx', "((NULLIF(LOWER(email), '')) text_pattern_ops)", ('postgresql',)),
+]
+
+
+def criar_indices(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    concorrente = 'CONCURRENTLY ' if vendor == 'postgresql' else ''
+    for nome, colunas, vendors in INDICES:
+        if vendor in vendors:
+            schema_editor.execute(
+                f"CREATE INDEX {concorrente}IF NOT EXISTS {nome} ON auth_user {colunas}")
+
+
+def remover_indices(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    concorrente = 'CONCURRENTLY ' if vendor == 'postgresql' else ''
+    for nome, _, vendors in INDICES:
+        if vendor in vendors:
+            schema_editor.execute(f"DROP INDEX {concorrente}IF EXISTS {nome}")
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY não pode rodar dentro de uma transação
+    atomic = False
+
+    dependencies = [
+        ('usuarios', '0004_email_case_insensitive_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(criar_indices, remover_indices),
+    ]
@@ -0,0 +1,48 @@
+"""
+Índice trigram (pg_trgm) para a busca do UsuarioAdmin
+
+Um único índice GIN sobre UPPER(email || ' ' || first_name || ' ' || last_name
+|| ' ' || username), a mesma expressão de apps.usuarios.managers.TextoBuscaUsuario:
+cada termo da busca vira um LIKE '%TERMO%' atendido pelo índice, em vez de
+quatro UPPER(col) LIKE combinados com OR sobre a tabela inteira.
+
+Somente PostgreSQL; no SQLite de desenvolvimento a busca padrão do admin é usada.
+"""
+
+from django.db import migrations
+
+NOME_INDICE = 'usuarios_user_busca_trgm_idx'
+EXPRESSAO = "UPPER(email || ' ' || first_name || ' ' || last_name || ' ' || username)"
+
+
+def criar_indice(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    schema_editor.execute(
+        f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {NOME_INDICE} "
+        f"ON auth_user USING gin (({EXPRESSAO}) gin_trgm_ops)"
+    )
+
+
+def remover_indice(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    # A extensão é mantida: outros objetos podem depender dela
+    schema_editor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {NOME_INDICE}")
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY não pode rodar dentro de uma transação
+    atomic = False
+
+    dependencies = [
+        ('usuarios', '0005_user_directory_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(criar_indice, remover_indice),
+    ]
@@ -1,6 +1,7 @@
 """
-Models do app usuarios - apenas autenticação
+Models do app usuarios - autenticação e outbox de emails
 """
 from .usuario import Usuario
+from .email_outbox import EmailOutbox
 
-__all__ = ['Usuario']
+__all__ = ['Usuario', 'EmailOutbox']
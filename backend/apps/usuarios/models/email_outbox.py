@@ -0,0 +1,42 @@
+"""
+Outbox de emails transacionais
+Os emails são enfileirados na requisição e enviados pelo comando processar_emails
+"""
+from django.db import models
+from django.utils import timezone
+
+
+class EmailOutbox(models.Model):
+    """
+    Email transacional pendente de envio.
+    """
+
+    class Status(models.TextChoices):
+        PENDENTE = 'pendente', 'Pendente'
+        ENVIADO = 'enviado', 'Enviado'
+        FALHOU = 'falhou', 'Falhou'
+
+    assunto = models.CharField(max_length=255)
+    corpo = models.TextField()
+    remetente = models.CharField(max_length=254)
+    destinatarios = models.JSONField(default=list)
+    status = models.CharField(
+        max_length=10, choices=Status.choices, default=Status.PENDENTE)
+    tentativas = models.PositiveSmallIntegerField(default=0)
+    proxima_tentativa = models.DateTimeField(default=timezone.now)
+    ultimo_erro = models.TextField(blank=True)
+    criado_em = models.DateTimeField(auto_now_add=True)
+    enviado_em = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'usuarios_email_outbox'
+        verbose_name = 'Email na fila'
+        verbose_name_plural = 'Emails na fila'
+        ordering = ('proxima_tentativa', 'id')
+        indexes = [
+            models.Index(fields=['status', 'proxima_tentativa'],
+                         name='usuarios_outbox_fila_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.assunto} -> {', '.join(self.destinatarios)} ({self.status})"
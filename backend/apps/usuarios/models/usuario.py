@@ -15,19 +15,13 @@ class Usuario(User):
         verbose_name_plural = 'Usuários'
 
     def save(self, *args, **kwargs):
-        # Se não tem username, gera um baseado no email
+        # Se não tem username, gera um único baseado no email
         if not self.username and self.email:
-            # Remove caracteres especiais do email para criar username
-            base_username = self.email.split('@')[0]
-            username = base_username
-            counter = 1
-
-            # Garante que o username seja único
-            while User.objects.filter(username=username).exclude(pk=self.pk).exists():
-                username = f"{base_username}{counter}"
-                counter += 1
-
-            self.username = username
+            # Import local evita o ciclo models -> services -> models
+            from ..services.username_service import salvar_com_username_unico
+            salvar_com_username_unico(
+                self, salvar=lambda: super(Usuario, self).save(*args, **kwargs))
+            return
 
         super().save(*args, **kwargs)
 
@@ -1,7 +1,13 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from allauth.account.adapter import get_adapter
+from allauth.account.utils import setup_user_email
 from dj_rest_auth.registration.serializers import RegisterSerializer
 from dj_rest_auth.serializers import UserDetailsSerializer as BaseUserDetailsSerializer
+from core.perfil.drf import SerializacaoMedidaMixin
+from ..services.username_service import salvar_com_username_unico
 
 User = get_user_model()
 
@@ -31,24 +37,31 @@ class CustomRegisterSerializer(RegisterSerializer):
         return data
 
     def save(self, request):
-        user = super().save(request)
+        # Mesmo fluxo do RegisterSerializer.save, mas com um único INSERT já com
+        # nome e username únicos (em vez de salvar e depois corrigir o username)
+        adapter = get_adapter()
+        user = adapter.new_user(request)
+        self.cleaned_data = self.get_cleaned_data()
+        user = adapter.save_user(request, user, self, commit=False)
+        if 'password1' in self.cleaned_data:
+            try:
+                adapter.clean_password(self.cleaned_data['password1'], user=user)
+            except DjangoValidationError as exc:
+                raise serializers.ValidationError(
+                    detail=serializers.as_serializer_error(exc)
+                )
+
         user.first_name = self.validated_data.get('first_name', '')
         user.last_name = self.validated_data.get('last_name', '')
 
-        # Gera username baseado no email se não existir
-        if not user.username:
-            base_username = user.email.split('@')[0]
-            username = base_username
-            counter = 1
-            while User.objects.filter(username=username).exclude(pk=user.pk).exists():
-                username = f"{base_username}{counter}"
-                counter += 1
-            user.username = username
-        user.save()
+        with transaction.atomic():
+            salvar_com_username_unico(user)
+            self.custom_signup(request, user)
+            setup_user_email(request, user, [])
         return user
 
 
-class UserDetailsSerializer(BaseUserDetailsSerializer):
+class UserDetailsSerializer(SerializacaoMedidaMixin, BaseUserDetailsSerializer):
     """
     Serializer personalizado para detalhes do usuário.
     """
@@ -1,5 +1,32 @@
 """
 Services do app usuarios
 """
+from .senha_service import (
+    verificar_senha,
+    definir_senha,
+    obter_metricas as obter_metricas_hash_senha,
+)
+from .cache_usuario_service import (
+    UsuarioSnapshot,
+    obter_snapshot,
+    invalidar_snapshot,
+    invalidar_snapshots,
+    obter_estatisticas as obter_estatisticas_cache_usuario,
+)
+from .email_service import (
+    enfileirar_email,
+    processar_lote as processar_lote_emails,
+)
 
-__all__ = []
+__all__ = [
+    'verificar_senha',
+    'definir_senha',
+    'obter_metricas_hash_senha',
+    'UsuarioSnapshot',
+    'obter_snapshot',
+    'invalidar_snapshot',
+    'invalidar_snapshots',
+    'obter_estatisticas_cache_usuario',
+    'enfileirar_email',
+    'processar_lote_emails',
+]
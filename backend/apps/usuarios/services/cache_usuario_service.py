@@ -0,0 +1,145 @@
+"""
+Cache de usuários autenticados via JWT
+Guarda um snapshot imutável do usuário no cache 'duas_camadas' (LRU do processo na
+frente do cache compartilhado, core.cache.backends); a autenticação monta a partir
+dele uma instância do User por requisição
+"""
+
+import threading
+from dataclasses import dataclass, fields
+from datetime import datetime
+from typing import Optional
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+
+from core.metricas.registro import Contador
+
+User = get_user_model()
+
+CHAVE_CACHE = 'usuarios:snapshot:{}'
+ALIAS_CACHE = 'duas_camadas'
+
+# Hits por camada (local, remoto) ficam em cache_leituras_total{cache="duas_camadas"}
+CONSULTAS_SNAPSHOT = Contador(
+    'usuario_snapshot_lookups_total',
+    'Resoluções do snapshot de usuário por origem (cache, banco)',
+    rotulos=('origem',),
+)
+
+
+@dataclass(frozen=True, slots=True)
+class UsuarioSnapshot:
+    """
+    Snapshot somente leitura com os campos do usuário usados pela API.
+    É o valor guardado em cache; request.user recebe o User de para_usuario().
+    """
+    id: int
+    username: str
+    email: str
+    first_name: str
+    last_name: str
+    is_active: bool
+    is_staff: bool
+    is_superuser: bool
+    date_joined: datetime
+    last_login: Optional[datetime]
+
+    is_authenticated = True
+    is_anonymous = False
+
+    @property
+    def pk(self):
+        return self.id
+
+    def get_username(self):
+        return self.username
+
+    def __str__(self):
+        return self.email if self.email else self.username
+
+    def para_usuario(self):
+        """
+        Instância do User (já persistida) com os valores do snapshot, sem consulta.
+        Os demais campos (ex.: password) ficam adiados: são lidos do banco sob demanda
+        e save() grava só os campos carregados, sem sobrescrever os ausentes.
+        """
+        return User.from_db(
+            User._default_manager.db, _CAMPOS, [getattr(self, campo) for campo in _CAMPOS_MODEL]
+        )
+
+    @classmethod
+    def from_user(cls, user):
+        return cls(**{campo.name: getattr(user, campo.name) for campo in fields(cls)})
+
+
+_CAMPOS = tuple(campo.name for campo in fields(UsuarioSnapshot))
+# Mesmos campos na ordem do model, como Model.from_db espera os valores
+_CAMPOS_MODEL = tuple(
+    campo.attname for campo in User._meta.concrete_fields if campo.attname in _CAMPOS
+)
+
+_lock = threading.Lock()
+_estatisticas = {
+    'hits_cache': 0,
+    'misses': 0,
+    'invalidacoes': 0,
+}
+
+
+def _ttl_cache() -> int:
+    return getattr(settings, 'USUARIO_SNAPSHOT_CACHE_TTL', 300)
+
+
+def _contar(chave: str, quantidade: int = 1):
+    with _lock:
+        _estatisticas[chave] += quantidade
+
+
+def _carregar(user_id) -> Optional[UsuarioSnapshot]:
+    _contar('misses')
+    CONSULTAS_SNAPSHOT.incrementar(origem='banco')
+    valores = User._default_manager.filter(pk=user_id).values(*_CAMPOS).first()
+    return None if valores is None else UsuarioSnapshot(**valores)
+
+
+def obter_snapshot(user_id) -> Optional[UsuarioSnapshot]:
+    """
+    Resolve o snapshot do usuário pelo cache 'duas_camadas' e, na falta, pelo banco.
+    O recálculo é único por chave; usuário inexistente também fica em cache (None)
+    até a invalidação pelos signals ou o fim do TTL.
+    """
+    carregado = []
+
+    def carregar():
+        carregado.append(True)
+        return _carregar(user_id)
+
+    snapshot = caches[ALIAS_CACHE].get_or_set(CHAVE_CACHE.format(user_id), carregar, _ttl_cache())
+    if not carregado:
+        _contar('hits_cache')
+        CONSULTAS_SNAPSHOT.incrementar(origem='cache')
+    return snapshot
+
+
+def invalidar_snapshot(user_id):
+    """
+    Remove o snapshot do cache compartilhado e da camada local deste processo;
+    os demais processos deixam de vê-lo em até CACHES['duas_camadas'] LOCAL_TTL
+    """
+    _contar('invalidacoes')
+    caches[ALIAS_CACHE].delete(CHAVE_CACHE.format(user_id))
+
+
+def invalidar_snapshots(user_ids):
+    """Invalida vários snapshots de uma vez (ex.: após bulk_update)"""
+    user_ids = list(user_ids)
+    _contar('invalidacoes', len(user_ids))
+    caches[ALIAS_CACHE].delete_many([CHAVE_CACHE.format(user_id) for user_id in user_ids])
+
+
+def obter_estatisticas() -> dict:
+    """Retorna os contadores de hit/miss do cache de usuários"""
+    with _lock:
+        return dict(_estatisticas)
@@ -0,0 +1,124 @@
+"""
+Serviço de emails transacionais via outbox
+A requisição apenas enfileira; o envio em lote acontece no comando processar_emails.
+O corpo (que pode conter links de reset de senha) é apagado quando o email sai da fila,
+e as linhas finalizadas são removidas após EMAIL_OUTBOX_RETENCAO_DIAS.
+"""
+
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import EmailOutbox
+
+logger = logging.getLogger(__name__)
+
+# Tempo que um lote fica reservado para um worker antes de voltar à fila
+RESERVA_LOTE = timedelta(minutes=5)
+BACKOFF_BASE_SEGUNDOS = 30
+BACKOFF_MAX_SEGUNDOS = 3600
+
+
+def enfileirar_email(assunto: str, corpo: str, destinatarios: list, remetente: str = None) -> EmailOutbox:
+    """Grava o email na outbox para envio assíncrono"""
+    return EmailOutbox.objects.create(
+        assunto=assunto,
+        corpo=corpo,
+        remetente=remetente or settings.DEFAULT_FROM_EMAIL,
+        destinatarios=list(destinatarios),
+    )
+
+
+def _calcular_backoff(tentativas: int) -> timedelta:
+    """Backoff exponencial: 30s, 60s, 120s... limitado a 1h"""
+    segundos = min(BACKOFF_BASE_SEGUNDOS * (2 ** (tentativas - 1)), BACKOFF_MAX_SEGUNDOS)
+    return timedelta(seconds=segundos)
+
+
+def _reservar_lote(tamanho_lote: int) -> list:
+    """
+    Reserva um lote de emails pendentes em uma transação curta, empurrando
+    proxima_tentativa para frente. Se o worker cair, o lote volta à fila
+    quando a reserva expirar.
+    """
+    agora = timezone.now()
+    with transaction.atomic():
+        lote = list(
+            EmailOutbox.objects.select_for_update(skip_locked=True)
+            .filter(status=EmailOutbox.Status.PENDENTE, proxima_tentativa__lte=agora)
+            .order_by('proxima_tentativa', 'id')[:tamanho_lote]
+        )
+        if lote:
+            EmailOutbox.objects.filter(pk__in=[email.pk for email in lote]).update(
+                proxima_tentativa=agora + RESERVA_LOTE)
+    return lote
+
+
+def processar_lote(tamanho_lote: int = 50, max_tentativas: int = 5) -> dict:
+    """Envia um lote da outbox reutilizando uma única conexão SMTP"""
+    lote = _reservar_lote(tamanho_lote)
+    resultado = {'enviados': 0, 'reagendados': 0, 'falhas': 0}
+    if not lote:
+        return resultado
+
+    enviados, com_erro = [], []
+    try:
+        with get_connection(fail_silently=False) as conexao:
+            for email in lote:
+                mensagem = EmailMessage(
+                    email.assunto, email.corpo, email.remetente,
+                    email.destinatarios, connection=conexao,
+                )
+                try:
+                    mensagem.send(fail_silently=False)
+                    enviados.append(email)
+                except Exception as exc:
+                    com_erro.append((email, exc))
+    except Exception as exc:
+        # Falha ao abrir/fechar a conexão: todo o lote não enviado volta com erro
+        logger.error(f"Erro na conexão de email: {exc}", exc_info=True)
+        processados = {email.pk for email in enviados} | {email.pk for email, _ in com_erro}
+        com_erro.extend((email, exc) for email in lote if email.pk not in processados)
+
+    agora = timezone.now()
+    for email in enviados:
+        email.status = EmailOutbox.Status.ENVIADO
+        email.tentativas += 1
+        email.enviado_em = agora
+        email.ultimo_erro = ''
+        email.corpo = ''
+
+    for email, exc in com_erro:
+        email.tentativas += 1
+        email.ultimo_erro = f"{type(exc).__name__}: {exc}"[:1000]
+        if email.tentativas >= max_tentativas:
+            email.status = EmailOutbox.Status.FALHOU
+            email.corpo = ''
+            resultado['falhas'] += 1
+            logger.error(f"Email {email.pk} descartado após {email.tentativas} tentativas: {email.ultimo_erro}")
+        else:
+            email.proxima_tentativa = agora + _calcular_backoff(email.tentativas)
+            resultado['reagendados'] += 1
+
+    EmailOutbox.objects.bulk_update(
+        enviados + [email for email, _ in com_erro],
+        ['status', 'tentativas', 'enviado_em', 'ultimo_erro', 'proxima_tentativa', 'corpo'],
+    )
+    resultado['enviados'] = len(enviados)
+    return resultado
+
+
+def purgar_finalizados(retencao_dias: int = None) -> int:
+    """Remove emails enviados ou falhos criados há mais de retencao_dias; retorna quantos"""
+    if retencao_dias is None:
+        retencao_dias = getattr(settings, 'EMAIL_OUTBOX_RETENCAO_DIAS', 7)
+    limite = timezone.now() - timedelta(days=retencao_dias)
+    removidos, _ = EmailOutbox.objects.filter(
+        status__in=[EmailOutbox.Status.ENVIADO, EmailOutbox.Status.FALHOU],
+        criado_em__lt=limite,
+    ).delete()
+    return removidos
@@ -0,0 +1,170 @@
+"""
+Serviço de hashing de senhas em pool de workers limitado
+O PBKDF2 das views de login, troca e reset de senha roda no pool, com no máximo
+MAX_WORKERS + MAX_FILA operações em andamento; acima disso responde 503 na hora
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, identify_hasher, make_password
+
+from core.erros.exceptions import PoolSenhaSaturadoErro
+from core.metricas.registro import Contador, Histograma
+from core.perfil.tempos import medir
+
+logger = logging.getLogger(__name__)
+
+_CONFIGURACAO_PADRAO = {
+    'TIPO': 'thread',  # 'thread' ou 'process'
+    'MAX_WORKERS': 4,
+    'MAX_FILA': 32,
+}
+
+_lock = threading.Lock()
+_executor = None
+_vagas = None
+
+DURACAO_HASH = Histograma(
+    'password_hash_duration_seconds',
+    'Tempo de hashing/verificação de senha no pool, incluindo a espera na fila',
+    rotulos=('resultado',),
+)
+HASH_REJEITADOS = Contador(
+    'password_hash_rejected_total',
+    'Operações de senha rejeitadas com o pool de hashing saturado',
+)
+
+_metricas = {
+    'total': 0,
+    'rejeitadas': 0,
+    'erros': 0,
+    'latencia_total_ms': 0.0,
+    'latencia_max_ms': 0.0,
+}
+
+
+def _configuracao() -> dict:
+    """Mescla PASSWORD_HASHING_POOL com os valores padrão"""
+    configuracao = dict(_CONFIGURACAO_PADRAO)
+    configuracao.update(getattr(settings, 'PASSWORD_HASHING_POOL', {}))
+    return configuracao
+
+
+def _inicializar_processo():
+    """Prepara o Django nos workers do ProcessPoolExecutor (spawn/forkserver)"""
+    import django
+    django.setup()
+
+
+def criar_pool_processos(max_workers: int = None) -> ProcessPoolExecutor:
+    """Pool de processos com o Django inicializado (também usado em cargas em lote)"""
+    return ProcessPoolExecutor(max_workers=max_workers, initializer=_inicializar_processo)
+
+
+def _obter_pool():
+    """Cria o executor e o semáforo de vagas sob demanda"""
+    global _executor, _vagas
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                configuracao = _configuracao()
+                max_workers = configuracao['MAX_WORKERS']
+                _vagas = threading.BoundedSemaphore(max_workers + configuracao['MAX_FILA'])
+                if configuracao['TIPO'] == 'process':
+                    _executor = criar_pool_processos(max_workers)
+                else:
+                    _executor = ThreadPoolExecutor(
+                        max_workers=max_workers, thread_name_prefix='hash-senha')
+    return _executor, _vagas
+
+
+def _registrar(duracao_ms: float = 0.0, rejeitada: bool = False, erro: bool = False):
+    """Atualiza as métricas do pool"""
+    with _lock:
+        if rejeitada:
+            _metricas['rejeitadas'] += 1
+        else:
+            _metricas['total'] += 1
+            if erro:
+                _metricas['erros'] += 1
+            _metricas['latencia_total_ms'] += duracao_ms
+            if duracao_ms > _metricas['latencia_max_ms']:
+                _metricas['latencia_max_ms'] = duracao_ms
+
+    if rejeitada:
+        HASH_REJEITADOS.incrementar()
+    else:
+        DURACAO_HASH.observar(duracao_ms / 1000, resultado='erro' if erro else 'ok')
+
+
+def _submeter(funcao, *args):
+    """
+    Envia a função ao pool, rejeitando imediatamente se não houver vaga.
+    A vaga só é devolvida quando o job termina (callback do future), mesmo que
+    quem esperava o resultado tenha desistido ou sido cancelado.
+    """
+    executor, vagas = _obter_pool()
+    if not vagas.acquire(blocking=False):
+        _registrar(rejeitada=True)
+        logger.warning("Pool de hashing de senhas saturado, requisição rejeitada")
+        raise PoolSenhaSaturadoErro()
+
+    inicio = time.perf_counter()
+
+    def _concluir(future):
+        vagas.release()
+        erro = future.cancelled() or future.exception() is not None
+        _registrar((time.perf_counter() - inicio) * 1000, erro=erro)
+
+    try:
+        future = executor.submit(funcao, *args)
+    except BaseException:
+        vagas.release()
+        raise
+    future.add_done_callback(_concluir)
+    return future
+
+
+def _executar(funcao, *args):
+    """Executa a função no pool e espera o resultado (views síncronas)"""
+    future = _submeter(funcao, *args)
+    with medir('hash'):
+        return future.result()
+
+
+def _precisa_atualizar(user) -> bool:
+    # Mesmo comportamento do Django: re-hash quando o algoritmo/iterações mudam
+    try:
+        return identify_hasher(user.password).must_update(user.password)
+    except ValueError:
+        return False
+
+
+def verificar_senha(user, senha: str) -> bool:
+    """Verifica a senha do usuário no pool, atualizando o hash se necessário (check_password)"""
+    correta = _executar(check_password, senha, user.password)
+    if correta and _precisa_atualizar(user):
+        definir_senha(user, senha)
+        user.save(update_fields=['password'])
+    return correta
+
+
+def definir_senha(user, senha: str):
+    """Define a senha do usuário gerando o hash no pool (set_password)"""
+    user.password = _executar(make_password, senha)
+    # Mantém a notificação dos validadores de senha no save(), como set_password()
+    user._password = senha
+
+
+def obter_metricas() -> dict:
+    """Retorna um snapshot das métricas do pool de hashing"""
+    with _lock:
+        metricas = dict(_metricas)
+    metricas['latencia_media_ms'] = (
+        metricas['latencia_total_ms'] / metricas['total'] if metricas['total'] else 0.0
+    )
+    return metricas
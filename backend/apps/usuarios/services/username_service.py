@@ -0,0 +1,192 @@
+"""
+Alocação de usernames únicos derivados do email
+Verifica um lote limitado de candidatos (base, base1, base2...) por consulta
+indexada e usa insert-and-retry na constraint única
+"""
+
+import itertools
+import re
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from django.db.models import BigIntegerField, Max
+from django.db.models.functions import Cast, Substr
+
+from core.erros.exceptions import UsernameIndisponivelErro
+
+from ..managers import violacao_email_unico
+
+User = get_user_model()
+
+USERNAME_MAX = 150
+TAMANHO_BASE_MAX = 140  # Reserva espaço para o sufixo numérico
+MAX_TENTATIVAS = 5
+LOTE_CANDIDATOS = 20  # Sufixos verificados por consulta além da própria base
+
+
+def base_username(email: str) -> str:
+    """Parte local do email usada como base do username"""
+    return email.split('@')[0][:TAMANHO_BASE_MAX]
+
+
+def _candidatos(base: str) -> list:
+    """base, base1 ... base<LOTE_CANDIDATOS>"""
+    return [base] + [f"{base}{sufixo}" for sufixo in range(1, LOTE_CANDIDATOS + 1)]
+
+
+def _sufixos(base: str, usernames) -> set:
+    """Sufixos numéricos já usados para `base` (0 representa a própria base)"""
+    padrao = re.compile(rf'{re.escape(base)}(\d*)')
+    sufixos = set()
+    for username in usernames:
+        match = padrao.fullmatch(username)
+        if match:
+            sufixos.add(int(match.group(1)) if match.group(1) else 0)
+    return sufixos
+
+
+def _menor_sufixo_livre(sufixos: set):
+    """Menor sufixo livre dentro do lote de candidatos; None se o lote está todo ocupado"""
+    for sufixo in range(LOTE_CANDIDATOS + 1):
+        if sufixo not in sufixos:
+            return sufixo
+    return None
+
+
+def _maior_sufixo(base: str, exclude_pk=None) -> int:
+    """
+    Maior sufixo numérico em uso para `base`, calculado no banco (uma linha de
+    resultado). Só usado quando todo o lote de candidatos está ocupado.
+    """
+    existentes = User._default_manager.filter(
+        username__startswith=base,
+        # Até 9 dígitos: cabe no BigInteger e ignora nomes como 'contatoxyz'
+        username__regex=rf'^{re.escape(base)}[0-9]{{1,9}}$',
+    )
+    if exclude_pk is not None:
+        existentes = existentes.exclude(pk=exclude_pk)
+
+    maior = existentes.annotate(
+        sufixo=Cast(Substr('username', len(base) + 1), BigIntegerField()),
+    ).aggregate(maior=Max('sufixo'))['maior']
+    return maior or 0
+
+
+def _montar(base: str, sufixo: int) -> str:
+    return f"{base}{sufixo}" if sufixo else base
+
+
+def gerar_username_unico(base: str, exclude_pk=None, reservados=()) -> str:
+    """
+    Escolhe `base` ou `base<N>` com o menor N livre entre os candidatos do lote,
+    em uma consulta `username IN (...)` pelo índice único. Com o lote todo
+    ocupado, segue do maior sufixo em uso (uma agregação no banco).
+    `reservados` são usernames já escolhidos e ainda não gravados (ex.: lotes).
+    """
+    base = base[:TAMANHO_BASE_MAX]
+    existentes = User._default_manager.filter(username__in=_candidatos(base))
+    if exclude_pk is not None:
+        existentes = existentes.exclude(pk=exclude_pk)
+
+    ocupados = _sufixos(base, itertools.chain(existentes.values_list('username', flat=True), reservados))
+    sufixo = _menor_sufixo_livre(ocupados)
+    if sufixo is None:
+        sufixo = max(_maior_sufixo(base, exclude_pk), max(ocupados)) + 1
+    return _montar(base, sufixo)
+
+
+class AlocadorUsernames:
+    """
+    Alocação em memória para cargas em lote: os candidatos de cada base são
+    verificados no banco uma única vez (uma consulta por grupo de bases novas)
+    e os usernames alocados ficam reservados até o fim do processo.
+    """
+    # Mantém o IN abaixo do limite de 999 parâmetros do SQLite
+    BASES_POR_CONSULTA = 40
+
+    def __init__(self):
+        self._ocupados = {}  # base -> sufixos ocupados (verificados até LOTE_CANDIDATOS)
+        self._proximo = {}  # base -> próximo sufixo livre além do lote, quando esgotado
+        self._reservados = set()  # Usernames alocados, ainda não gravados no banco
+
+    def carregar(self, bases):
+        """Verifica no banco os candidatos das bases ainda desconhecidas"""
+        novas = sorted({base[:TAMANHO_BASE_MAX] for base in bases} - self._ocupados.keys())
+        for inicio in range(0, len(novas), self.BASES_POR_CONSULTA):
+            grupo = novas[inicio:inicio + self.BASES_POR_CONSULTA]
+            candidatos = [candidato for base in grupo for candidato in _candidatos(base)]
+            usernames = list(
+                User._default_manager.filter(username__in=candidatos).values_list('username', flat=True)
+            )
+            for base in grupo:
+                self._ocupados[base] = _sufixos(base, itertools.chain(usernames, self._reservados))
+
+    def alocar(self, base: str) -> str:
+        """Reserva e retorna o menor username livre para `base`"""
+        base = base[:TAMANHO_BASE_MAX]
+        if base not in self._ocupados:
+            self.carregar([base])
+
+        sufixo = _menor_sufixo_livre(self._ocupados[base])
+        if sufixo is None:
+            if base not in self._proximo:
+                self._proximo[base] = max(_maior_sufixo(base), max(self._ocupados[base])) + 1
+            sufixo = self._proximo[base]
+
+        username = _montar(base, sufixo)
+        self._reservar(username)
+        return username
+
+    def realocar(self, base: str) -> str:
+        """
+        Aloca outro username para `base` depois que um INSERT colidiu: um cadastro
+        concorrente ocupou o alocado, então os candidatos da base são reverificados
+        """
+        base = base[:TAMANHO_BASE_MAX]
+        self._ocupados.pop(base, None)
+        self._proximo.pop(base, None)
+        return self.alocar(base)
+
+    def _reservar(self, username: str):
+        """
+        Marca o username em todas as bases conhecidas que o geram: 'ana1' vale
+        como sufixo 1 de 'ana' e como a própria base 'ana1'.
+        """
+        self._reservados.add(username)
+        for tamanho in range(1, len(username) + 1):
+            base = username[:tamanho]
+            resto = username[tamanho:]
+            if base in self._ocupados and (not resto or resto.isdigit()):
+                sufixo = int(resto or 0)
+                self._ocupados[base].add(sufixo)
+                if sufixo >= self._proximo.get(base, sufixo + 1):
+                    self._proximo[base] = sufixo + 1
+
+
+def colisao_username(exc: IntegrityError) -> bool:
+    """Identifica violação da constraint única de username (Postgres e SQLite)"""
+    if violacao_email_unico(exc):
+        return False
+    mensagem = str(exc).lower()
+    return 'username' in mensagem
+
+
+def salvar_com_username_unico(user, salvar=None, base: str = None):
+    """
+    Atribui um username livre e salva o usuário. Se outra transação pegar o
+    mesmo username entre a consulta e o INSERT, realoca e tenta de novo.
+    """
+    salvar = salvar or user.save
+    base = base or base_username(user.email)
+
+    for _ in range(MAX_TENTATIVAS):
+        user.username = gerar_username_unico(base, exclude_pk=user.pk)
+        try:
+            with transaction.atomic():
+                salvar()
+            return user
+        except IntegrityError as exc:
+            if not colisao_username(exc):
+                raise
+
+    raise UsernameIndisponivelErro()
@@ -0,0 +1,27 @@
+"""
+Signals do app usuarios
+Mantém o cache de snapshots de usuário consistente com o banco
+"""
+from functools import partial
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Usuario
+from .services.cache_usuario_service import invalidar_snapshot
+
+
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=Usuario)
+@receiver(post_delete, sender=User)
+@receiver(post_delete, sender=Usuario)
+def invalidar_cache_usuario(sender, instance, **kwargs):
+    """
+    Invalida o snapshot em qualquer escrita no usuário (inclui troca de senha).
+    Só após o commit: antes dele, uma leitura concorrente recolocaria no cache
+    os dados anteriores à transação, servidos até o fim do TTL.
+    """
+    if instance.pk is not None:
+        transaction.on_commit(partial(invalidar_snapshot, instance.pk), using=kwargs.get('using'))
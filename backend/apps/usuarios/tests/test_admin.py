@@ -0,0 +1,83 @@
+"""
+Admin de usuários: busca pela expressão do índice trigram e paginação com contagem estimada
+"""
+
+import types
+
+import pytest
+from django.contrib.admin.sites import site
+from django.contrib.auth import get_user_model
+from django.test import RequestFactory
+
+from apps.usuarios import admin as usuarios_admin
+from apps.usuarios.models import Usuario
+from core.paginacao import estimada
+from core.paginacao.estimada import LIMITE_CONTAGEM_EXATA, PaginadorContagemEstimada
+
+User = get_user_model()
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def model_admin():
+    return site._registry[Usuario]
+
+
+@pytest.fixture
+def pessoas(db):
+    User.objects.bulk_create([
+        User(username='mcosta', email='maria.costa@exemplo.com', first_name='Maria', last_name='Costa'),
+        User(username='msilva', email='maria.silva@exemplo.com', first_name='Maria', last_name='Silva'),
+        User(username='jcosta', email='joao@exemplo.com', first_name='João', last_name='Costa'),
+    ])
+
+
+def _buscar(model_admin, termo):
+    queryset, duplicados = model_admin.get_search_results(
+        RequestFactory().get('/'), Usuario.objects.all(), termo)
+    return sorted(queryset.values_list('username', flat=True)), duplicados
+
+
+def test_fora_do_postgresql_usa_a_busca_padrao(model_admin, pessoas, monkeypatch):
+    def trigram_indisponivel():
+        raise AssertionError('a expressão do índice trigram só existe no PostgreSQL')
+
+    monkeypatch.setattr(usuarios_admin, 'TextoBuscaUsuario', trigram_indisponivel)
+
+    assert _buscar(model_admin, 'maria costa')[0] == ['mcosta']
+    assert _buscar(model_admin, 'COSTA')[0] == ['jcosta', 'mcosta']
+
+
+def test_caminho_trigram_exige_todos_os_termos(model_admin, pessoas, monkeypatch):
+    # UPPER e || também existem no SQLite: a mesma consulta roda aqui
+    monkeypatch.setattr(usuarios_admin, 'connections', {'default': types.SimpleNamespace(vendor='postgresql')})
+
+    assert _buscar(model_admin, 'maria costa') == (['mcosta'], False)
+    assert _buscar(model_admin, '"maria.silva@"')[0] == ['msilva']
+    assert _buscar(model_admin, '  ')[0] == ['jcosta', 'mcosta', 'msilva']
+
+
+def test_changelist_com_busca(admin_client, pessoas):
+    resposta = admin_client.get('/admin/usuarios/usuario/', {'q': 'silva'})
+
+    assert resposta.status_code == 200
+    assert [user.username for user in resposta.context['cl'].result_list] == ['msilva']
+
+
+def test_contagem_exata_sem_estimativa(pessoas):
+    # SQLite: contar_aproximado devolve None e o paginator faz o COUNT(*)
+    assert PaginadorContagemEstimada(User.objects.order_by('pk'), 2).count == User.objects.count()
+    assert PaginadorContagemEstimada([1, 2, 3], 2).count == 3
+
+
+@pytest.mark.parametrize('estimativa, esperado', [
+    (LIMITE_CONTAGEM_EXATA * 5, LIMITE_CONTAGEM_EXATA * 5),
+    (LIMITE_CONTAGEM_EXATA - 1, None),
+])
+def test_estimativa_so_acima_do_limite(pessoas, monkeypatch, estimativa, esperado):
+    monkeypatch.setattr(estimada, 'contar_aproximado', lambda queryset: estimativa)
+
+    paginador = PaginadorContagemEstimada(User.objects.order_by('pk'), 2)
+
+    assert paginador.count == (esperado if esperado is not None else User.objects.count())
@@ -0,0 +1,89 @@
+"""
+Atualização de usuários existentes (atualizar_usuarios): lotes por PK, checkpoint e dry-run
+"""
+
+import json
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+
+from apps.usuarios.management.commands.atualizar_usuarios import Command
+
+User = get_user_model()
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def pendentes(db):
+    """Cinco usuários sem email e um sem username (auth_user.username é único)"""
+    User.objects.bulk_create(
+        [User(username=f'sememail{numero}', email='') for numero in range(5)]
+        + [User(username='', email='semnome@exemplo.com')]
+    )
+    User.objects.create_user(username='semnome', email='ok@exemplo.com')
+    return list(User.objects.filter(email__in=['', 'semnome@exemplo.com']).order_by('pk'))
+
+
+@pytest.fixture
+def checkpoint(tmp_path):
+    return tmp_path / 'checkpoint.json'
+
+
+def _executar(checkpoint, **opcoes):
+    saida = StringIO()
+    call_command('atualizar_usuarios', checkpoint=str(checkpoint), stdout=saida, **opcoes)
+    return saida.getvalue()
+
+
+def test_processa_em_lotes_pela_pk(pendentes, checkpoint):
+    saida = _executar(checkpoint, chunk_size=2)
+
+    assert saida.count('Lote até id') == 3
+    assert not User.objects.filter(email='').exists()
+    assert User.objects.get(email='sememail0@exemplo.com').username == 'sememail0'
+    # 'semnome' já existe: o usuário sem username recebe o próximo livre
+    assert User.objects.get(email='semnome@exemplo.com').username == 'semnome1'
+    assert not checkpoint.exists()
+
+
+def test_retoma_do_checkpoint(pendentes, checkpoint):
+    checkpoint.write_text(json.dumps({'ultimo_pk': pendentes[2].pk, 'processados': 3}), encoding='utf-8')
+
+    saida = _executar(checkpoint, chunk_size=2)
+
+    assert f'Retomando a partir do id {pendentes[2].pk}' in saida
+    assert list(User.objects.filter(email='').values_list('pk', flat=True)) == [user.pk for user in pendentes[:3]]
+    assert not checkpoint.exists()
+
+
+def test_interrupcao_grava_checkpoint_e_nova_execucao_termina(pendentes, checkpoint, monkeypatch):
+    gravar = Command._gravar
+    chamadas = []
+
+    def gravar_e_interromper(self, alterados):
+        chamadas.append(True)
+        if len(chamadas) == 2:
+            raise KeyboardInterrupt
+        return gravar(self, alterados)
+
+    monkeypatch.setattr(Command, '_gravar', gravar_e_interromper)
+    assert 'execute novamente para retomar' in _executar(checkpoint, chunk_size=2)
+    assert json.loads(checkpoint.read_text(encoding='utf-8'))['ultimo_pk'] == pendentes[1].pk
+
+    monkeypatch.setattr(Command, '_gravar', gravar)
+    _executar(checkpoint, chunk_size=2)
+
+    assert not User.objects.filter(email='').exists()
+    assert not checkpoint.exists()
+
+
+def test_dry_run_nao_grava_nada(pendentes, checkpoint):
+    saida = _executar(checkpoint, chunk_size=4, dry_run=True)
+
+    assert saida.count('[dry-run] Usuário') == 6
+    assert User.objects.filter(email='').count() == 5
+    assert User.objects.filter(username='').count() == 1
+    assert not checkpoint.exists()
@@ -0,0 +1,87 @@
+"""
+Autenticação JWT pelo snapshot em cache: request.user continua sendo um User de verdade
+(rotas de escrita do dj-rest-auth, permissões)
+"""
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.usuarios.auth.authentication import CachedJWTAuthentication
+
+User = get_user_model()
+
+
+@pytest.fixture
+def cliente_autenticado(api_client, usuario):
+    api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(usuario)}')
+    return api_client
+
+
+@pytest.mark.django_db
+def test_get_user_devolve_instancia_persistida_do_model(usuario):
+    user = CachedJWTAuthentication().get_user(AccessToken.for_user(usuario))
+
+    assert isinstance(user, User)
+    assert user.pk == usuario.pk
+    assert user._state.adding is False
+    assert user.has_perm('usuarios.qualquer') is False
+    # A senha não vai para o cache: fica adiada até ser usada
+    assert 'password' in user.get_deferred_fields()
+
+
+@pytest.mark.django_db
+def test_patch_auth_user_atualiza_sem_apagar_a_senha(cliente_autenticado, usuario):
+    resposta = cliente_autenticado.patch(
+        reverse('usuarios:rest_user_details'), {'first_name': 'Mariana'}, format='json'
+    )
+
+    assert resposta.status_code == 200
+    assert resposta.data['first_name'] == 'Mariana'
+    usuario.refresh_from_db()
+    assert usuario.first_name == 'Mariana'
+    assert usuario.check_password('senha-forte-123')
+
+
+@pytest.mark.django_db
+def test_patch_auth_user_invalida_o_snapshot(cliente_autenticado, django_capture_on_commit_callbacks):
+    url = reverse('usuarios:rest_user_details')
+    cliente_autenticado.get(url)  # aquece o cache
+    with django_capture_on_commit_callbacks(execute=True):
+        cliente_autenticado.patch(url, {'last_name': 'Souza'}, format='json')
+
+    assert cliente_autenticado.get(url).data['last_name'] == 'Souza'
+
+
+@pytest.mark.django_db
+def test_password_change_do_dj_rest_auth(cliente_autenticado, usuario):
+    resposta = cliente_autenticado.post(
+        reverse('usuarios:rest_password_change'),
+        {'new_password1': 'outra-senha-forte-456', 'new_password2': 'outra-senha-forte-456'},
+        format='json',
+    )
+
+    assert resposta.status_code == 200
+    usuario.refresh_from_db()
+    assert usuario.check_password('outra-senha-forte-456')
+    assert usuario.first_name == 'Maria'
+
+
+@pytest.mark.django_db
+def test_troca_de_senha_nao_regrava_campos_do_snapshot(cliente_autenticado, usuario):
+    cliente_autenticado.get(reverse('usuarios:rest_user_details'))  # snapshot com is_active=True
+    # Escrita sem signals (ex.: bulk_update): o snapshot em cache fica antigo
+    User.objects.filter(pk=usuario.pk).update(is_active=False, first_name='Outra')
+
+    resposta = cliente_autenticado.post(reverse('usuarios:change_password'), {
+        'old_password': 'senha-forte-123',
+        'new_password1': 'Nova-senha-456',
+        'new_password2': 'Nova-senha-456',
+    }, format='json')
+
+    assert resposta.status_code == 200
+    usuario.refresh_from_db()
+    assert usuario.check_password('Nova-senha-456')
+    assert usuario.is_active is False
+    assert usuario.first_name == 'Outra'
@@ -0,0 +1,70 @@
+"""
+Snapshots de usuário servidos pelo cache 'duas_camadas'
+"""
+
+import pytest
+from django.core.cache import caches
+
+from apps.usuarios.services.cache_usuario_service import (
+    CHAVE_CACHE,
+    invalidar_snapshot,
+    invalidar_snapshots,
+    obter_snapshot,
+)
+
+pytestmark = pytest.mark.django_db
+
+
+def test_banco_consultado_apenas_no_primeiro_acesso(usuario, django_assert_num_queries):
+    with django_assert_num_queries(1):
+        primeiro = obter_snapshot(usuario.pk)
+    with django_assert_num_queries(0):
+        segundo = obter_snapshot(usuario.pk)
+
+    assert primeiro == segundo
+    assert primeiro.email == usuario.email
+    assert caches['duas_camadas'].get(CHAVE_CACHE.format(usuario.pk)) == primeiro
+
+
+def test_escrita_no_usuario_invalida_o_snapshot_apos_o_commit(usuario, django_capture_on_commit_callbacks):
+    obter_snapshot(usuario.pk)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        usuario.first_name = 'Joana'
+        usuario.save()
+        # Transação aberta: leituras seguem no snapshot anterior, sem recarregar do banco
+        assert obter_snapshot(usuario.pk).first_name == 'Maria'
+
+    assert obter_snapshot(usuario.pk).first_name == 'Joana'
+
+
+def test_rollback_mantem_o_snapshot(usuario, django_capture_on_commit_callbacks):
+    primeiro = obter_snapshot(usuario.pk)
+
+    with django_capture_on_commit_callbacks() as callbacks:
+        usuario.first_name = 'Joana'
+        usuario.save()
+
+    # Callbacks capturados e não executados: como um rollback
+    assert len(callbacks) == 1
+    assert obter_snapshot(usuario.pk) == primeiro
+
+
+def test_invalidacao_remove_das_duas_camadas(usuario, django_assert_num_queries):
+    obter_snapshot(usuario.pk)
+
+    invalidar_snapshot(usuario.pk)
+
+    assert caches['default'].get(CHAVE_CACHE.format(usuario.pk)) is None
+    with django_assert_num_queries(1):
+        obter_snapshot(usuario.pk)
+
+
+def test_usuario_inexistente_nao_volta_ao_banco(django_assert_num_queries):
+    with django_assert_num_queries(1):
+        assert obter_snapshot(999_999) is None
+        assert obter_snapshot(999_999) is None
+
+    invalidar_snapshots([999_999])
+    with django_assert_num_queries(1):
+        assert obter_snapshot(999_999) is None
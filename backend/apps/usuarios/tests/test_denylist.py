@@ -0,0 +1,131 @@
+"""
+Denylist de refresh tokens: sincronização entre processos pelo log no cache
+Cada DenylistTokens faz o papel de um processo; todos compartilham o cache locmem.
+"""
+
+import random
+import time
+from unittest import mock
+
+import pytest
+
+from apps.usuarios.auth.denylist import CHAVE_JTI, CHAVE_LOG, CHAVE_SEQ, CHAVE_SNAPSHOT, DenylistTokens
+
+
+def _processo(**configuracao):
+    return DenylistTokens({'CAPACIDADE': 1000, 'SINCRONIZACAO_SEGUNDOS': 0, **configuracao})
+
+
+def _expira_em(segundos=300):
+    return int(time.time()) + segundos
+
+
+def _revogar_em_duas_etapas(processo, jti):
+    """Reproduz revogar() parado entre a publicação do seq e a gravação do log"""
+    cache = processo.cache
+    cache.set(CHAVE_JTI.format(jti), 1, 300)
+    cache.add(CHAVE_SEQ, 0, None)
+    seq = cache.incr(CHAVE_SEQ)
+
+    def concluir():
+        cache.set(CHAVE_LOG.format(seq), jti, 300)
+
+    return concluir
+
+
+def test_revogacao_chega_a_outro_processo():
+    a, b = _processo(), _processo()
+    assert not b.esta_revogado('jti-1')
+
+    a.revogar('jti-1', _expira_em())
+
+    assert b.esta_revogado('jti-1')
+    assert not b.esta_revogado('jti-2')
+
+
+def test_token_expirado_nao_e_registrado():
+    a, b = _processo(), _processo()
+
+    a.revogar('jti-1', _expira_em(-1))
+
+    assert not b.esta_revogado('jti-1')
+
+
+def test_sincronizacao_entre_incr_e_gravacao_do_log_nao_perde_a_revogacao():
+    a, b = _processo(), _processo()
+    b.esta_revogado('aquecimento')
+
+    concluir = _revogar_em_duas_etapas(a, 'jti-1')
+    assert not b.esta_revogado('jti-1')  # seq visto, entrada ainda ausente
+
+    concluir()
+    assert b.esta_revogado('jti-1')
+
+
+def test_entrada_ausente_e_descartada_apos_o_prazo():
+    b = _processo(PRAZO_ENTRADA_AUSENTE=0)
+    b.esta_revogado('aquecimento')
+    _revogar_em_duas_etapas(_processo(), 'jti-1')
+
+    b.esta_revogado('x')  # marca a ausência
+    b.esta_revogado('x')  # prazo vencido: desiste
+
+    assert b._ausentes == {}
+
+
+def test_compactacao_durante_revogacao_nao_a_esconde_de_processos_novos():
+    a, compactador = _processo(), _processo()
+    a.revogar('jti-1', _expira_em())
+    concluir = _revogar_em_duas_etapas(a, 'jti-2')
+
+    resultado = compactador.compactar()
+    concluir()
+
+    assert resultado['revogacoes_ativas'] == 1
+    assert resultado['seq_minimo'] == 0
+    novo = _processo()
+    assert novo.esta_revogado('jti-1')
+    assert novo.esta_revogado('jti-2')
+    assert compactador.esta_revogado('jti-2')
+
+
+@pytest.mark.parametrize('snapshot_antigo', [True, False])
+def test_processo_novo_parte_do_snapshot(snapshot_antigo):
+    a = _processo()
+    a.revogar('jti-1', _expira_em())
+    a.compactar()
+    if snapshot_antigo:
+        seq, bits, _ = a.cache.get('denylist:snapshot')
+        a.cache.set('denylist:snapshot', (seq, bits), None)
+    a.revogar('jti-2', _expira_em())
+
+    novo = _processo()
+
+    assert novo.esta_revogado('jti-1')
+    assert novo.esta_revogado('jti-2')
+
+
+# Benchmark: filtro no tamanho de produção (1M revogações) com ~50% dos bits ligados,
+# a ocupação de um filtro cheio. Inserir 1M jtis levaria ~8s, então o snapshot
+# publicado traz bits aleatórios com a mesma ocupação e a mesma taxa de falso positivo.
+# Mediana medida em torno de 4µs para o "não revogado"
+LIMITE_VERIFICACAO_US = 50
+
+
+@pytest.mark.benchmark
+def test_verificacao_com_um_milhao_de_revogacoes(mediana_us):
+    processo = _processo(CAPACIDADE=1_000_000, SINCRONIZACAO_SEGUNDOS=3600)
+    bits = random.Random(0).randbytes(len(processo._filtro.bits))
+    processo.cache.set(CHAVE_SNAPSHOT, (0, bits, []), None)
+    processo.revogar('jti-revogado', _expira_em())
+
+    assert processo.esta_revogado('jti-revogado')  # sincroniza a partir do snapshot
+    # ~0,1% dos jtis livres são falsos positivos e vão ao cache: mede um fora deles
+    livre = next(jti for jti in (f'jti-livre-{i}' for i in range(100)) if jti not in processo._filtro)
+    with mock.patch.object(type(processo.cache), 'get', autospec=True) as leitura:
+        assert not processo.esta_revogado(livre)
+        mediana = mediana_us(lambda: processo.esta_revogado(livre), repeticoes=1000)
+
+    # O caso comum não vai ao cache
+    assert leitura.call_count == 0
+    assert mediana < LIMITE_VERIFICACAO_US
@@ -0,0 +1,150 @@
+"""
+Diretório de usuários: paginação por keyset em (date_joined, id), sem COUNT nem OFFSET
+"""
+
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.usuarios.views.diretorio_views import UsuarioDiretorioPagination
+
+User = get_user_model()
+
+URL_DIRETORIO = reverse('usuarios:usuarios_diretorio')
+
+
+@pytest.fixture
+def cliente_admin(api_client, admin_user):
+    api_client.force_authenticate(admin_user)
+    return api_client
+
+
+@pytest.fixture
+def usuarios(db, admin_user):
+    # Pares com a mesma date_joined: o id desempata a ordem
+    base = timezone.now() - timedelta(days=30)
+    User.objects.bulk_create([
+        User(username=f'pessoa{n:02d}', email=f'pessoa{n:02d}@exemplo.com',
+             date_joined=base + timedelta(days=n // 2))
+        for n in range(11)
+    ])
+    User.objects.filter(pk=admin_user.pk).update(date_joined=base - timedelta(days=1))
+    return list(User.objects.order_by('-date_joined', '-pk').values_list('username', flat=True))
+
+
+def _paginas(cliente, url, chave='next'):
+    while url:
+        dados = cliente.get(url).data
+        yield dados
+        url = dados[chave]
+
+
+def test_percorre_todas_as_paginas_sem_repetir_nem_pular(cliente_admin, usuarios):
+    paginas = list(_paginas(cliente_admin, f'{URL_DIRETORIO}?limite=4'))
+
+    nomes = [item['username'] for pagina in paginas for item in pagina['results']]
+    assert nomes == usuarios
+    assert len(paginas) == 3
+    assert paginas[0]['previous'] is None
+
+
+def test_volta_pelas_paginas_anteriores(cliente_admin, usuarios):
+    ultima = list(_paginas(cliente_admin, f'{URL_DIRETORIO}?limite=4'))[-1]
+
+    paginas = list(_paginas(cliente_admin, ultima['previous'], chave='previous'))
+
+    nomes = [item['username'] for pagina in reversed(paginas) for item in pagina['results']]
+    assert nomes == usuarios[:8]
+
+
+def test_pagina_profunda_sem_count_nem_offset(cliente_admin, usuarios):
+    primeira = cliente_admin.get(f'{URL_DIRETORIO}?limite=4').data
+
+    with CaptureQueriesContext(connection) as contexto:
+        cliente_admin.get(primeira['next'])
+
+    sql = ' '.join(consulta['sql'].upper() for consulta in contexto.captured_queries)
+    assert 'COUNT(' not in sql
+    assert 'OFFSET' not in sql
+
+
+def test_cursor_invalido_responde_404(cliente_admin, usuarios):
+    assert cliente_admin.get(f'{URL_DIRETORIO}?cursor=invalido').status_code == 404
+
+
+def test_busca_por_prefixo_de_email_sem_diferenciar_maiusculas(cliente_admin, usuarios):
+    resposta = cliente_admin.get(f'{URL_DIRETORIO}?busca=PESSOA1')
+
+    assert sorted(item['username'] for item in resposta.data['results']) == ['pessoa10']
+
+
+def test_total_aproximado_e_nulo_fora_do_postgresql(cliente_admin, usuarios):
+    resposta = cliente_admin.get(f'{URL_DIRETORIO}?total=aproximado')
+
+    if connection.vendor == 'postgresql':
+        assert isinstance(resposta.data['total_aproximado'], int)
+    else:
+        assert resposta.data['total_aproximado'] is None
+
+
+@pytest.mark.parametrize('valor', ['2024-02-30', '2024-02-30T10:00:00', '2024-13-01', 'ontem'])
+def test_data_invalida_responde_400(cliente_admin, usuarios, valor):
+    resposta = cliente_admin.get(URL_DIRETORIO, {'desde': valor})
+
+    assert resposta.status_code == 400
+    assert 'desde' in resposta.data
+
+
+def test_filtro_por_dia_inteiro(cliente_admin, usuarios):
+    dia = timezone.localdate(timezone.now() - timedelta(days=30)).isoformat()
+
+    resposta = cliente_admin.get(URL_DIRETORIO, {'desde': dia, 'ate': dia})
+
+    assert sorted(item['username'] for item in resposta.data['results']) == ['pessoa00', 'pessoa01']
+
+
+def test_somente_staff(api_client, usuario):
+    api_client.force_authenticate(usuario)
+
+    assert api_client.get(URL_DIRETORIO).status_code == 403
+
+
+# Benchmark: página 1 x página 10.000. Com limite=2 bastam 20k usuários para chegar
+# à página 10.000 (com o limite padrão seriam 200k linhas criadas a cada execução)
+LIMITE_BENCHMARK = 2
+PAGINA_PROFUNDA = 10_000
+# Medidas em torno de 3ms e 4ms no SQLite; OFFSET cresceria com a página
+RAZAO_MAXIMA = 3
+
+
+@pytest.mark.benchmark
+@pytest.mark.django_db
+def test_pagina_profunda_com_a_mesma_latencia_da_primeira(cliente_admin, mediana_us):
+    base = timezone.now() - timedelta(days=365)
+    User.objects.bulk_create(
+        [User(username=f'massa{n:05d}', email=f'massa{n:05d}@exemplo.com', date_joined=base + timedelta(minutes=n))
+         for n in range(LIMITE_BENCHMARK * PAGINA_PROFUNDA)],
+        batch_size=1000,
+    )
+    # Cursor do último item da página 9.999, como o 'next' que o cliente receberia
+    ultimo = User.objects.order_by('-date_joined', '-pk')[LIMITE_BENCHMARK * (PAGINA_PROFUNDA - 1) - 1]
+    cursor = UsuarioDiretorioPagination().codificar_cursor(ultimo, voltando=False)
+    primeira = f'{URL_DIRETORIO}?limite={LIMITE_BENCHMARK}'
+    profunda = f'{primeira}&cursor={cursor}'
+
+    consultas = {}
+    for nome, url in (('primeira', primeira), ('profunda', profunda)):
+        with CaptureQueriesContext(connection) as contexto:
+            assert len(cliente_admin.get(url).data['results']) == LIMITE_BENCHMARK
+        consultas[nome] = [consulta['sql'].upper() for consulta in contexto.captured_queries]
+
+    assert len(consultas['profunda']) == len(consultas['primeira'])
+    assert not any('OFFSET' in sql or 'COUNT(' in sql for sql in consultas['profunda'])
+    tempo_primeira = mediana_us(lambda: cliente_admin.get(primeira), repeticoes=30)
+    tempo_profunda = mediana_us(lambda: cliente_admin.get(profunda), repeticoes=30)
+    assert tempo_profunda < tempo_primeira * RAZAO_MAXIMA
@@ -0,0 +1,119 @@
+"""
+DispatchAuthentication: escolhe um único autenticador pela credencial presente
+"""
+
+from unittest import mock
+
+import pytest
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.test import Client, RequestFactory
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.request import Request
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.usuarios.auth.authentication import DispatchAuthentication
+
+URL_PERFIL = reverse('usuarios:user_profile')
+
+
+@pytest.mark.django_db
+def test_bearer_decodifica_o_jwt_uma_vez(api_client, usuario):
+    api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(usuario)}')
+
+    with mock.patch.object(
+        JWTAuthentication, 'get_validated_token', autospec=True,
+        side_effect=JWTAuthentication.get_validated_token,
+    ) as validar:
+        resposta = api_client.get(URL_PERFIL)
+
+    assert resposta.status_code == 200
+    assert resposta.data['email'] == usuario.email
+    assert validar.call_count == 1
+
+
+@pytest.mark.django_db
+def test_cookie_jwt_autentica_sem_header(api_client, usuario):
+    api_client.cookies['auth-token'] = str(AccessToken.for_user(usuario))
+
+    resposta = api_client.get(URL_PERFIL)
+
+    assert resposta.status_code == 200
+
+
+@pytest.mark.django_db
+def test_header_tem_precedencia_sobre_o_cookie(api_client, usuario):
+    api_client.cookies['auth-token'] = str(AccessToken.for_user(usuario))
+    api_client.credentials(HTTP_AUTHORIZATION='Bearer token-invalido')
+
+    assert api_client.get(URL_PERFIL).status_code == 401
+
+
+@pytest.mark.django_db
+def test_sessao_autentica_pelo_cookie_de_sessao(api_client, usuario):
+    api_client.force_login(usuario)
+
+    assert api_client.get(URL_PERFIL).status_code == 200
+
+
+@pytest.mark.django_db
+def test_sem_credencial_e_anonimo(api_client):
+    resposta = api_client.get(URL_PERFIL)
+
+    assert resposta.status_code == 401
+    assert resposta['WWW-Authenticate'].startswith('Bearer')
+
+
+# Benchmark: custo da autenticação por tipo de credencial, já com o snapshot do usuário em cache.
+# Medianas em torno de 0,1ms (anônimo), 0,3ms (JWT), 0,8ms (token) e 1,3ms (sessão) no SQLite;
+# o limite só pega regressões grosseiras
+LIMITE_AUTENTICACAO_US = 5_000
+
+
+@pytest.fixture
+def credenciais(usuario):
+    sessao = Client()
+    sessao.force_login(usuario)
+    jwt = str(AccessToken.for_user(usuario))
+    return {
+        'jwt': ({'HTTP_AUTHORIZATION': f'Bearer {jwt}'}, {}),
+        'jwt_cookie': ({}, {'auth-token': jwt}),
+        'token': ({'HTTP_AUTHORIZATION': f'Token {Token.objects.create(user=usuario).key}'}, {}),
+        'sessao': ({}, {settings.SESSION_COOKIE_NAME: sessao.cookies[settings.SESSION_COOKIE_NAME].value}),
+        'anonimo': ({}, {}),
+    }
+
+
+def _autenticar(headers, cookies):
+    request = RequestFactory().get(URL_PERFIL, **headers)
+    request.COOKIES.update(cookies)
+    # Sessão: o SessionAuthentication lê request.user preenchido pelos middlewares
+    SessionMiddleware(lambda request: None).process_request(request)
+    AuthenticationMiddleware(lambda request: None).process_request(request)
+    return DispatchAuthentication().authenticate(Request(request))
+
+
+@pytest.mark.benchmark
+@pytest.mark.django_db
+@pytest.mark.parametrize('metodo, consultas', [
+    ('jwt', 0), ('jwt_cookie', 0), ('token', 1), ('sessao', 2), ('anonimo', 0),
+])
+def test_custo_por_credencial(credenciais, mediana_us, django_assert_max_num_queries, metodo, consultas):
+    headers, cookies = credenciais[metodo]
+    resultado = _autenticar(headers, cookies)  # aquece o snapshot do usuário
+    assert (resultado is None) == (metodo == 'anonimo')
+
+    # JWT com snapshot em cache não consulta o banco; token: token + usuário; sessão: sessão e usuário
+    with django_assert_max_num_queries(consultas):
+        _autenticar(headers, cookies)
+    with mock.patch.object(
+        JWTAuthentication, 'get_validated_token', autospec=True,
+        side_effect=JWTAuthentication.get_validated_token,
+    ) as validar:
+        _autenticar(headers, cookies)
+    assert validar.call_count == (1 if metodo.startswith('jwt') else 0)
+
+    assert mediana_us(lambda: _autenticar(headers, cookies), repeticoes=50) < LIMITE_AUTENTICACAO_US
@@ -0,0 +1,81 @@
+"""
+Outbox de emails: corpo apagado após o envio, fora do admin, e retenção das linhas finalizadas
+"""
+
+import io
+from datetime import timedelta
+
+import pytest
+from django.contrib.admin.sites import site
+from django.core import mail
+from django.core.management import call_command
+from django.utils import timezone
+
+from apps.usuarios.models import EmailOutbox
+from apps.usuarios.services.email_service import enfileirar_email, processar_lote, purgar_finalizados
+
+
+def _email(corpo='Link de reset: https://exemplo.com/reset/abc/token-secreto/'):
+    return enfileirar_email('Redefinição de senha', corpo, ['maria@exemplo.com'])
+
+
+def _envelhecer(email, dias):
+    EmailOutbox.objects.filter(pk=email.pk).update(criado_em=timezone.now() - timedelta(days=dias))
+
+
+@pytest.mark.django_db
+def test_envio_apaga_o_corpo():
+    email = _email()
+
+    assert processar_lote()['enviados'] == 1
+
+    assert 'token-secreto' in mail.outbox[0].body
+    email.refresh_from_db()
+    assert email.status == EmailOutbox.Status.ENVIADO
+    assert email.corpo == ''
+
+
+@pytest.mark.django_db
+def test_falha_definitiva_apaga_o_corpo(settings):
+    settings.EMAIL_BACKEND = 'backend.inexistente.EmailBackend'
+    email = _email()
+
+    assert processar_lote(max_tentativas=1)['falhas'] == 1
+
+    email.refresh_from_db()
+    assert email.status == EmailOutbox.Status.FALHOU
+    assert email.corpo == ''
+
+
+@pytest.mark.django_db
+def test_admin_nao_exibe_o_corpo(rf, admin_user):
+    request = rf.get('/')
+    request.user = admin_user
+
+    formulario = site._registry[EmailOutbox].get_form(request, _email())
+
+    assert 'corpo' not in formulario.base_fields
+
+
+@pytest.mark.django_db
+def test_purga_remove_so_finalizados_antigos():
+    antigo_enviado, antigo_pendente, recente_enviado = _email(), _email(), _email()
+    EmailOutbox.objects.filter(pk__in=[antigo_enviado.pk, recente_enviado.pk]).update(
+        status=EmailOutbox.Status.ENVIADO)
+    _envelhecer(antigo_enviado, 8)
+    _envelhecer(antigo_pendente, 8)
+
+    assert purgar_finalizados(7) == 1
+    assert set(EmailOutbox.objects.values_list('pk', flat=True)) == {antigo_pendente.pk, recente_enviado.pk}
+
+
+@pytest.mark.django_db
+def test_comando_aplica_a_retencao(settings):
+    settings.EMAIL_OUTBOX_RETENCAO_DIAS = 3
+    email = _email()
+    processar_lote()
+    _envelhecer(email, 4)
+
+    call_command('processar_emails', stdout=io.StringIO())
+
+    assert not EmailOutbox.objects.exists()
@@ -0,0 +1,56 @@
+"""
+Email único sem diferenciar maiúsculas: índice funcional usuarios_user_email_ci_uniq
+"""
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, connection, transaction
+from django.urls import reverse
+
+from apps.usuarios.managers import INDICE_EMAIL_UNICO, filtrar_por_email, violacao_email_unico
+
+User = get_user_model()
+
+URL_REGISTRO = reverse('usuarios:custom_register')
+
+
+@pytest.mark.django_db
+def test_indice_impede_email_repetido_com_outra_caixa(usuario):
+    with pytest.raises(IntegrityError) as erro, transaction.atomic():
+        User.objects.create(username='outra', email='MARIA@EXEMPLO.COM')
+
+    assert violacao_email_unico(erro.value)
+
+
+@pytest.mark.django_db
+def test_emails_vazios_ficam_fora_da_restricao():
+    User.objects.create(username='sem-email-1', email='')
+    User.objects.create(username='sem-email-2', email='')
+
+    assert User.objects.filter(email='').count() == 2
+
+
+@pytest.mark.django_db
+def test_registro_com_email_repetido_responde_400(api_client, usuario):
+    resposta = api_client.post(URL_REGISTRO, {
+        'email': 'maria@EXEMPLO.com', 'password1': 'senha-forte-123', 'password2': 'senha-forte-123',
+    }, format='json')
+
+    assert resposta.status_code == 400
+    assert resposta.data['error'] == 'Email já está em uso'
+    assert User.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_busca_por_email_usa_o_indice_funcional(usuario):
+    consulta = filtrar_por_email(User.objects.all(), 'MARIA@Exemplo.com')
+
+    if connection.vendor == 'postgresql':
+        # Com poucas linhas o planner preferiria o seq scan
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+    elif connection.vendor != 'sqlite':
+        pytest.skip('índice funcional só é criado no PostgreSQL e no SQLite')
+
+    assert INDICE_EMAIL_UNICO in consulta.explain()
+    assert list(consulta.values_list('pk', flat=True)) == [usuario.pk]
@@ -0,0 +1,63 @@
+"""
+Exportação em streaming: gerador síncrono no WSGI e assíncrono (lote a lote) no ASGI
+"""
+
+import json
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.test import AsyncClient, Client
+from django.urls import reverse
+
+from apps.usuarios.views import UsuarioExportView
+
+User = get_user_model()
+
+URL_EXPORT = reverse('usuarios:usuarios_export')
+
+
+@pytest.fixture
+def usuarios(db, admin_user, monkeypatch):
+    monkeypatch.setattr(UsuarioExportView, 'tamanho_lote', 2)
+    User.objects.bulk_create([User(username=f'u{n}', email=f'u{n}@exemplo.com') for n in range(4)])
+    return admin_user
+
+
+def _linhas_ndjson(conteudo: bytes):
+    return [json.loads(linha) for linha in conteudo.decode().splitlines()]
+
+
+def test_wsgi_usa_gerador_sincrono(usuarios):
+    cliente = Client()
+    cliente.force_login(usuarios)
+
+    resposta = cliente.get(URL_EXPORT)
+
+    assert resposta.status_code == 200
+    assert not resposta.is_async
+    linhas = _linhas_ndjson(b''.join(resposta.streaming_content))
+    assert [linha['username'] for linha in linhas] == ['admin', 'u0', 'u1', 'u2', 'u3']
+
+
+@pytest.mark.parametrize('formato', ['ndjson', 'csv'])
+def test_asgi_usa_gerador_assincrono_com_um_chunk_por_lote(usuarios, formato):
+    cliente = AsyncClient()
+    cliente.force_login(usuarios)
+
+    async def exportar():
+        resposta = await cliente.get(URL_EXPORT, {'formato': formato})
+        return resposta, [chunk async for chunk in resposta.streaming_content]
+
+    resposta, chunks = async_to_sync(exportar)()
+
+    assert resposta.status_code == 200
+    assert resposta.is_async
+    if formato == 'ndjson':
+        assert len(chunks) == 3  # 5 usuários em lotes de 2
+        assert [linha['username'] for linha in _linhas_ndjson(b''.join(chunks))][-1] == 'u3'
+    else:
+        assert len(chunks) == 4  # cabeçalho + 3 lotes
+        linhas = b''.join(chunks).decode().splitlines()
+        assert linhas[0].startswith('pk,')
+        assert len(linhas) == 6
@@ -0,0 +1,98 @@
+"""
+Importação em massa de usuários (importar_usuarios): duplicados, conflitos e nova execução
+"""
+
+import json
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+
+from apps.usuarios.management.commands import importar_usuarios
+from apps.usuarios.management.commands.importar_usuarios import Command
+
+User = get_user_model()
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def importar(tmp_path):
+    relatorio = tmp_path / 'erros.jsonl'
+
+    def importar(linhas, **opcoes):
+        arquivo = tmp_path / 'usuarios.jsonl'
+        arquivo.write_text(''.join(json.dumps(linha) + '\n' for linha in linhas), encoding='utf-8')
+        relatorio.unlink(missing_ok=True)
+        call_command('importar_usuarios', str(arquivo), workers=1, relatorio=str(relatorio),
+                     stdout=StringIO(), **opcoes)
+        if not relatorio.exists():
+            return []
+        return [json.loads(linha) for linha in relatorio.read_text(encoding='utf-8').splitlines()]
+
+    return importar
+
+
+def _linha(email, senha='senha-forte-123'):
+    return {'email': email, 'first_name': email.split('@')[0], 'last_name': '', 'password': senha}
+
+
+def test_duplicados_no_arquivo_e_no_banco_sao_rejeitados(importar, django_user_model):
+    django_user_model.objects.create_user(username='existente', email='Existente@Exemplo.com')
+
+    erros = importar([
+        _linha('ana@exemplo.com'),
+        _linha('ANA@exemplo.com'),
+        _linha('existente@exemplo.com'),
+        _linha('invalido'),
+    ])
+
+    assert {(erro['linha'], erro['erro']) for erro in erros} == {
+        (2, 'Email repetido no arquivo'),
+        (3, 'Email já está em uso'),
+        (4, 'Email inválido'),
+    }
+    ana = User.objects.get(email='ana@exemplo.com')
+    assert ana.username == 'ana'
+    assert ana.check_password('senha-forte-123')
+
+
+def test_consulta_de_existentes_dividida_abaixo_do_limite_do_sqlite(importar, monkeypatch):
+    monkeypatch.setattr(importar_usuarios, 'EMAILS_POR_CONSULTA', 2)
+    for numero in range(0, 6, 2):
+        User.objects.create_user(username=f'antigo{numero}', email=f'pessoa{numero}@exemplo.com')
+
+    erros = importar([_linha(f'pessoa{numero}@exemplo.com') for numero in range(6)], lote=6)
+
+    assert sorted(erro['email'] for erro in erros) == ['pessoa0@exemplo.com', 'pessoa2@exemplo.com', 'pessoa4@exemplo.com']
+    assert User.objects.filter(email__startswith='pessoa').count() == 6
+
+
+def test_username_ocupado_por_cadastro_concorrente_e_realocado(importar, monkeypatch):
+    inserir = Command._inserir
+
+    def inserir_com_concorrente(self, usuarios):
+        # Outro cadastro grava 'ana' e 'bia@...' entre a alocação e o INSERT
+        User.objects.create_user(username='ana', email='outra-ana@exemplo.com')
+        User.objects.create_user(username='outra-bia', email='bia@exemplo.com')
+        return inserir(self, usuarios)
+
+    monkeypatch.setattr(Command, '_inserir', inserir_com_concorrente)
+
+    erros = importar([_linha('ana@exemplo.com'), _linha('bia@exemplo.com'), _linha('caio@exemplo.com')])
+
+    assert [(erro['email'], erro['erro']) for erro in erros] == [('bia@exemplo.com', 'Email já está em uso')]
+    assert User.objects.get(email='ana@exemplo.com').username == 'ana1'
+    assert User.objects.get(email='caio@exemplo.com').username == 'caio'
+
+
+def test_nova_execucao_retoma_sem_duplicar(importar):
+    linhas = [_linha(f'lote{numero}@exemplo.com') for numero in range(5)]
+
+    assert importar(linhas[:3], lote=2) == []
+    erros = importar(linhas, lote=2)
+
+    assert sorted(erro['email'] for erro in erros) == [f'lote{numero}@exemplo.com' for numero in range(3)]
+    assert {erro['erro'] for erro in erros} == {'Email já está em uso'}
+    assert User.objects.filter(email__startswith='lote').count() == 5
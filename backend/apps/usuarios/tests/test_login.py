@@ -0,0 +1,55 @@
+"""
+Login por email (EmailBackend): uma única consulta ao auth_user por tentativa
+"""
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+URL_LOGIN = reverse('usuarios:custom_login')
+
+
+def _selects_auth_user(contexto):
+    return [
+        consulta['sql'] for consulta in contexto.captured_queries
+        if consulta['sql'].lstrip().upper().startswith('SELECT') and 'auth_user' in consulta['sql']
+    ]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('email, senha, status', [
+    ('maria@exemplo.com', 'senha-forte-123', 200),
+    ('MARIA@EXEMPLO.COM', 'senha-forte-123', 200),
+    ('maria@exemplo.com', 'senha-errada', 401),
+    ('ninguem@exemplo.com', 'senha-forte-123', 401),
+])
+def test_login_faz_um_select_por_tentativa(api_client, usuario, email, senha, status):
+    with CaptureQueriesContext(connection) as contexto:
+        resposta = api_client.post(URL_LOGIN, {'email': email, 'password': senha}, format='json')
+
+    assert resposta.status_code == status
+    assert len(_selects_auth_user(contexto)) == 1
+
+
+@pytest.mark.django_db
+def test_login_devolve_tokens_e_usuario(api_client, usuario):
+    resposta = api_client.post(
+        URL_LOGIN, {'email': 'maria@exemplo.com', 'password': 'senha-forte-123'}, format='json'
+    )
+
+    assert resposta.status_code == 200
+    assert resposta.data['user']['email'] == 'Maria@exemplo.com'
+    assert resposta.data['access'] and resposta.data['refresh']
+
+
+@pytest.mark.django_db
+def test_login_de_conta_desativada(api_client, usuario):
+    usuario.is_active = False
+    usuario.save()
+
+    resposta = api_client.post(
+        URL_LOGIN, {'email': 'maria@exemplo.com', 'password': 'senha-forte-123'}, format='json'
+    )
+
+    assert resposta.status_code == 401
@@ -0,0 +1,132 @@
+"""
+Pool limitado de hashing de senhas (senha_service)
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+
+import pytest
+from django.contrib.auth.hashers import make_password
+from django.urls import reverse
+
+from apps.usuarios.services import senha_service
+from core.erros.exceptions import PoolSenhaSaturadoErro
+
+
+@pytest.fixture
+def pool_pequeno(monkeypatch):
+    """Pool com um worker e nenhuma vaga de fila, trocado só durante o teste"""
+    executor = ThreadPoolExecutor(max_workers=1)
+    vagas = threading.BoundedSemaphore(1)
+    monkeypatch.setattr(senha_service, '_executor', executor)
+    monkeypatch.setattr(senha_service, '_vagas', vagas)
+    yield executor, vagas
+    executor.shutdown(wait=True)
+
+
+def _ocupar(executor_e_vagas):
+    """Ocupa a única vaga com um job que só termina quando o evento é liberado"""
+    liberar = threading.Event()
+    future = senha_service._submeter(liberar.wait)
+    return liberar, future
+
+
+def test_verificar_e_definir_senha(db, django_user_model):
+    user = django_user_model(username='ana')
+    senha_service.definir_senha(user, 'segredo-123')
+
+    assert user.password.startswith('md5$')
+    assert senha_service.verificar_senha(user, 'segredo-123')
+    assert not senha_service.verificar_senha(user, 'outra')
+
+
+def test_pool_saturado_rejeita_na_hora(pool_pequeno):
+    liberar, future = _ocupar(pool_pequeno)
+    try:
+        with pytest.raises(PoolSenhaSaturadoErro):
+            senha_service._executar(make_password, 'x')
+    finally:
+        liberar.set()
+        future.result(timeout=5)
+
+    assert senha_service._executar(make_password, 'x')
+
+
+def test_vaga_so_volta_quando_o_job_termina(pool_pequeno):
+    """Quem espera pode desistir (timeout); a vaga segue ocupada enquanto o job roda"""
+    _, vagas = pool_pequeno
+    liberar, future = _ocupar(pool_pequeno)
+
+    with pytest.raises(FuturesTimeoutError):
+        future.result(timeout=0.05)
+    assert not vagas.acquire(blocking=False)
+
+    liberar.set()
+    future.result(timeout=5)
+    senha_service._executor.submit(lambda: None).result(timeout=5)
+    assert vagas.acquire(blocking=False)
+    vagas.release()
+
+
+def test_login_com_pool_saturado_responde_503(api_client, usuario, pool_pequeno):
+    liberar, future = _ocupar(pool_pequeno)
+    try:
+        resposta = api_client.post(
+            reverse('usuarios:custom_login'),
+            {'email': 'maria@exemplo.com', 'password': 'senha-forte-123'},
+            format='json',
+        )
+    finally:
+        liberar.set()
+        future.result(timeout=5)
+
+    assert resposta.status_code == 503
+    assert resposta['Retry-After'] == '1'
+
+
+def test_registro_com_pool_saturado_responde_503(api_client, db, pool_pequeno, django_user_model):
+    liberar, future = _ocupar(pool_pequeno)
+    try:
+        resposta = api_client.post(reverse('usuarios:custom_register'), {
+            'email': 'novo@exemplo.com',
+            'password1': 'senha-forte-123',
+            'password2': 'senha-forte-123',
+        }, format='json')
+    finally:
+        liberar.set()
+        future.result(timeout=5)
+
+    assert resposta.status_code == 503
+    assert resposta['Retry-After'] == '1'
+    assert not django_user_model.objects.filter(email='novo@exemplo.com').exists()
+
+
+def test_erro_inesperado_no_registro_nao_expoe_detalhes(api_client, db, monkeypatch):
+    from apps.usuarios.views import auth_views
+
+    def falhar(user):
+        raise RuntimeError('host=db-interno password=segredo')
+
+    monkeypatch.setattr(auth_views, 'salvar_com_username_unico', falhar)
+    resposta = api_client.post(reverse('usuarios:custom_register'), {
+        'email': 'novo@exemplo.com',
+        'password1': 'senha-forte-123',
+        'password2': 'senha-forte-123',
+    }, format='json')
+
+    assert resposta.status_code == 500
+    assert 'segredo' not in resposta.content.decode()
+
+
+def test_troca_de_senha_usa_o_pool(api_client, usuario):
+    api_client.force_authenticate(usuario)
+    resposta = api_client.post(reverse('usuarios:change_password'), {
+        'old_password': 'senha-forte-123',
+        'new_password1': 'Nova-senha-456',
+        'new_password2': 'Nova-senha-456',
+    }, format='json')
+
+    assert resposta.status_code == 200
+    usuario.refresh_from_db()
+    assert usuario.check_password('Nova-senha-456')
@@ -0,0 +1,123 @@
+"""
+Alocação de usernames: lote limitado de candidatos por consulta, sem varrer o prefixo
+"""
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from apps.usuarios.models import Usuario
+from apps.usuarios.services.username_service import (
+    LOTE_CANDIDATOS,
+    AlocadorUsernames,
+    gerar_username_unico,
+)
+
+User = get_user_model()
+
+
+def _criar(*usernames):
+    return User.objects.bulk_create([User(username=nome, email=f'{nome}@exemplo.com') for nome in usernames])
+
+
+@pytest.mark.django_db
+def test_base_livre_em_uma_consulta_sem_ler_nomes_com_o_mesmo_prefixo():
+    _criar('contatoxyz', 'contato_loja', 'contato1a')
+
+    with CaptureQueriesContext(connection) as contexto:
+        assert gerar_username_unico('contato') == 'contato'
+
+    assert len(contexto.captured_queries) == 1
+    assert 'LIKE' not in contexto.captured_queries[0]['sql'].upper()
+
+
+@pytest.mark.django_db
+def test_preenche_o_menor_sufixo_livre():
+    _criar('ana', 'ana1', 'ana3')
+
+    assert gerar_username_unico('ana') == 'ana2'
+
+
+@pytest.mark.django_db
+def test_considera_reservados_e_ignora_o_proprio_usuario():
+    (ana,) = _criar('ana')
+
+    assert gerar_username_unico('ana', reservados=['ana1']) == 'ana2'
+    assert gerar_username_unico('ana', exclude_pk=ana.pk) == 'ana'
+
+
+@pytest.mark.django_db
+def test_lote_esgotado_segue_do_maior_sufixo_em_uso():
+    _criar('ana', *(f'ana{n}' for n in range(1, LOTE_CANDIDATOS + 1)), 'ana57', 'ana1234567890123')
+
+    with CaptureQueriesContext(connection) as contexto:
+        assert gerar_username_unico('ana') == 'ana58'
+
+    assert len(contexto.captured_queries) == 2
+
+
+@pytest.mark.django_db
+def test_alocador_reserva_entre_chamadas():
+    _criar('joao', 'joao2')
+    alocador = AlocadorUsernames()
+
+    assert [alocador.alocar('joao') for _ in range(3)] == ['joao1', 'joao3', 'joao4']
+    # 'joao1' reservado também conta como a base 'joao1'
+    assert alocador.alocar('joao1') == 'joao11'
+
+
+@pytest.mark.django_db
+def test_alocador_verifica_bases_em_grupos():
+    bases = [f'pessoa{letra}{numero}x' for letra in 'abc' for numero in range(30)]
+    _criar(bases[0], f'{bases[0]}1')
+    alocador = AlocadorUsernames()
+
+    with CaptureQueriesContext(connection) as contexto:
+        alocador.carregar(bases)
+
+    assert len(contexto.captured_queries) == -(-len(bases) // AlocadorUsernames.BASES_POR_CONSULTA)
+    assert alocador.alocar(bases[0]) == f'{bases[0]}2'
+    assert alocador.alocar(bases[1]) == bases[1]
+
+
+@pytest.mark.django_db
+def test_alocador_com_lote_esgotado():
+    _criar('bia', *(f'bia{n}' for n in range(1, LOTE_CANDIDATOS + 1)), 'bia40')
+    alocador = AlocadorUsernames()
+
+    assert [alocador.alocar('bia') for _ in range(2)] == ['bia41', 'bia42']
+
+
+# Benchmark: cadastros com a mesma parte local ('contato@'). Os 10k usernames já
+# existentes entram por bulk_create; cadastrar todos pelo save() levaria minutos.
+# No SQLite a agregação do maior sufixo percorre as linhas do prefixo (REGEXP em
+# Python): mediana em torno de 30ms por cadastro; o limite só pega regressões grosseiras
+CADASTROS_EXISTENTES = 10_000
+LIMITE_CADASTRO_US = 250_000
+
+
+def _cadastrar(dominio):
+    return Usuario.objects.create(email=f'contato@{dominio}.com')
+
+
+@pytest.mark.benchmark
+@pytest.mark.django_db
+def test_cadastro_com_dez_mil_homonimos_em_consultas_constantes(mediana_us):
+    for indice in range(LOTE_CANDIDATOS // 2):
+        _cadastrar(f'loja{indice}')
+    with CaptureQueriesContext(connection) as poucos:
+        assert _cadastrar('loja-dez').username == f'contato{LOTE_CANDIDATOS // 2}'
+
+    User.objects.bulk_create(
+        [User(username=f'contato{sufixo}', email=f'contato@filial{sufixo}.com')
+         for sufixo in range(LOTE_CANDIDATOS // 2 + 1, CADASTROS_EXISTENTES)],
+        batch_size=500,
+    )
+    with CaptureQueriesContext(connection) as muitos:
+        assert _cadastrar('loja-dez-mil').username == f'contato{CADASTROS_EXISTENTES}'
+
+    # Lote esgotado: só a agregação do maior sufixo a mais, não uma consulta por colisão
+    assert len(muitos.captured_queries) <= len(poucos.captured_queries) + 1
+    dominios = iter(range(30))
+    assert mediana_us(lambda: _cadastrar(f'nova{next(dominios)}'), repeticoes=20) < LIMITE_CADASTRO_US
@@ -1,9 +1,14 @@
-from django.urls import path, include
+from django.urls import path, re_path, include
 from .. import views
 
 app_name = 'usuarios'
 
 urlpatterns = [
+    # Refresh e logout com denylist de refresh tokens (precedem as do dj-rest-auth)
+    re_path(r'^auth/token/refresh/?$',
+            views.DenylistTokenRefreshView.as_view(), name='token_refresh'),
+    re_path(r'^auth/logout/?$', views.DenylistLogoutView.as_view(), name='rest_logout'),
+
     # URLs do dj-rest-auth (login, logout, user details, etc.)
     path('auth/', include('dj_rest_auth.urls')),
 
@@ -24,4 +29,8 @@ urlpatterns = [
     path('auth/password-reset/confirm/',
          views.PasswordResetConfirmView.as_view(), name='password_reset_confirm'),
     path('auth/profile/', views.user_profile, name='user_profile'),
+
+    # Diretório e exportação da base de usuários (somente staff)
+    path('diretorio/', views.UsuarioDiretorioView.as_view(), name='usuarios_diretorio'),
+    path('export/', views.UsuarioExportView.as_view(), name='usuarios_export'),
 ]
@@ -9,6 +9,12 @@ from .auth_views import (
     PasswordResetConfirmView,
     user_profile
 )
+from .token_views import (
+    DenylistTokenRefreshView,
+    DenylistLogoutView
+)
+from .export_views import UsuarioExportView
+from .diretorio_views import UsuarioDiretorioView
 
 __all__ = [
     # Auth views
@@ -18,4 +24,11 @@ __all__ = [
     'PasswordResetView',
     'PasswordResetConfirmView',
     'user_profile',
+    # Token views (denylist de refresh tokens)
+    'DenylistTokenRefreshView',
+    'DenylistLogoutView',
+    # Exportação em streaming
+    'UsuarioExportView',
+    # Diretório paginado por keyset
+    'UsuarioDiretorioView',
 ]
@@ -1,16 +1,25 @@
+import logging
+
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from django.contrib.auth import authenticate, get_user_model
+from django.contrib.auth import get_user_model
 from django.contrib.auth.tokens import default_token_generator
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
 from django.utils.encoding import force_bytes, force_str
-from django.core.mail import send_mail
 from django.conf import settings
+from django.db import IntegrityError
 from django.urls import reverse
 from rest_framework_simplejwt.tokens import RefreshToken
+from core.erros.exceptions import PoolSenhaSaturadoErro, UsernameIndisponivelErro
+from core.throttling.throttles import AUTH_THROTTLE_CLASSES
+from ..auth.backends import EmailBackend
+from ..managers import filtrar_por_email, violacao_email_unico
+from ..services.email_service import enfileirar_email
+from ..services.senha_service import definir_senha, verificar_senha
+from ..services.username_service import salvar_com_username_unico
 from ..serializers import (
     LoginSerializer,
     ChangePasswordSerializer,
@@ -20,13 +29,32 @@ from ..serializers import (
 )
 
 User = get_user_model()
+logger = logging.getLogger(__name__)
+
+
+class HashingSenhaMixin:
+    """
+    Views que fazem hashing de senha no pool limitado (senha_service): com o pool
+    saturado respondem 503 na hora, com Retry-After, em vez de enfileirar a requisição.
+    """
+
+    def handle_exception(self, exc):
+        if isinstance(exc, PoolSenhaSaturadoErro):
+            response = Response({'error': exc.mensagem}, status=exc.status_code)
+            response['Retry-After'] = '1'
+            return response
+        return super().handle_exception(exc)
 
 
-class CustomRegisterView(APIView):
+class CustomRegisterView(HashingSenhaMixin, APIView):
     """
     View personalizada para registro de usuário sem as complicações do allauth.
     """
     permission_classes = [AllowAny]
+    # Throttling antes de qualquer consulta ao banco ou hashing de senha
+    authentication_classes = []
+    throttle_classes = AUTH_THROTTLE_CLASSES
+    throttle_scope = 'auth'
 
     def post(self, request):
         data = request.data
@@ -41,20 +69,19 @@ class CustomRegisterView(APIView):
         if data.get('password1') != data.get('password2'):
             return Response({'error': 'As senhas não coincidem'}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Verifica se usuário já existe
-        if User.objects.filter(email=data.get('email')).exists():
-            return Response({'error': 'Email já está em uso'}, status=status.HTTP_400_BAD_REQUEST)
-
         try:
-            # Cria o usuário
-            user = User.objects.create_user(
-                username=data.get('email').split(
-                    '@')[0],  # Username baseado no email
-                email=data.get('email'),
-                password=data.get('password1'),
+            # Email repetido é barrado pelo índice único (sem diferenciar
+            # maiúsculas), sem consulta prévia sujeita a corrida.
+
+            # Cria o usuário com username único baseado no email (um INSERT,
+            # com nova tentativa se outra requisição pegar o mesmo username)
+            user = User(
+                email=User.objects.normalize_email(data.get('email')),
                 first_name=data.get('first_name', ''),
                 last_name=data.get('last_name', '')
             )
+            definir_senha(user, data.get('password1'))
+            salvar_com_username_unico(user)
 
             # Gera tokens JWT
             refresh = RefreshToken.for_user(user)
@@ -67,15 +94,32 @@ class CustomRegisterView(APIView):
                 'refresh': str(refresh),
             }, status=status.HTTP_201_CREATED)
 
-        except Exception as e:
-            return Response({'error': f'Erro ao criar usuário: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        except IntegrityError as exc:
+            if violacao_email_unico(exc):
+                return Response({'error': 'Email já está em uso'}, status=status.HTTP_400_BAD_REQUEST)
+            return Response({'error': 'Não foi possível criar o usuário. Verifique os dados e tente novamente.'}, status=status.HTTP_400_BAD_REQUEST)
 
+        except UsernameIndisponivelErro:
+            return Response({'error': 'Não foi possível criar o usuário. Verifique os dados e tente novamente.'}, status=status.HTTP_400_BAD_REQUEST)
 
-class CustomLoginView(APIView):
+        except PoolSenhaSaturadoErro:
+            # 503 com Retry-After pelo HashingSenhaMixin
+            raise
+
+        except Exception:
+            logger.exception("Erro inesperado ao registrar usuário")
+            return Response({'error': 'Erro ao criar usuário. Tente novamente mais tarde.'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class CustomLoginView(HashingSenhaMixin, APIView):
     """
     View personalizada para login com email.
     """
     permission_classes = [AllowAny]
+    # Throttling antes de qualquer consulta ao banco ou hashing de senha
+    authentication_classes = []
+    throttle_classes = AUTH_THROTTLE_CLASSES
+    throttle_scope = 'auth'
 
     def post(self, request):
         serializer = LoginSerializer(data=request.data)
@@ -83,17 +127,9 @@ class CustomLoginView(APIView):
             email = serializer.validated_data['email']
             password = serializer.validated_data['password']
 
-            # Busca usuário pelo email
-            try:
-                user = User.objects.get(email=email)
-                username = user.username
-            except User.DoesNotExist:
-                return Response({
-                    'error': 'Credenciais inválidas'
-                }, status=status.HTTP_401_UNAUTHORIZED)
-
-            # Autentica com username
-            user = authenticate(request, username=username, password=password)
+            # Busca e verifica o usuário pelo email em uma única consulta
+            user = EmailBackend().authenticate(
+                request, email=email, password=password)
 
             if user:
                 if not user.is_active:
@@ -119,7 +155,7 @@ class CustomLoginView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class ChangePasswordView(APIView):
+class ChangePasswordView(HashingSenhaMixin, APIView):
     """
     View para mudança de senha.
     """
@@ -128,17 +164,20 @@ class ChangePasswordView(APIView):
     def post(self, request):
         serializer = ChangePasswordSerializer(data=request.data)
         if serializer.is_valid():
+            # A senha não está no cache de usuário: é lida do banco ao verificar
             user = request.user
 
-            # Verifica senha atual
-            if not user.check_password(serializer.validated_data['old_password']):
+            # Verifica senha atual (hashing no pool limitado de senha_service)
+            if not verificar_senha(user, serializer.validated_data['old_password']):
                 return Response({
                     'error': 'Senha atual incorreta'
                 }, status=status.HTTP_400_BAD_REQUEST)
 
             # Define nova senha
-            user.set_password(serializer.validated_data['new_password1'])
-            user.save()
+            definir_senha(user, serializer.validated_data['new_password1'])
+            # request.user vem do snapshot em cache: grava só a senha, sem
+            # devolver ao banco valores possivelmente antigos dos outros campos
+            user.save(update_fields=['password'])
 
             return Response({
                 'message': 'Senha alterada com sucesso'
@@ -152,6 +191,10 @@ class PasswordResetView(APIView):
     View para solicitação de reset de senha.
     """
     permission_classes = [AllowAny]
+    # Throttling antes de qualquer consulta ao banco ou hashing de senha
+    authentication_classes = []
+    throttle_classes = AUTH_THROTTLE_CLASSES
+    throttle_scope = 'auth'
 
     def post(self, request):
         serializer = ResetPasswordSerializer(data=request.data)
@@ -159,7 +202,7 @@ class PasswordResetView(APIView):
             email = serializer.validated_data['email']
 
             try:
-                user = User.objects.get(email=email)
+                user = filtrar_por_email(User.objects.all(), email).get()
 
                 # Gera token de reset
                 token = default_token_generator.make_token(user)
@@ -183,13 +226,8 @@ class PasswordResetView(APIView):
                 Equipe Odonto Premium
                 """
 
-                send_mail(
-                    subject,
-                    message,
-                    settings.DEFAULT_FROM_EMAIL,
-                    [email],
-                    fail_silently=False,
-                )
+                # Enfileira na outbox; o envio é feito pelo comando processar_emails
+                enfileirar_email(subject, message, [email])
 
                 return Response({
                     'message': 'Email de reset enviado com sucesso'
@@ -204,11 +242,15 @@ class PasswordResetView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class PasswordResetConfirmView(APIView):
+class PasswordResetConfirmView(HashingSenhaMixin, APIView):
     """
     View para confirmação de reset de senha.
     """
     permission_classes = [AllowAny]
+    # Throttling antes de qualquer consulta ao banco ou hashing de senha
+    authentication_classes = []
+    throttle_classes = AUTH_THROTTLE_CLASSES
+    throttle_scope = 'auth'
 
     def post(self, request):
         serializer = PasswordResetConfirmSerializer(data=request.data)
@@ -220,8 +262,7 @@ class PasswordResetConfirmView(APIView):
                 token = serializer.validated_data['token']
 
                 if default_token_generator.check_token(user, token):
-                    user.set_password(
-                        serializer.validated_data['new_password1'])
+                    definir_senha(user, serializer.validated_data['new_password1'])
                     user.save()
 
                     return Response({
@@ -0,0 +1,90 @@
+"""
+Diretório de usuários para o painel administrativo
+Paginação por keyset em (date_joined, id), sem COUNT(*) nem OFFSET
+"""
+from datetime import datetime, time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import ValidationError
+from rest_framework.generics import ListAPIView
+from rest_framework.permissions import IsAdminUser
+
+from core.paginacao.keyset import KeysetPagination
+from ..managers import EmailNormalizado
+from ..serializers import UserDetailsSerializer
+
+User = get_user_model()
+
+_BOOLEANOS = {'true': True, '1': True, 'false': False, '0': False}
+
+
+class UsuarioDiretorioPagination(KeysetPagination):
+    """Mais recentes primeiro; usa o índice usuarios_user_joined_id_idx"""
+    campo_ordenacao = 'date_joined'
+    decrescente = True
+
+
+class UsuarioDiretorioView(ListAPIView):
+    """
+    Lista paginada de usuários (somente staff).
+
+    Filtros:
+    - is_active, is_staff: true/false
+    - busca: prefixo do username ou do email (índices *_like e usuarios_user_email_prefixo_idx)
+    - desde, ate: intervalo de date_joined (data ou data/hora ISO 8601)
+    - limite, cursor, total=aproximado: ver KeysetPagination
+    """
+    permission_classes = [IsAdminUser]
+    serializer_class = UserDetailsSerializer
+    pagination_class = UsuarioDiretorioPagination
+
+    def get_queryset(self):
+        params = self.request.query_params
+        queryset = User._default_manager.all()
+
+        for campo in ('is_active', 'is_staff'):
+            if campo in params:
+                valor = _BOOLEANOS.get(params[campo].lower())
+                if valor is None:
+                    raise ValidationError({campo: 'Use true ou false'})
+                queryset = queryset.filter(**{campo: valor})
+
+        busca = params.get('busca', '').strip()
+        if busca:
+            queryset = queryset.alias(email_normalizado=EmailNormalizado('email')).filter(
+                Q(username__startswith=busca) | Q(email_normalizado__startswith=busca.lower())
+            )
+
+        if params.get('desde'):
+            inicio, _ = self.ler_data('desde', params['desde'])
+            queryset = queryset.filter(date_joined__gte=inicio)
+        if params.get('ate'):
+            fim, somente_data = self.ler_data('ate', params['ate'])
+            if somente_data:
+                # Dia inteiro, mantendo a comparação direta na coluna indexada
+                queryset = queryset.filter(date_joined__lt=fim + timedelta(days=1))
+            else:
+                queryset = queryset.filter(date_joined__lte=fim)
+
+        return queryset
+
+    def ler_data(self, param, valor):
+        """Retorna (datetime com fuso, se era apenas uma data)"""
+        try:
+            # Data antes: parse_datetime também aceita 'AAAA-MM-DD' (meia-noite)
+            data = parse_date(valor)
+            data_hora = None if data is not None else parse_datetime(valor)
+        except ValueError:
+            # Formato certo com valor impossível (ex.: 2024-02-30)
+            data = data_hora = None
+
+        if data_hora is not None:
+            if timezone.is_naive(data_hora):
+                data_hora = timezone.make_aware(data_hora)
+            return data_hora, False
+        if data is None:
+            raise ValidationError({param: 'Data inválida (use AAAA-MM-DD ou ISO 8601)'})
+        return timezone.make_aware(datetime.combine(data, time.min)), True
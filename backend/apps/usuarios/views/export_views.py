@@ -0,0 +1,129 @@
+"""
+Exportação da base de usuários em streaming (NDJSON ou CSV)
+Leitura por keyset em lotes de values_list: memória constante para qualquer tamanho de tabela
+"""
+import csv
+import json
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from rest_framework import status
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from ..serializers import UserDetailsSerializer
+
+User = get_user_model()
+
+
+class _Eco:
+    """Pseudo-buffer para o csv.writer: devolve a linha em vez de gravá-la"""
+
+    def write(self, valor):
+        return valor
+
+
+class UsuarioExportView(APIView):
+    """
+    Exporta todos os usuários com os campos do UserDetailsSerializer.
+
+    GET ?formato=ndjson (padrão) ou ?formato=csv. Os campos do serializer são
+    instanciados uma única vez e reaproveitados para codificar cada linha, com
+    a mesma representação da API (datas ISO 8601 no fuso configurado).
+
+    Sob ASGI o Django consome geradores síncronos com sync_to_async(list),
+    acumulando a exportação inteira em memória; nesse caso a resposta recebe
+    um gerador assíncrono que lê cada lote em sync_to_async.
+    """
+    permission_classes = [IsAdminUser]
+    tamanho_lote = 2000
+
+    formatos = {
+        'ndjson': ('application/x-ndjson', 'usuarios.ndjson'),
+        'csv': ('text/csv; charset=utf-8', 'usuarios.csv'),
+    }
+
+    def get(self, request):
+        formato = request.query_params.get('formato', 'ndjson').lower()
+        if formato not in self.formatos:
+            return Response(
+                {'error': f"Formato inválido. Use: {', '.join(self.formatos)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        campos = list(UserDetailsSerializer.Meta.fields)
+        conversores = [UserDetailsSerializer().fields[campo].to_representation for campo in campos]
+        if isinstance(request._request, ASGIRequest):
+            gerador = self.gerar_async(formato, campos, conversores)
+        else:
+            linhas = self.codificar(self.iterar_linhas(campos), conversores)
+            gerador = self.formatar(formato, campos, linhas)
+
+        content_type, nome_arquivo = self.formatos[formato]
+        response = StreamingHttpResponse(gerador, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="{nome_arquivo}"'
+        response['Cache-Control'] = 'no-store'
+        return response
+
+    def buscar_lote(self, campos, ultimo_pk):
+        """Próximo lote ordenado por pk (WHERE pk > último)"""
+        consulta = User._default_manager.order_by('pk').values_list(*campos)
+        if ultimo_pk is not None:
+            consulta = consulta.filter(pk__gt=ultimo_pk)
+        return list(consulta[:self.tamanho_lote])
+
+    def iterar_linhas(self, campos):
+        """Percorre a tabela em lotes"""
+        indice_pk = campos.index('pk')
+        ultimo_pk = None
+
+        while True:
+            lote = self.buscar_lote(campos, ultimo_pk)
+            if not lote:
+                return
+            yield from lote
+            ultimo_pk = lote[-1][indice_pk]
+
+    async def gerar_async(self, formato, campos, conversores):
+        """Versão ASGI: um chunk por lote, com a consulta fora do event loop"""
+        buscar_lote = sync_to_async(self.buscar_lote)
+        indice_pk = campos.index('pk')
+        ultimo_pk = None
+
+        if formato == 'csv':
+            yield ''.join(self.gerar_csv(campos, ()))
+
+        while True:
+            lote = await buscar_lote(campos, ultimo_pk)
+            if not lote:
+                return
+            linhas = self.codificar(lote, conversores)
+            yield ''.join(self.formatar(formato, campos, linhas, cabecalho=False))
+            ultimo_pk = lote[-1][indice_pk]
+
+    def formatar(self, formato, campos, linhas, cabecalho=True):
+        if formato == 'ndjson':
+            return self.gerar_ndjson(campos, linhas)
+        return self.gerar_csv(campos, linhas, cabecalho)
+
+    def codificar(self, linhas, conversores):
+        """Aplica a representação de cada campo do serializer (None permanece None)"""
+        for linha in linhas:
+            yield [
+                None if valor is None else converter(valor)
+                for converter, valor in zip(conversores, linha)
+            ]
+
+    def gerar_ndjson(self, campos, linhas):
+        for linha in linhas:
+            yield json.dumps(dict(zip(campos, linha)), ensure_ascii=False) + '\n'
+
+    def gerar_csv(self, campos, linhas, cabecalho=True):
+        escritor = csv.writer(_Eco())
+        if cabecalho:
+            yield escritor.writerow(campos)
+        for linha in linhas:
+            yield escritor.writerow(['' if valor is None else valor for valor in linha])
@@ -0,0 +1,45 @@
+"""
+Views de refresh e logout JWT integradas à denylist de refresh tokens
+"""
+from dj_rest_auth.app_settings import api_settings as rest_auth_settings
+from dj_rest_auth.jwt_auth import CookieTokenRefreshSerializer, get_refresh_view
+from dj_rest_auth.views import LogoutView
+from rest_framework import status
+from rest_framework_simplejwt.exceptions import TokenError
+
+from ..auth.tokens import DenylistRefreshToken
+
+
+class DenylistTokenRefreshSerializer(CookieTokenRefreshSerializer):
+    """
+    Refresh com rotação: rejeita tokens revogados e revoga o token usado
+    (ROTATE_REFRESH_TOKENS + BLACKLIST_AFTER_ROTATION).
+    """
+    token_class = DenylistRefreshToken
+
+
+class DenylistTokenRefreshView(get_refresh_view()):
+    """
+    View de refresh do dj-rest-auth (suporte a cookie) usando a denylist.
+    """
+    serializer_class = DenylistTokenRefreshSerializer
+
+
+class DenylistLogoutView(LogoutView):
+    """
+    Logout do dj-rest-auth que também revoga o refresh token enviado.
+    """
+
+    def logout(self, request):
+        response = super().logout(request)
+
+        raw_token = request.data.get('refresh') or request.COOKIES.get(
+            rest_auth_settings.JWT_AUTH_REFRESH_COOKIE)
+        if raw_token:
+            try:
+                DenylistRefreshToken(raw_token).blacklist()
+            except TokenError as error:
+                response.data = {'detail': str(error)}
+                response.status_code = status.HTTP_401_UNAUTHORIZED
+
+        return response
@@ -3,7 +3,8 @@ Settings package para Django
 Carrega configurações baseado na variável DJANGO_SETTINGS_MODULE
 """
 
-import os
+import warnings
+
 from decouple import config
 
 # Determina qual ambiente usar
@@ -16,5 +17,5 @@ elif ENVIRONMENT == 'development' or ENVIRONMENT == 'dev':
 else:
     # Fallback para desenvolvimento
     from .dev import *
-    print(
-        f"⚠️  Ambiente '{ENVIRONMENT}' não reconhecido, usando configurações de desenvolvimento")
+    warnings.warn(
+        f"Ambiente '{ENVIRONMENT}' não reconhecido, usando configurações de desenvolvimento")
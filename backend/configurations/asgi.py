@@ -2,6 +2,11 @@ import os
 
 from django.core.asgi import get_asgi_application
 
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'configurations.settings')
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'configurations')
+
+# Integrações pesadas (Sentry) só no processo que atende requisições, não no manage.py
+from core.monitoramento.sentry import iniciar_sentry  # noqa: E402
+
+iniciar_sentry()
 
 application = get_asgi_application()
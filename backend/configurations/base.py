@@ -43,7 +43,16 @@ LOCAL_APPS = [
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 
 MIDDLEWARE = [
+    # Primeiro: /healthz/ e /readyz/ respondem sem passar pelo restante da cadeia
+    'core.middlewares.health_check.HealthCheckMiddleware',
     'corsheaders.middleware.CorsMiddleware',
+    # Contexto da requisição (request_id/tenant/usuário em contextvars) e log de requisições
+    'core.middlewares.request_context.RequestContextMiddleware',
+    # Perfil de SQL por requisição (N+1, consultas lentas); antes do log para somar nele
+    'core.middlewares.sql_profiler.SqlProfilerMiddleware',
+    # Fases da requisição no header Server-Timing e no log (SERVER_TIMING['ATIVO'])
+    'core.middlewares.server_timing.ServerTimingMiddleware',
+    'core.middlewares.request_log.RequestLogMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -51,6 +60,8 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'allauth.account.middleware.AccountMiddleware',
+    # Mais interno: registra exceções não tratadas antes do handler do DRF
+    'core.middlewares.exception_log.GlobalExceptionLogMiddleware',
 ]
 ROOT_URLCONF = 'configurations.urls'
 
@@ -86,6 +97,26 @@ DATABASES = {
     }
 }
 
+# Redis por padrão; dev usa cache em memória (USE_LOCAL_CACHE_DEV) e prod ajusta as opções
+CACHES = {
+    'default': {
+        'BACKEND': 'django_redis.cache.RedisCache',
+        'LOCATION': config('REDIS_URL', default='redis://localhost:6379/1'),
+    },
+    # Leituras quentes: LRU do processo na frente do 'default' (core.cache.backends),
+    # com recálculo único e antecipado em caches['duas_camadas'].get_or_set(chave, funcao)
+    'duas_camadas': {
+        'BACKEND': 'core.cache.backends.CacheDuasCamadas',
+        'LOCATION': 'duas_camadas',
+        'TIMEOUT': 300,
+        'OPTIONS': {
+            'REMOTO': 'default',
+            'LOCAL_MAX_ENTRADAS': config('CACHE_LOCAL_MAX_ENTRADAS', default=10000, cast=int),
+            'LOCAL_TTL': config('CACHE_LOCAL_TTL', default=5, cast=float),
+        },
+    },
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
     {'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator'},
@@ -114,7 +145,7 @@ SITE_ID = 1
 
 # Backend de autenticação personalizado para login com email
 AUTHENTICATION_BACKENDS = [
-    'django.contrib.auth.backends.ModelBackend',  # Login padrão
+    'apps.usuarios.auth.backends.EmailBackend',  # Login por email ou username (1 consulta)
     'allauth.account.auth_backends.AuthenticationBackend',  # django-allauth
 ]
 
@@ -164,6 +195,75 @@ SIMPLE_JWT = {
     'TOKEN_TYPE_CLAIM': 'token_type',
 }
 
+# Denylist de refresh tokens (cache + filtro de Bloom por processo)
+# Usada na rotação (BLACKLIST_AFTER_ROTATION) e no logout, no lugar do app
+# rest_framework_simplejwt.token_blacklist
+TOKEN_DENYLIST = {
+    'CAPACIDADE': config('TOKEN_DENYLIST_CAPACIDADE', default=1_000_000, cast=int),
+    'TAXA_FALSO_POSITIVO': 0.001,
+    # Janela máxima até um processo enxergar revogações feitas por outro
+    'SINCRONIZACAO_SEGUNDOS': config('TOKEN_DENYLIST_SINCRONIZACAO', default=5, cast=int),
+    # Por quanto tempo uma entrada de log ausente ainda é tentada (revogação em andamento)
+    'PRAZO_ENTRADA_AUSENTE': 60,
+    'CACHE_ALIAS': 'default',
+}
+
+# Cache de usuários autenticados via JWT (snapshot dos campos usados pela API)
+# no cache 'duas_camadas': a camada local segue CACHE_LOCAL_TTL/CACHE_LOCAL_MAX_ENTRADAS
+USUARIO_SNAPSHOT_CACHE_TTL = config('USUARIO_SNAPSHOT_CACHE_TTL', default=300, cast=int)
+
+# Pool de hashing de senhas das views de login, troca e reset de senha (senha_service)
+PASSWORD_HASHING_POOL = {
+    'TIPO': config('PASSWORD_HASHING_POOL_TIPO', default='thread'),  # 'thread' ou 'process'
+    'MAX_WORKERS': config('PASSWORD_HASHING_POOL_WORKERS', default=4, cast=int),
+    'MAX_FILA': config('PASSWORD_HASHING_POOL_FILA', default=32, cast=int),  # Acima disso responde 503
+}
+
+# Log de requisições (core.middlewares.request_log)
+# IGNORAR: prefixos de path que não são logados
+# AMOSTRAGEM: fração logada por rota, chave = nome da URL ('usuarios:token_refresh')
+# ou prefixo de path ('/api/usuarios/diretorio/'). Erros 5xx são sempre logados
+# e os contadores por rota continuam exatos.
+REQUEST_LOG = {
+    'IGNORAR': ['/health', '/healthz', '/readyz', '/favicon.ico', '/metrics'],
+    'AMOSTRAGEM': {},
+}
+
+# Health checks (core.middlewares.health_check)
+# Liveness sem dependências; readiness verifica bancos e caches, com o resultado
+# reaproveitado por HEALTH_CHECK_CACHE_SEGUNDOS em cada processo
+HEALTH_CHECK_URL = config('HEALTH_CHECK_URL', default='/healthz/')
+READINESS_CHECK_URL = config('READINESS_CHECK_URL', default='/readyz/')
+HEALTH_CHECK_CACHE_SEGUNDOS = config('HEALTH_CHECK_CACHE_SEGUNDOS', default=5, cast=float)
+
+# Profiler de SQL por requisição (core.perfil.sql)
+# Consultas acima de SLOW_DB_THRESHOLD_MS são logadas com o request_id; dev/prod sobrescrevem
+SLOW_DB_THRESHOLD_MS = config('SLOW_DB_THRESHOLD_MS', default=1000, cast=int)
+SQL_PROFILER = {
+    'N_MAIS_UM_LIMIAR': config('SQL_PROFILER_N_MAIS_UM', default=10, cast=int),
+    # Fração das consultas lentas (SELECT) logadas com o plano de execução
+    'AMOSTRA_EXPLAIN': config('SQL_PROFILER_AMOSTRA_EXPLAIN', default=0.0, cast=float),
+    'HEADERS': False,  # X-DB-Queries, X-DB-Time-ms e X-DB-Repetidas na resposta
+}
+
+# Server-Timing (core.perfil.tempos): fases auth, hash, serializer, render e db por
+# requisição, no header (DEBUG ou usuário staff) e no log de requisições.
+# Desligado, o middleware sai da cadeia e as medições viram no-op.
+SERVER_TIMING = {
+    'ATIVO': config('SERVER_TIMING', default=False, cast=bool),
+}
+
+# Métricas no formato do Prometheus (core.metricas), expostas em /metrics/
+# DIRETORIO: pasta compartilhada pelos workers, com um arquivo mmap por processo.
+# Vazio mantém as métricas só na memória do processo (runserver, um worker).
+# Com vários workers, o gunicorn.conf.py limpa a pasta ao subir o servidor (on_starting) e
+# consolida o arquivo de cada worker encerrado (child_exit); a coleta consolida os pids mortos restantes.
+# TOKEN: exigido em `Authorization: Bearer <token>`; sem token, /metrics/ só responde com DEBUG.
+METRICAS = {
+    'DIRETORIO': config('METRICAS_DIR', default=''),
+    'TOKEN': config('METRICAS_TOKEN', default=''),
+}
+
 # Configurações de email (para desenvolvimento)
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 # EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
@@ -174,6 +274,8 @@ EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 # EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
 DEFAULT_FROM_EMAIL = config(
     'DEFAULT_FROM_EMAIL', default='noreply@odonto-premium.com')
+# Dias que emails enviados/falhos ficam na outbox antes do processar_emails removê-los
+EMAIL_OUTBOX_RETENCAO_DIAS = config('EMAIL_OUTBOX_RETENCAO_DIAS', default=7, cast=int)
 
 # URL do frontend para links de email
 FRONTEND_URL = config('FRONTEND_URL', default='http://localhost:3000')
@@ -194,17 +296,22 @@ SOCIALACCOUNT_PROVIDERS = {
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
-        'dj_rest_auth.jwt_auth.JWTCookieAuthentication',
-        'rest_framework.authentication.SessionAuthentication',
-        'rest_framework.authentication.TokenAuthentication',
+        # Despacha para JWT (header/cookie), sessão ou token conforme a credencial presente
+        'apps.usuarios.auth.authentication.DispatchAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',  # Muda para autenticado por padrão
     ],
-    'DEFAULT_RENDERER_CLASSES': ['rest_framework.renderers.JSONRenderer'],
+    # JSONRenderer que registra a fase 'render' do Server-Timing (core.perfil)
+    'DEFAULT_RENDERER_CLASSES': ['core.perfil.drf.JSONRendererMedido'],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
+    # Taxas do throttling por janela deslizante (core.throttling) dos endpoints de autenticação
+    'DEFAULT_THROTTLE_RATES': {
+        'auth_ip': config('THROTTLE_AUTH_IP', default='20/min'),
+        'auth_email': config('THROTTLE_AUTH_EMAIL', default='5/min'),
+        'auth_global': config('THROTTLE_AUTH_GLOBAL', default='600/min'),
+    },
 }
 
 # ==== CORS (base) ====
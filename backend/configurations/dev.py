@@ -87,10 +87,9 @@ SESSION_ENGINE = 'django.contrib.sessions.backends.db'
 
 # Cache pode usar local memory cache em desenvolvimento
 if config('USE_LOCAL_CACHE_DEV', default=True, cast=bool):
-    CACHES = {
-        'default': {
-            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-        }
+    # Mantém o alias 'duas_camadas', agora na frente do locmem
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
     }
 
 # Email backend para desenvolvimento
@@ -111,6 +110,11 @@ SECURE_HSTS_PRELOAD = False
 
 # Configurações específicas para desenvolvimento
 SLOW_DB_THRESHOLD_MS = 500  # Threshold menor para desenvolvimento
+SERVER_TIMING['ATIVO'] = True
+SQL_PROFILER.update({
+    'AMOSTRA_EXPLAIN': 1.0,  # Plano de todas as consultas lentas
+    'HEADERS': True,
+})
 
 # Override de configurações via .env específicas para dev
 if config('DEV_SECRET_KEY', default=None):
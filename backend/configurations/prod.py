@@ -2,7 +2,7 @@
 Configurações para ambiente de produção
 """
 
-import logging
+import os
 from .base import *
 from decouple import config
 
@@ -60,8 +60,53 @@ DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='noreply@example.com')
 MIDDLEWARE.insert(1, 'whitenoise.middleware.WhiteNoiseMiddleware')
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
-# Logging otimizado para produção
-LOGGING['handlers']['console']['level'] = 'WARNING'
+# Logging em produção: JSON por linha, enfileirado sem bloquear a requisição e
+# gravado em lotes por uma thread (core.logs). Fila cheia descarta e contabiliza.
+LOG_DIR = config('LOG_DIR', default='logs')
+LOG_DESTINO = config('LOG_DESTINO', default='stdout')  # 'stdout', 'stderr' ou 'arquivo'
+LOG_LEVEL = config('LOG_LEVEL', default='INFO')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'json': {
+            '()': 'core.logs.formatters.FormatadorJSON',
+        },
+    },
+    'handlers': {
+        'console': {
+            'class': 'core.logs.handlers.HandlerNaoBloqueante',
+            'level': LOG_LEVEL,
+            'formatter': 'json',
+            'destino': LOG_DESTINO,
+            'arquivo': os.path.join(LOG_DIR, config('LOG_ARQUIVO', default='app.log')),
+            'tamanho_fila': config('LOG_FILA_TAMANHO', default=10000, cast=int),
+            'tamanho_lote': config('LOG_LOTE_TAMANHO', default=500, cast=int),
+        },
+    },
+    'root': {
+        'handlers': ['console'],
+        'level': LOG_LEVEL,
+    },
+    'loggers': {
+        'django': {
+            'handlers': ['console'],
+            'level': LOG_LEVEL,
+            'propagate': False,
+        },
+        'django.db.backends': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+        'requests': {
+            'handlers': ['console'],
+            'level': LOG_LEVEL,
+            'propagate': False,
+        },
+    },
+}
 
 # Configurações específicas para produção
 SLOW_DB_THRESHOLD_MS = config('SLOW_DB_THRESHOLD_MS', default=2000, cast=int)
@@ -82,38 +127,10 @@ DATA_UPLOAD_MAX_MEMORY_SIZE = config('DATA_UPLOAD_MAX_MEMORY_SIZE', default=2621
 # Configurações adicionais de segurança
 SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
 
-# Sentry para monitoramento de erros (se configurado)
+# Sentry para monitoramento de erros (se configurado). Só as opções ficam aqui:
+# o SDK é importado e inicializado no wsgi/asgi (core.monitoramento.sentry), então
+# manage.py e o import dos settings não pagam por ele
 SENTRY_DSN = config('SENTRY_DSN', default='')
-if SENTRY_DSN:
-    import sentry_sdk
-    from sentry_sdk.integrations.django import DjangoIntegration
-    from sentry_sdk.integrations.redis import RedisIntegration
-    from sentry_sdk.integrations.logging import LoggingIntegration
-    
-    sentry_logging = LoggingIntegration(
-        level=logging.INFO,
-        event_level=logging.ERROR
-    )
-    
-    sentry_sdk.init(
-        dsn=SENTRY_DSN,
-        integrations=[
-            DjangoIntegration(transaction_style='url'),
-            RedisIntegration(),
-            sentry_logging,
-        ],
-        traces_sample_rate=config('SENTRY_TRACES_SAMPLE_RATE', default=0.1, cast=float),
-        send_default_pii=False,
-        environment=config('ENVIRONMENT', default='production'),
-        release=config('APP_VERSION', default='1.0.0'),
-    )
-
-# Health check endpoint
-HEALTH_CHECK_URL = config('HEALTH_CHECK_URL', default='/healthz/')
-
-print("🚀 Executando em modo PRODUÇÃO")
-print(f"🔒 SSL Redirect: {SECURE_SSL_REDIRECT}")
-print(f"💾 Database SSL: {DATABASES['default']['OPTIONS']['sslmode']}")
-print(f"🔄 Cache Timeout: {CACHES['default']['TIMEOUT']}s")
-print(f"📧 Email Backend: {EMAIL_BACKEND}")
-print(f"🔍 Sentry: {'Configurado' if SENTRY_DSN else 'Não configurado'}")
+SENTRY_TRACES_SAMPLE_RATE = config('SENTRY_TRACES_SAMPLE_RATE', default=0.1, cast=float)
+SENTRY_ENVIRONMENT = config('SENTRY_ENVIRONMENT', default=config('ENVIRONMENT', default='production'))
+APP_VERSION = config('APP_VERSION', default='1.0.0')
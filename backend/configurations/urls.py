@@ -3,8 +3,11 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 
+from core.metricas.views import MetricasView
+
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('metrics/', MetricasView.as_view(), name='metricas'),
     path("api/usuarios/", include('apps.usuarios.urls')),  # login, logout, refresh
 ]
 
@@ -0,0 +1,75 @@
+"""
+Configuração do pytest
+Os settings exigem variáveis de ambiente (SECRET_KEY, DB_*); os testes rodam com
+padrões próprios, SQLite e cache em memória, sem depender de um .env
+"""
+
+import os
+import statistics
+import time
+
+import pytest
+
+_AMBIENTE_TESTES = {
+    'ENVIRONMENT': 'dev',
+    'SECRET_KEY': 'chave-de-testes-com-tamanho-suficiente-para-hmac-sha256',
+    'DB_NAME': 'testes',
+    'DB_USER': 'testes',
+    'DB_PASSWORD': 'testes',
+    'USE_SQLITE_DEV': 'True',
+    'USE_LOCAL_CACHE_DEV': 'True',
+    'METRICAS_DIR': '',
+    'SENTRY_DSN': '',
+}
+
+
+def pytest_configure(config):
+    for variavel, valor in _AMBIENTE_TESTES.items():
+        os.environ.setdefault(variavel, valor)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'configurations')
+
+    from django.conf import settings
+
+    # Hasher rápido: os testes medem consultas e concorrência, não o custo do PBKDF2
+    settings.PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+    # SQL no console (DEBUG do dev) só polui a saída dos testes
+    settings.LOGGING['loggers']['django.db.backends']['level'] = 'INFO'
+
+
+@pytest.fixture(autouse=True)
+def _caches_limpos():
+    """Throttling, denylist e snapshots ficam no cache: cada teste começa do zero"""
+    from django.core.cache import caches
+
+    for cache in caches.all():
+        cache.clear()
+    yield
+
+
+@pytest.fixture
+def api_client():
+    from rest_framework.test import APIClient
+
+    return APIClient()
+
+
+@pytest.fixture
+def usuario(db, django_user_model):
+    return django_user_model.objects.create_user(
+        username='maria', email='Maria@Exemplo.com', password='senha-forte-123', first_name='Maria'
+    )
+
+
+@pytest.fixture
+def mediana_us():
+    """Mediana, em microssegundos, de várias execuções de uma função (testes de benchmark)"""
+    def medir(funcao, repeticoes=200):
+        funcao()  # aquecimento: imports, caches e snapshots
+        amostras = []
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            funcao()
+            amostras.append(time.perf_counter() - inicio)
+        return statistics.median(amostras) * 1_000_000
+
+    return medir
@@ -4,6 +4,7 @@ Instala middlewares e wrappers durante a inicialização
 """
 
 from django.apps import AppConfig
+from django.conf import settings
 import logging
 
 logger = logging.getLogger(__name__)
@@ -18,6 +19,19 @@ class CoreConfig(AppConfig):
     def ready(self):
         """Executado quando a aplicação está pronta"""
         try:
+            from django.db.backends.signals import connection_created
+            from .perfil.sql import instalar_profiler
+
+            # Profiler de SQL (core.perfil.sql) em todas as conexões: métricas,
+            # totais por requisição, N+1 e consultas lentas
+            connection_created.connect(instalar_profiler, dispatch_uid='core.perfil.sql')
+
+            # Workers do manage.py (processar_emails, importar_usuarios...) também
+            # reportam ao Sentry; servidores web inicializam pelo wsgi/asgi
+            if getattr(settings, 'SENTRY_DSN', ''):
+                from .monitoramento.sentry import iniciar_sentry_em_comando
+                iniciar_sentry_em_comando()
+
             logger.info("Core app inicializada com sucesso")
             
         except Exception as e:
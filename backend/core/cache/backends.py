@@ -0,0 +1,365 @@
+"""
+Cache em duas camadas: LRU no processo na frente de um cache compartilhado (Redis)
+Leituras quentes não vão à rede nem descompactam; get_or_set com função recalcula
+uma única vez por chave (single-flight) e antecipa a renovação perto da expiração
+(XFetch), evitando que a expiração de uma chave quente dispare N recálculos
+"""
+
+import math
+import os
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+from core.metricas.registro import Contador
+
+LEITURAS = Contador(
+    'cache_leituras_total',
+    'Leituras do cache em duas camadas por camada (local, remoto) e resultado (hit, miss)',
+    rotulos=('cache', 'camada', 'resultado'),
+)
+RECALCULOS = Contador(
+    'cache_recalculos_total',
+    'Valores recalculados pelo get_or_set por motivo (miss, antecipado, espera_esgotada)',
+    rotulos=('cache', 'motivo'),
+)
+
+_CONFIGURACAO_PADRAO = {
+    'REMOTO': 'default',  # Alias do CACHES usado como camada compartilhada
+    'LOCAL_MAX_ENTRADAS': 10000,
+    'LOCAL_TTL': 5,  # Segundos máximos de uma entrada na camada local
+    'XFETCH_BETA': 1.0,  # Acima de 1 antecipa mais a renovação; 0 desliga
+    'TRAVA_TTL': 30,  # Validade da trava de recálculo no cache remoto (> tempo de cálculo)
+    'ESPERA_MAXIMA': 5.0,  # Segundos esperando outro recálculo antes de calcular por conta
+}
+
+_SUFIXO_TRAVA = ':recalculando'
+
+# Remove a trava só se ela ainda guarda o token do dono (KEYS[1] = trava, ARGV[1] = token)
+_SCRIPT_LIBERAR_TRAVA = (
+    "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) end return 0"
+)
+
+_lock = threading.Lock()
+_camadas = {}  # nome -> _CamadaLocal (compartilhada pelas threads do processo)
+
+
+class _Entrada:
+    """Valor gravado no cache remoto, com o custo do cálculo e a expiração (XFetch)"""
+
+    __slots__ = ('valor', 'delta', 'expira_em')
+
+    def __init__(self, valor, delta: float, expira_em):
+        self.valor = valor
+        self.delta = delta  # Segundos gastos para calcular o valor
+        self.expira_em = expira_em  # time.time() da expiração (None: sem expiração)
+
+    def __getstate__(self):
+        return self.valor, self.delta, self.expira_em
+
+    def __setstate__(self, estado):
+        self.valor, self.delta, self.expira_em = estado
+
+    def renovar_antes(self, beta: float) -> bool:
+        """
+        XFetch: renova antes da expiração com probabilidade que cresce perto dela
+        e com o custo do cálculo, espalhando as renovações entre os processos
+        """
+        if self.expira_em is None or not self.delta or not beta:
+            return False
+        return time.time() - self.delta * beta * math.log(1.0 - random.random()) >= self.expira_em
+
+
+class _CamadaLocal:
+    """LRU com TTL do processo e os recálculos em andamento"""
+
+    __slots__ = ('entradas', 'em_voo', 'lock')
+
+    def __init__(self):
+        self.entradas = OrderedDict()  # chave -> (expira_monotonic, _Entrada)
+        self.em_voo = {}  # chave -> threading.Event do recálculo em andamento
+        self.lock = threading.Lock()
+
+
+def _obter_camada(nome: str) -> _CamadaLocal:
+    camada = _camadas.get(nome)
+    if camada is None:
+        with _lock:
+            camada = _camadas.setdefault(nome, _CamadaLocal())
+    return camada
+
+
+def _descartar_apos_fork():
+    # Travas herdadas podem estar presas no processo filho
+    global _lock
+    _lock = threading.Lock()
+    _camadas.clear()
+
+
+os.register_at_fork(after_in_child=_descartar_apos_fork)
+
+
+class CacheDuasCamadas(BaseCache):
+    """
+    Backend do CACHES com uma LRU local (limitada, TTL curto) na frente do
+    cache do alias OPTIONS['REMOTO'].
+
+    - Escritas vão para o remoto e atualizam a camada local do processo;
+      delete/set em outro processo só é visto aqui após LOCAL_TTL.
+    - Valores da camada local são devolvidos sem cópia: trate-os como imutáveis.
+    - incr/decr não são atômicos; contadores devem usar o alias remoto direto.
+    """
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        self.nome = location or 'duas_camadas'
+        self.config = dict(_CONFIGURACAO_PADRAO)
+        self.config.update(params.get('OPTIONS', {}))
+
+    @property
+    def remoto(self) -> BaseCache:
+        return caches[self.config['REMOTO']]
+
+    @property
+    def _camada(self) -> _CamadaLocal:
+        return _obter_camada(self.nome)
+
+    def _timeout(self, timeout):
+        return self.default_timeout if timeout is DEFAULT_TIMEOUT else timeout
+
+    # ----- camada local -----
+
+    def _ler_local(self, chave):
+        camada = self._camada
+        with camada.lock:
+            item = camada.entradas.get(chave)
+            if item is None:
+                return None
+            expira, entrada = item
+            if expira <= time.monotonic():
+                del camada.entradas[chave]
+                return None
+            camada.entradas.move_to_end(chave)
+            return entrada
+
+    def _guardar_local(self, chave, entrada: _Entrada):
+        ttl = self.config['LOCAL_TTL']
+        if entrada.expira_em is not None:
+            ttl = min(ttl, entrada.expira_em - time.time())
+
+        camada = self._camada
+        with camada.lock:
+            if ttl <= 0:
+                camada.entradas.pop(chave, None)
+                return
+            camada.entradas[chave] = (time.monotonic() + ttl, entrada)
+            camada.entradas.move_to_end(chave)
+            while len(camada.entradas) > self.config['LOCAL_MAX_ENTRADAS']:
+                camada.entradas.popitem(last=False)
+
+    def _descartar_local(self, chaves):
+        camada = self._camada
+        with camada.lock:
+            for chave in chaves:
+                camada.entradas.pop(chave, None)
+
+    # ----- leitura e escrita nas duas camadas -----
+
+    def _obter(self, key, version=None):
+        # Chaves são validadas na escrita; a validação custaria mais que o hit local
+        chave = self.make_key(key, version)
+        entrada = self._ler_local(chave)
+        if entrada is not None:
+            LEITURAS.incrementar(cache=self.nome, camada='local', resultado='hit')
+            return entrada
+        LEITURAS.incrementar(cache=self.nome, camada='local', resultado='miss')
+
+        entrada = self.remoto.get(key, None, version)
+        if not isinstance(entrada, _Entrada):
+            LEITURAS.incrementar(cache=self.nome, camada='remoto', resultado='miss')
+            return None
+        LEITURAS.incrementar(cache=self.nome, camada='remoto', resultado='hit')
+        self._guardar_local(chave, entrada)
+        return entrada
+
+    def _nova_entrada(self, valor, timeout, delta=0.0) -> _Entrada:
+        expira_em = None if timeout is None else time.time() + timeout
+        return _Entrada(valor, delta, expira_em)
+
+    def _gravar(self, key, valor, timeout, version, delta=0.0):
+        timeout = self._timeout(timeout)
+        entrada = self._nova_entrada(valor, timeout, delta)
+        self.remoto.set(key, entrada, timeout, version)
+        self._guardar_local(self.make_and_validate_key(key, version), entrada)
+
+    def get(self, key, default=None, version=None):
+        entrada = self._obter(key, version)
+        return default if entrada is None else entrada.valor
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self._gravar(key, value, timeout, version)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        timeout = self._timeout(timeout)
+        entrada = self._nova_entrada(value, timeout)
+        adicionado = self.remoto.add(key, entrada, timeout, version)
+        if adicionado:
+            self._guardar_local(self.make_and_validate_key(key, version), entrada)
+        return adicionado
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        # A expiração guardada na entrada fica desatualizada: relê do remoto
+        self._descartar_local([self.make_key(key, version)])
+        return self.remoto.touch(key, self._timeout(timeout), version)
+
+    def delete(self, key, version=None):
+        self._descartar_local([self.make_key(key, version)])
+        return self.remoto.delete(key, version)
+
+    def has_key(self, key, version=None):
+        if self._ler_local(self.make_key(key, version)) is not None:
+            return True
+        return isinstance(self.remoto.get(key, None, version), _Entrada)
+
+    def get_many(self, keys, version=None):
+        resultado = {}
+        faltando = []
+        for key in keys:
+            entrada = self._ler_local(self.make_key(key, version))
+            if entrada is None:
+                faltando.append(key)
+            else:
+                resultado[key] = entrada.valor
+
+        if resultado:
+            LEITURAS.incrementar(len(resultado), cache=self.nome, camada='local', resultado='hit')
+        if not faltando:
+            return resultado
+        LEITURAS.incrementar(len(faltando), cache=self.nome, camada='local', resultado='miss')
+
+        encontrados = 0
+        for key, entrada in self.remoto.get_many(faltando, version).items():
+            if isinstance(entrada, _Entrada):
+                encontrados += 1
+                resultado[key] = entrada.valor
+                self._guardar_local(self.make_key(key, version), entrada)
+        if encontrados:
+            LEITURAS.incrementar(encontrados, cache=self.nome, camada='remoto', resultado='hit')
+        if len(faltando) > encontrados:
+            LEITURAS.incrementar(len(faltando) - encontrados, cache=self.nome, camada='remoto', resultado='miss')
+        return resultado
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        timeout = self._timeout(timeout)
+        entradas = {key: self._nova_entrada(valor, timeout) for key, valor in data.items()}
+        falhas = self.remoto.set_many(entradas, timeout, version) or []
+        for key, entrada in entradas.items():
+            if key not in falhas:
+                self._guardar_local(self.make_and_validate_key(key, version), entrada)
+        return falhas
+
+    def delete_many(self, keys, version=None):
+        keys = list(keys)
+        self._descartar_local([self.make_key(key, version) for key in keys])
+        self.remoto.delete_many(keys, version)
+
+    def clear(self):
+        """Limpa a camada local e o cache remoto inteiro (inclusive chaves de outros aliases)"""
+        camada = self._camada
+        with camada.lock:
+            camada.entradas.clear()
+        self.remoto.clear()
+
+    # ----- recálculo com XFetch e single-flight -----
+
+    def get_or_set(self, key, default, timeout=DEFAULT_TIMEOUT, version=None):
+        """
+        Com `default` chamável, recalcula o valor ausente ou perto de expirar
+        uma única vez: threads do processo esperam o recálculo local e outros
+        processos, pela trava no remoto, enquanto servem o valor atual se houver
+        """
+        if not callable(default):
+            return super().get_or_set(key, default, timeout, version)
+
+        entrada = self._obter(key, version)
+        if entrada is not None and not entrada.renovar_antes(self.config['XFETCH_BETA']):
+            return entrada.valor
+        return self._recalcular(key, default, timeout, version, entrada)
+
+    def _recalcular(self, key, funcao, timeout, version, atual):
+        chave = self.make_key(key, version)
+        camada = self._camada
+        with camada.lock:
+            evento = camada.em_voo.get(chave)
+            lider = evento is None
+            if lider:
+                evento = camada.em_voo[chave] = threading.Event()
+
+        if not lider:
+            # Outra thread do processo já está recalculando esta chave
+            if atual is not None:
+                return atual.valor
+            evento.wait(self.config['ESPERA_MAXIMA'])
+            entrada = self._obter(key, version)
+            if entrada is not None:
+                return entrada.valor
+            return self._calcular(key, funcao, timeout, version, 'espera_esgotada')
+
+        try:
+            return self._recalcular_entre_processos(key, funcao, timeout, version, atual)
+        finally:
+            with camada.lock:
+                camada.em_voo.pop(chave, None)
+            evento.set()
+
+    def _recalcular_entre_processos(self, key, funcao, timeout, version, atual):
+        remoto = self.remoto
+        trava = f'{key}{_SUFIXO_TRAVA}'
+        dono = uuid.uuid4().hex
+        if remoto.add(trava, dono, self.config['TRAVA_TTL'], version):
+            try:
+                return self._calcular(key, funcao, timeout, version, 'miss' if atual is None else 'antecipado')
+            finally:
+                self._liberar_trava(trava, dono, version)
+
+        # Outro processo está recalculando: serve o valor atual ou espera o novo
+        if atual is not None:
+            return atual.valor
+        limite = time.monotonic() + self.config['ESPERA_MAXIMA']
+        intervalo = 0.01
+        while time.monotonic() < limite:
+            time.sleep(intervalo)
+            intervalo = min(intervalo * 2, 0.2)
+            entrada = remoto.get(key, None, version)
+            if isinstance(entrada, _Entrada):
+                self._guardar_local(self.make_key(key, version), entrada)
+                return entrada.valor
+        return self._calcular(key, funcao, timeout, version, 'espera_esgotada')
+
+    def _liberar_trava(self, trava, dono, version):
+        """
+        Remove a trava apenas se ainda for deste recálculo: se o cálculo passou de
+        TRAVA_TTL, a trava expirou e pode pertencer a outro processo agora
+        """
+        remoto = self.remoto
+        cliente = getattr(remoto, 'client', None)
+        if hasattr(cliente, 'get_client') and hasattr(cliente, 'encode'):
+            # django-redis: comparação e remoção atômicas no servidor
+            chave = cliente.make_key(trava, version=version)
+            cliente.get_client(write=True).eval(_SCRIPT_LIBERAR_TRAVA, 1, chave, cliente.encode(dono))
+            return
+        # Demais backends não têm compare-and-delete; a janela entre get e delete é curta
+        if remoto.get(trava, None, version) == dono:
+            remoto.delete(trava, version)
+
+    def _calcular(self, key, funcao, timeout, version, motivo):
+        inicio = time.perf_counter()
+        valor = funcao()
+        RECALCULOS.incrementar(cache=self.nome, motivo=motivo)
+        self._gravar(key, valor, timeout, version, delta=time.perf_counter() - inicio)
+        return valor
@@ -45,3 +45,17 @@ class HostInvalidoErro(ErroNegocio):
     
     def __init__(self, mensagem: str = "Host não permitido"):
         super().__init__(mensagem, status_code=400)
+
+
+class PoolSenhaSaturadoErro(ErroNegocio):
+    """Erro quando o pool de hashing de senhas está saturado"""
+    
+    def __init__(self, mensagem: str = "Servidor ocupado. Tente novamente em instantes."):
+        super().__init__(mensagem, status_code=503)
+
+
+class UsernameIndisponivelErro(ErroNegocio):
+    """Erro quando não foi possível alocar um username livre"""
+    
+    def __init__(self, mensagem: str = "Não foi possível gerar um nome de usuário. Tente novamente."):
+        super().__init__(mensagem, status_code=400)
@@ -22,6 +22,7 @@ from rest_framework.exceptions import (
 )
 from django.core.exceptions import ValidationError as DjangoValidationError
 from django.http import Http404
+from core.rotas.registro import obter_metadados
 from .exceptions import ErroNegocio
 from .responses import erro_response
 
@@ -29,42 +30,9 @@ logger = logging.getLogger('apps.saas.portfolios')
 
 
 def _is_api_request(request) -> bool:
-    """Verifica se a requisição é para uma rota da API"""
-    if not hasattr(request, 'path'):
-        return False
-    
-    path = request.path.lower().strip('/')
-    
-    # Define quais paths são considerados APIs
-    api_prefixes = [
-        'api/',
-        'portfolios/',
-        'tenants/', 
-        'planos/',
-        'public/',
-    ]
-    
-    # Paths que NÃO devem ser processados pelo DRF handler
-    non_api_prefixes = [
-        'admin/',
-        'static/',
-        'media/',
-        'favicon.ico',
-        'robots.txt',
-    ]
-    
-    # Primeiro verifica se é explicitamente não-API
-    for prefix in non_api_prefixes:
-        if path.startswith(prefix.lower()):
-            return False
-    
-    # Depois verifica se é API
-    for prefix in api_prefixes:
-        if path.startswith(prefix.lower()):
-            return True
-    
-    # Por padrão, considera não-API se não identificado
-    return False
+    """Verifica se a requisição é para uma rota da API (view do DRF, pelo registro de rotas)"""
+    metadados = obter_metadados(request)
+    return metadados is not None and metadados.api
 
 
 def drf_exception_handler(exc: Exception, context: dict) -> Optional[Response]:
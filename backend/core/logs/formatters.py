@@ -0,0 +1,25 @@
+"""
+Formatadores de log estruturado (JSON por linha)
+"""
+
+from datetime import datetime, timezone
+
+from pythonjsonlogger import jsonlogger
+
+
+class FormatadorJSON(jsonlogger.JsonFormatter):
+    """
+    Uma linha JSON por registro: timestamp UTC ISO 8601, nível, logger,
+    mensagem e os campos passados em `extra` (method, path, request_id...).
+    """
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('json_ensure_ascii', False)
+        super().__init__(*args, **kwargs)
+
+    def add_fields(self, log_record, record, message_dict):
+        super().add_fields(log_record, record, message_dict)
+        log_record['timestamp'] = datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat()
+        log_record['level'] = record.levelname
+        log_record['logger'] = record.name
+        log_record.setdefault('process', record.process)
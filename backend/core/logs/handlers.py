@@ -0,0 +1,224 @@
+"""
+Envio de logs fora da thread da requisição
+A requisição só enfileira o registro (put_nowait); formatação, tracebacks e I/O
+ficam com uma thread que grava em lotes. Fila cheia descarta e conta.
+
+O handler não herda de QueueHandler: o dictConfig trata subclasses dele de forma
+especial (e diferente entre versões do Python), o que impedia a configuração.
+"""
+
+import atexit
+import logging
+import os
+import queue
+import sys
+import threading
+from logging.handlers import WatchedFileHandler
+
+_lock = threading.Lock()
+_estatisticas = {
+    'enfileirados': 0,
+    'descartados': 0,
+    'gravados': 0,
+    'lotes': 0,
+}
+
+
+def _contar(chave: str, quantidade: int = 1):
+    with _lock:
+        _estatisticas[chave] += quantidade
+
+
+def obter_estatisticas() -> dict:
+    """Contadores do pipeline de logs (somados entre todos os handlers do processo)"""
+    with _lock:
+        return dict(_estatisticas)
+
+
+class EmissaoEmLoteMixin:
+    """Grava vários registros com um único write + flush no stream"""
+
+    def emitir_lote(self, registros):
+        linhas = []
+        for registro in registros:
+            if registro.levelno < self.level or not self.filter(registro):
+                continue
+            try:
+                linhas.append(self.format(registro))
+            except Exception:
+                self.handleError(registro)
+        if not linhas:
+            return 0
+
+        self.acquire()
+        try:
+            stream = self._obter_stream()
+            stream.write(self.terminator.join(linhas) + self.terminator)
+            stream.flush()
+        except Exception:
+            self.handleError(registros[-1])
+        finally:
+            self.release()
+        return len(linhas)
+
+    def _obter_stream(self):
+        return self.stream
+
+
+class LoteStreamHandler(EmissaoEmLoteMixin, logging.StreamHandler):
+    """StreamHandler (stdout por padrão) com gravação em lote"""
+
+    def __init__(self, stream=None):
+        super().__init__(stream or sys.stdout)
+
+
+class LoteFileHandler(EmissaoEmLoteMixin, WatchedFileHandler):
+    """Arquivo com gravação em lote; reabre o arquivo após rotação externa (logrotate)"""
+
+    def _obter_stream(self):
+        self.reopenIfNeeded()
+        if self.stream is None:
+            self.stream = self._open()
+        return self.stream
+
+
+_SENTINELA = object()
+
+
+class HandlerNaoBloqueante(logging.Handler):
+    """
+    Handler para LOGGING em produção: enfileira sem bloquear e delega a gravação
+    a uma thread própria, que drena até `tamanho_lote` registros por vez e os
+    grava no destino (stdout, stderr ou arquivo) com um único write. A thread é
+    iniciada sob demanda em cada processo (seguro com workers criados por fork)
+    e relata os descartes por fila cheia com um aviso no próprio fluxo de logs.
+
+    A formatação e o traceback ficam com a thread de gravação, não com a chamadora.
+    """
+
+    def __init__(self, destino: str = 'stdout', arquivo: str = '',
+                 tamanho_fila: int = 10000, tamanho_lote: int = 500):
+        super().__init__()
+        if destino == 'arquivo':
+            if not arquivo:
+                raise ValueError("LOGGING: destino 'arquivo' exige o caminho em `arquivo`")
+            pasta = os.path.dirname(arquivo)
+            if pasta:
+                os.makedirs(pasta, exist_ok=True)
+            self.destino = LoteFileHandler(arquivo, encoding='utf-8', delay=True)
+        else:
+            self.destino = LoteStreamHandler(sys.stderr if destino == 'stderr' else sys.stdout)
+        self.tamanho_fila = tamanho_fila
+        self.tamanho_lote = tamanho_lote
+        self.fila = None
+        self._thread = None
+        self._pid = None
+        self._descartados = 0
+        self._descartados_relatados = 0
+
+    def setFormatter(self, fmt):
+        # O formatador é usado pelo destino, na thread de gravação
+        self.destino.setFormatter(fmt)
+
+    def _garantir_thread(self):
+        if self._pid == os.getpid():
+            return
+        with _lock:
+            if self._pid == os.getpid():
+                return
+            # Após um fork a thread de gravação não existe no processo filho
+            self.fila = queue.Queue(maxsize=self.tamanho_fila)
+            self._thread = threading.Thread(
+                target=self._drenar, args=(self.fila,), name='logs-em-lote', daemon=True,
+            )
+            self._thread.start()
+            self._pid = os.getpid()
+        atexit.register(self._parar)
+
+    def _parar(self, timeout: float = 5):
+        if self._thread is None or self._pid != os.getpid():
+            return
+        try:
+            # Com a fila cheia espera a thread abrir espaço
+            self.fila.put(_SENTINELA, timeout=timeout)
+        except queue.Full:
+            pass
+        else:
+            self._thread.join(timeout)
+        self._thread = None
+        self._pid = None
+
+    def _drenar(self, fila):
+        while True:
+            registro = fila.get()
+            if registro is _SENTINELA:
+                fila.task_done()
+                return
+
+            lote = [registro]
+            encerrar = False
+            while len(lote) < self.tamanho_lote:
+                try:
+                    registro = fila.get_nowait()
+                except queue.Empty:
+                    break
+                if registro is _SENTINELA:
+                    encerrar = True
+                    break
+                lote.append(registro)
+
+            aviso = self._aviso_descartes()
+            try:
+                gravados = self.destino.emitir_lote(lote if aviso is None else lote + [aviso])
+                _contar('gravados', gravados)
+                _contar('lotes')
+            finally:
+                for _ in range(len(lote) + encerrar):
+                    fila.task_done()
+            if encerrar:
+                return
+
+    def _aviso_descartes(self):
+        with _lock:
+            descartados = self._descartados
+        novos = descartados - self._descartados_relatados
+        if novos <= 0:
+            return None
+        self._descartados_relatados = descartados
+        return logging.LogRecord(
+            'core.logs', logging.WARNING, __file__, 0,
+            'LOGS_DESCARTADOS %s registros descartados por fila cheia (total %s)',
+            (novos, descartados), None,
+        )
+
+    def preparar(self, record):
+        # Só resolve a mensagem (args podem mudar depois); exc_info segue intacto
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        return record
+
+    def emit(self, record):
+        try:
+            self._garantir_thread()
+            self.fila.put_nowait(self.preparar(record))
+        except queue.Full:
+            with _lock:
+                _estatisticas['descartados'] += 1
+                self._descartados += 1
+            return
+        except Exception:
+            self.handleError(record)
+            return
+        _contar('enfileirados')
+
+    def flush(self):
+        """Aguarda a fila esvaziar (usado no encerramento e em testes)"""
+        if self._pid == os.getpid() and self._thread.is_alive():
+            self.fila.join()
+            self.destino.flush()
+
+    def close(self):
+        self._parar()
+        self.destino.close()
+        super().close()
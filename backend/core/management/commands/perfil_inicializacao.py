@@ -0,0 +1,127 @@
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+# backend/ (manage.py e o pacote configurations): diretório do processo medido
+RAIZ_PROJETO = Path(__file__).resolve().parents[3]
+
+# Código executado no processo filho para cada alvo
+ALVOS = {
+    'settings': 'import configurations',
+    'setup': 'import django; django.setup()',
+    'wsgi': 'import configurations.wsgi',
+    'asgi': 'import configurations.asgi',
+}
+
+_MARCADOR = '__perfil_inicializacao__'
+_RE_LINHA = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)')
+
+
+def _codigo(alvo: str) -> str:
+    return (
+        'import time; _inicio = time.perf_counter()\n'
+        f'{ALVOS[alvo]}\n'
+        f'print("{_MARCADOR}", (time.perf_counter() - _inicio) * 1000)\n'
+    )
+
+
+def _ler_importtime(saida: str):
+    """[(módulo, self_us, cumulativo_us, nível)] das linhas do -X importtime"""
+    modulos = []
+    for linha in saida.splitlines():
+        encontrado = _RE_LINHA.match(linha)
+        if encontrado:
+            proprio, cumulativo, recuo, modulo = encontrado.groups()
+            modulos.append((modulo, int(proprio), int(cumulativo), len(recuo) // 2))
+    return modulos
+
+
+class Command(BaseCommand):
+    help = (
+        'Perfil de inicialização (python -X importtime) do import dos settings, '
+        'do django.setup() ou da aplicação wsgi/asgi, em um processo novo. '
+        'Com --limite-ms falha se a mediana passar do limite (checagem de regressão).'
+    )
+    # Mede um processo novo; as checagens deste processo só atrasariam o relatório
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('--alvo', choices=sorted(ALVOS), default='setup')
+        parser.add_argument('--top', type=int, default=15, help='Módulos e pacotes listados')
+        parser.add_argument('--execucoes', type=int, default=3, help='Processos medidos (usa a mediana)')
+        parser.add_argument('--limite-ms', type=float, default=None, help='Tempo máximo do alvo, em ms')
+
+    def handle(self, *args, **options):
+        alvo = options['alvo']
+        execucoes = max(1, options['execucoes'])
+
+        tempos_alvo, tempos_processo = [], []
+        modulos, efeitos = [], []
+        for _ in range(execucoes):
+            resultado, tempo_processo = self._executar(alvo)
+            linhas = resultado.stdout.splitlines()
+            tempo = [linha for linha in linhas if linha.startswith(_MARCADOR)]
+            if resultado.returncode != 0 or not tempo:
+                raise CommandError(f"Falha ao inicializar '{alvo}':\n{resultado.stderr[-2000:]}")
+
+            tempos_alvo.append(float(tempo[-1].split()[1]))
+            tempos_processo.append(tempo_processo)
+            # Import sem efeitos colaterais: nada além da medição no stdout
+            efeitos = [linha for linha in linhas if not linha.startswith(_MARCADOR)]
+            modulos = _ler_importtime(resultado.stderr)
+
+        mediana = statistics.median(tempos_alvo)
+        self._relatorio(alvo, modulos, mediana, statistics.median(tempos_processo), options['top'])
+
+        if efeitos:
+            self.stdout.write(self.style.WARNING(
+                f"O import escreveu {len(efeitos)} linha(s) no stdout: {efeitos[0][:120]}"
+            ))
+
+        limite = options['limite_ms']
+        if limite is not None:
+            if mediana > limite:
+                raise CommandError(f"Inicialização de '{alvo}' em {mediana:.1f}ms, acima do limite de {limite:.1f}ms")
+            self.stdout.write(self.style.SUCCESS(f"Dentro do limite de {limite:.1f}ms"))
+
+    def _executar(self, alvo: str):
+        ambiente = dict(os.environ)
+        ambiente.setdefault('DJANGO_SETTINGS_MODULE', 'configurations')
+        ambiente.pop('PYTHONIMPORTTIME', None)
+
+        inicio = time.perf_counter()
+        resultado = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', _codigo(alvo)],
+            capture_output=True,
+            text=True,
+            cwd=RAIZ_PROJETO,
+            env=ambiente,
+        )
+        return resultado, (time.perf_counter() - inicio) * 1000
+
+    def _relatorio(self, alvo, modulos, mediana, processo, top):
+        total_us = sum(proprio for _, proprio, _, _ in modulos)
+        self.stdout.write(self.style.SUCCESS(
+            f"'{alvo}': {mediana:.1f}ms (processo completo {processo:.1f}ms), "
+            f"{len(modulos)} módulos importados em {total_us / 1000:.1f}ms"
+        ))
+
+        # Imports de primeiro nível: o cumulativo inclui tudo que cada um puxou
+        self.stdout.write('\nMaiores imports (cumulativo, ms):')
+        raizes = sorted((m for m in modulos if m[3] == 0), key=lambda m: m[2], reverse=True)
+        for modulo, _, cumulativo, _ in raizes[:top]:
+            self.stdout.write(f'  {cumulativo / 1000:8.1f}  {modulo}')
+
+        pacotes = defaultdict(int)
+        for modulo, proprio, _, _ in modulos:
+            pacotes[modulo.split('.')[0]] += proprio
+        self.stdout.write('\nPor pacote (tempo próprio, ms):')
+        for pacote, proprio in sorted(pacotes.items(), key=lambda p: p[1], reverse=True)[:top]:
+            self.stdout.write(f'  {proprio / 1000:8.1f}  {pacote}')
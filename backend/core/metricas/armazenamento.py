@@ -0,0 +1,242 @@
+"""
+Armazenamento das métricas compartilhado entre processos
+Cada worker grava em um arquivo mmap próprio; a coleta soma os arquivos do diretório.
+Os arquivos de processos encerrados são somados a um arquivo consolidado e removidos,
+mantendo os contadores monotônicos sem acumular um arquivo por pid.
+"""
+
+import contextlib
+import glob
+import mmap
+import os
+import struct
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows: sem workers por fork, a trava entre processos não é necessária
+    fcntl = None
+
+# Layout: cabeçalho com o total de bytes usados (uint32 + 4 de alinhamento) seguido
+# de entradas [tamanho da chave: uint32][chave utf-8 alinhada em 8 bytes][valor: double]
+_CABECALHO = 8
+_TAMANHO_INICIAL = 64 * 1024
+_PREFIXO_ARQUIVO = 'metricas_'
+_CONSOLIDADO = 'consolidado'
+_ARQUIVO_TRAVA = '.metricas.lock'
+_UINT = struct.Struct('I')
+_DOUBLE = struct.Struct('d')
+
+
+def _tamanho_entrada(chave: bytes) -> int:
+    return 4 + len(chave) + (-(4 + len(chave)) % 8) + 8
+
+
+def _percorrer(dados):
+    """Gera (chave, posição do valor) das entradas gravadas em um buffer"""
+    usado = _UINT.unpack_from(dados, 0)[0]
+    posicao = _CABECALHO
+    while posicao < usado:
+        tamanho = _UINT.unpack_from(dados, posicao)[0]
+        chave = bytes(dados[posicao + 4:posicao + 4 + tamanho]).decode('utf-8')
+        posicao += 4 + tamanho + (-(4 + tamanho) % 8)
+        yield chave, posicao
+        posicao += 8
+
+
+def _ler_entradas(dados):
+    """Gera (chave, valor) das entradas gravadas em um buffer"""
+    for chave, posicao in _percorrer(dados):
+        yield chave, _DOUBLE.unpack_from(dados, posicao)[0]
+
+
+class ArmazenamentoMemoria:
+    """Métricas só na memória do processo (sem diretório configurado)"""
+
+    def __init__(self):
+        self._valores = {}
+        self._lock = threading.Lock()
+
+    def incrementar(self, chave: str, valor: float):
+        with self._lock:
+            self._valores[chave] = self._valores.get(chave, 0.0) + valor
+
+    def incrementar_varios(self, incrementos):
+        with self._lock:
+            for chave, valor in incrementos:
+                self._valores[chave] = self._valores.get(chave, 0.0) + valor
+
+    def ler(self):
+        with self._lock:
+            return list(self._valores.items())
+
+
+class ArquivoMetricas:
+    """
+    Dicionário chave -> double em um arquivo mmap, gravado por um único processo.
+
+    As entradas só são acrescentadas (nunca removidas) e o cabeçalho é atualizado
+    depois da entrada completa, então outro processo pode ler o arquivo a
+    qualquer momento sem lock.
+    """
+
+    def __init__(self, caminho: str):
+        self.caminho = caminho
+        self._lock = threading.Lock()
+        self._posicoes = {}
+
+        self._arquivo = open(caminho, 'a+b')
+        if os.fstat(self._arquivo.fileno()).st_size == 0:
+            self._arquivo.truncate(_TAMANHO_INICIAL)
+        self._mapear()
+
+        # Arquivo reaproveitado (mesmo pid): recupera a posição do valor de cada chave
+        self._usado = _UINT.unpack_from(self._mmap, 0)[0] or _CABECALHO
+        self._posicoes.update(_percorrer(self._mmap))
+
+    def _mapear(self):
+        self._tamanho = os.fstat(self._arquivo.fileno()).st_size
+        self._mmap = mmap.mmap(self._arquivo.fileno(), self._tamanho)
+
+    def _criar_entrada(self, chave: str) -> int:
+        codificada = chave.encode('utf-8')
+        tamanho = _tamanho_entrada(codificada)
+        if self._usado + tamanho > self._tamanho:
+            self._mmap.close()
+            self._arquivo.truncate(max(self._tamanho * 2, self._usado + tamanho))
+            self._mapear()
+
+        inicio = self._usado
+        struct.pack_into(f'I{len(codificada)}s', self._mmap, inicio, len(codificada), codificada)
+        posicao_valor = inicio + tamanho - 8
+        _DOUBLE.pack_into(self._mmap, posicao_valor, 0.0)
+        self._usado += tamanho
+        # Publica a entrada só depois de gravada por completo
+        _UINT.pack_into(self._mmap, 0, self._usado)
+        return posicao_valor
+
+    def _somar(self, chave: str, valor: float):
+        posicao = self._posicoes.get(chave)
+        if posicao is None:
+            posicao = self._posicoes[chave] = self._criar_entrada(chave)
+        _DOUBLE.pack_into(self._mmap, posicao, _DOUBLE.unpack_from(self._mmap, posicao)[0] + valor)
+
+    def incrementar(self, chave: str, valor: float):
+        with self._lock:
+            self._somar(chave, valor)
+
+    def incrementar_varios(self, incrementos):
+        """Vários incrementos sob um único lock (ex.: bucket, soma e contagem)"""
+        with self._lock:
+            for chave, valor in incrementos:
+                self._somar(chave, valor)
+
+    def ler(self):
+        with self._lock:
+            return list(_ler_entradas(self._mmap))
+
+    def fechar(self):
+        with self._lock:
+            self._mmap.close()
+            self._arquivo.close()
+
+
+def caminho_arquivo(diretorio: str, pid: int) -> str:
+    return os.path.join(diretorio, f'{_PREFIXO_ARQUIVO}{pid}.db')
+
+
+@contextlib.contextmanager
+def _travar(diretorio: str, exclusiva: bool):
+    """
+    flock no diretório: a consolidação (exclusiva) não roda no meio de uma leitura
+    (compartilhada), que veria a mesma série no arquivo do pid e no consolidado.
+    """
+    if fcntl is None:
+        yield
+        return
+    with open(os.path.join(diretorio, _ARQUIVO_TRAVA), 'a+b') as trava:
+        fcntl.flock(trava.fileno(), fcntl.LOCK_EX if exclusiva else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(trava.fileno(), fcntl.LOCK_UN)
+
+
+def _arquivos(diretorio: str):
+    return glob.glob(os.path.join(diretorio, f'{_PREFIXO_ARQUIVO}*.db'))
+
+
+def _ler_arquivo(caminho: str):
+    try:
+        with open(caminho, 'rb') as arquivo:
+            dados = arquivo.read()
+    except OSError:
+        return []
+    if len(dados) < _CABECALHO:
+        return []
+    return list(_ler_entradas(dados))
+
+
+def ler_diretorio(diretorio: str):
+    """(chave, valor) de todos os arquivos de métricas do diretório"""
+    with _travar(diretorio, exclusiva=False):
+        return [entrada for caminho in _arquivos(diretorio) for entrada in _ler_arquivo(caminho)]
+
+
+def _pid_do_arquivo(caminho: str):
+    nome = os.path.basename(caminho)[len(_PREFIXO_ARQUIVO):-len('.db')]
+    return int(nome) if nome.isdigit() else None
+
+
+def _processo_vivo(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def consolidar_processo(diretorio: str, pid: int) -> bool:
+    """
+    Soma o arquivo de um processo encerrado ao arquivo consolidado e o remove.
+    Chamado pelo hook child_exit do gunicorn (gunicorn.conf.py) e na coleta.
+    """
+    origem = caminho_arquivo(diretorio, pid)
+    with _travar(diretorio, exclusiva=True):
+        if not os.path.exists(origem):
+            return False
+        incrementos = [(chave, valor) for chave, valor in _ler_arquivo(origem) if valor]
+        if incrementos:
+            consolidado = ArquivoMetricas(caminho_arquivo(diretorio, _CONSOLIDADO))
+            try:
+                consolidado.incrementar_varios(incrementos)
+            finally:
+                consolidado.fechar()
+        os.remove(origem)
+    return True
+
+
+def consolidar_mortos(diretorio: str) -> int:
+    """Consolida os arquivos de pids que não existem mais; retorna quantos"""
+    consolidados = 0
+    for caminho in _arquivos(diretorio):
+        pid = _pid_do_arquivo(caminho)
+        if pid is None or pid == os.getpid() or _processo_vivo(pid):
+            continue
+        consolidados += consolidar_processo(diretorio, pid)
+    return consolidados
+
+
+def limpar_diretorio(diretorio: str):
+    """
+    Remove os arquivos de métricas de execuções anteriores (inclusive o consolidado).
+    Roda uma vez no processo principal, antes de iniciar os workers (hook
+    on_starting do gunicorn.conf.py).
+    """
+    for caminho in _arquivos(diretorio):
+        try:
+            os.remove(caminho)
+        except FileNotFoundError:
+            pass
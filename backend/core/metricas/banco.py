@@ -0,0 +1,21 @@
+"""
+Métricas das consultas ao banco
+Alimentadas pelo execute_wrapper do profiler de SQL (core.perfil.sql)
+"""
+
+from .registro import Histograma
+
+DURACAO_CONSULTAS = Histograma(
+    'db_query_duration_seconds',
+    'Duração das consultas ao banco por alias e operação',
+    rotulos=('banco', 'operacao'),
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+
+_OPERACOES = frozenset({'SELECT', 'INSERT', 'UPDATE', 'DELETE'})
+
+
+def operacao_sql(sql) -> str:
+    """SELECT, INSERT, UPDATE, DELETE ou OUTRA"""
+    operacao = str(sql).lstrip()[:6].upper()
+    return operacao if operacao in _OPERACOES else 'OUTRA'
@@ -0,0 +1,249 @@
+"""
+Registro de métricas no formato do Prometheus (contadores e histogramas)
+Os valores ficam no armazenamento do processo; a coleta agrega todos os workers
+"""
+
+import bisect
+import json
+import math
+import os
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+
+from .armazenamento import (
+    ArmazenamentoMemoria,
+    ArquivoMetricas,
+    caminho_arquivo,
+    consolidar_mortos,
+    ler_diretorio,
+)
+
+BUCKETS_PADRAO = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 10.0)
+
+_lock = threading.Lock()
+_armazenamento = None
+_metricas = {}  # nome -> métrica declarada (para o HELP/TYPE da coleta)
+
+
+def _diretorio() -> str:
+    return getattr(settings, 'METRICAS', {}).get('DIRETORIO') or ''
+
+
+def _obter_armazenamento():
+    """Armazenamento do processo atual, criado sob demanda"""
+    global _armazenamento
+    if _armazenamento is None:
+        with _lock:
+            if _armazenamento is None:
+                diretorio = _diretorio()
+                if diretorio:
+                    os.makedirs(diretorio, exist_ok=True)
+                    _armazenamento = ArquivoMetricas(caminho_arquivo(diretorio, os.getpid()))
+                else:
+                    _armazenamento = ArmazenamentoMemoria()
+    return _armazenamento
+
+
+def _descartar_apos_fork():
+    # O worker criado por fork (gunicorn --preload) grava no próprio arquivo
+    global _armazenamento, _lock
+    _armazenamento = None
+    _lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_descartar_apos_fork)
+
+
+def _chave(tipo: str, nome: str, rotulos: dict) -> str:
+    return json.dumps([tipo, nome, sorted(rotulos.items())], separators=(',', ':'))
+
+
+class _Metrica:
+    tipo = None
+
+    def __init__(self, nome: str, descricao: str, rotulos=()):
+        self.nome = nome
+        self.descricao = descricao
+        self.rotulos = tuple(rotulos)
+        self._chaves = {}
+        _metricas[nome] = self
+
+    def _rotulos(self, valores: dict) -> dict:
+        return {rotulo: str(valores.get(rotulo, '')) for rotulo in self.rotulos}
+
+
+class Contador(_Metrica):
+    """Contador monotônico, somado entre os processos"""
+    tipo = 'counter'
+
+    def incrementar(self, valor: float = 1, **rotulos):
+        identificador = tuple(map(rotulos.get, self.rotulos))
+        chave = self._chaves.get(identificador)
+        if chave is None:
+            chave = self._chaves[identificador] = _chave(self.tipo, self.nome, self._rotulos(rotulos))
+        _obter_armazenamento().incrementar(chave, valor)
+
+
+class Histograma(_Metrica):
+    """
+    Histograma de buckets fixos. Cada observação grava só o seu bucket, a soma e
+    a contagem; os buckets acumulados (le) são montados na coleta.
+    """
+    tipo = 'histogram'
+
+    def __init__(self, nome: str, descricao: str, rotulos=(), buckets=BUCKETS_PADRAO):
+        super().__init__(nome, descricao, rotulos)
+        self.buckets = tuple(sorted(buckets))
+
+    def _chaves_serie(self, rotulos: dict):
+        base = self._rotulos(rotulos)
+        limites = [_formatar(limite) for limite in self.buckets] + ['+Inf']
+        return (
+            [_chave(self.tipo, self.nome, {**base, 'le': limite}) for limite in limites],
+            _chave(self.tipo, self.nome, {**base, '__sum': '1'}),
+            _chave(self.tipo, self.nome, {**base, '__count': '1'}),
+        )
+
+    def observar(self, valor: float, **rotulos):
+        identificador = tuple(map(rotulos.get, self.rotulos))
+        chaves = self._chaves.get(identificador)
+        if chaves is None:
+            chaves = self._chaves[identificador] = self._chaves_serie(rotulos)
+        buckets, soma, contagem = chaves
+
+        _obter_armazenamento().incrementar_varios((
+            (buckets[bisect.bisect_left(self.buckets, valor)], 1),
+            (soma, valor),
+            (contagem, 1),
+        ))
+
+
+def _formatar(valor: float) -> str:
+    if valor == math.inf:
+        return '+Inf'
+    if float(valor).is_integer():
+        return f'{valor:.1f}'
+    return repr(float(valor))
+
+
+def coletar() -> dict:
+    """
+    Soma os valores de todos os processos.
+    Retorna {(tipo, nome): {rótulos ordenados: valor}}.
+    """
+    diretorio = _diretorio()
+    if diretorio:
+        # Workers que morreram sem passar pelo child_exit (ex.: SIGKILL, uvicorn)
+        consolidar_mortos(diretorio)
+        entradas = ler_diretorio(diretorio)
+    else:
+        entradas = _obter_armazenamento().ler()
+
+    series = defaultdict(lambda: defaultdict(float))
+    for chave, valor in entradas:
+        tipo, nome, rotulos = json.loads(chave)
+        series[(tipo, nome)][tuple(tuple(par) for par in rotulos)] += valor
+    return series
+
+
+def _separar_histograma(nome: str, valores: dict):
+    """
+    Agrupa as séries de um histograma por conjunto de rótulos (sem le/__sum/__count),
+    completando com zero os buckets declarados que ainda não receberam observações.
+    """
+    metrica = _metricas.get(nome)
+    limites = (*getattr(metrica, 'buckets', ()), math.inf)
+    grupos = defaultdict(lambda: {'buckets': dict.fromkeys(limites, 0.0), 'soma': 0.0, 'contagem': 0.0})
+    for rotulos, valor in valores.items():
+        base = tuple(par for par in rotulos if par[0] not in ('le', '__sum', '__count'))
+        especiais = dict(par for par in rotulos if par[0] in ('le', '__sum', '__count'))
+        if 'le' in especiais:
+            limite = math.inf if especiais['le'] == '+Inf' else float(especiais['le'])
+            grupos[base]['buckets'][limite] = valor
+        elif '__sum' in especiais:
+            grupos[base]['soma'] = valor
+        else:
+            grupos[base]['contagem'] = valor
+    return grupos
+
+
+def estimar_percentil(buckets: dict, quantil: float):
+    """
+    Estima o quantil por interpolação linear dentro do bucket, como o
+    histogram_quantile do Prometheus. `buckets` é {limite: contagem não acumulada}.
+    """
+    total = sum(buckets.values())
+    if not total:
+        return None
+    alvo = quantil * total
+    acumulado = 0.0
+    anterior = 0.0
+    for limite in sorted(buckets):
+        contagem = buckets[limite]
+        if acumulado + contagem >= alvo and contagem:
+            if limite == math.inf:
+                return anterior
+            return anterior + (limite - anterior) * (alvo - acumulado) / contagem
+        acumulado += contagem
+        anterior = limite if limite != math.inf else anterior
+    return anterior
+
+
+def resumir_histogramas(quantis=(0.5, 0.95, 0.99)) -> dict:
+    """Percentis estimados de cada série de histograma, por métrica"""
+    resumo = {}
+    for (tipo, nome), valores in coletar().items():
+        if tipo != Histograma.tipo:
+            continue
+        for rotulos, serie in _separar_histograma(nome, valores).items():
+            item = dict(rotulos)
+            item['contagem'] = int(serie['contagem'])
+            item['media'] = serie['soma'] / serie['contagem'] if serie['contagem'] else None
+            for quantil in quantis:
+                item[f'p{int(quantil * 100)}'] = estimar_percentil(serie['buckets'], quantil)
+            resumo.setdefault(nome, []).append(item)
+    return resumo
+
+
+def _escapar(valor: str) -> str:
+    return str(valor).replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+
+
+def _linha(nome: str, rotulos, valor: float) -> str:
+    if rotulos:
+        texto = ','.join(f'{rotulo}="{_escapar(valor_rotulo)}"' for rotulo, valor_rotulo in rotulos)
+        return f'{nome}{{{texto}}} {_formatar_valor(valor)}'
+    return f'{nome} {_formatar_valor(valor)}'
+
+
+def _formatar_valor(valor: float) -> str:
+    if float(valor).is_integer():
+        return str(int(valor))
+    return repr(float(valor))
+
+
+def renderizar() -> str:
+    """Texto no formato de exposição do Prometheus (text/plain; version=0.0.4)"""
+    linhas = []
+    for (tipo, nome), valores in sorted(coletar().items()):
+        metrica = _metricas.get(nome)
+        if metrica is not None:
+            linhas.append(f'# HELP {nome} {_escapar(metrica.descricao)}')
+        linhas.append(f'# TYPE {nome} {tipo}')
+
+        if tipo != Histograma.tipo:
+            for rotulos, valor in sorted(valores.items()):
+                linhas.append(_linha(nome, rotulos, valor))
+            continue
+
+        for rotulos, serie in sorted(_separar_histograma(nome, valores).items()):
+            acumulado = 0.0
+            for limite in sorted(serie['buckets']):
+                acumulado += serie['buckets'][limite]
+                linhas.append(_linha(f'{nome}_bucket', rotulos + (('le', _formatar(limite)),), acumulado))
+            linhas.append(_linha(f'{nome}_sum', rotulos, serie['soma']))
+            linhas.append(_linha(f'{nome}_count', rotulos, serie['contagem']))
+
+    return '\n'.join(linhas) + '\n'
@@ -0,0 +1,38 @@
+"""
+Endpoint de coleta das métricas (scrape do Prometheus)
+"""
+
+import hmac
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotFound, JsonResponse
+from django.views import View
+
+from .registro import renderizar, resumir_histogramas
+
+
+class MetricasView(View):
+    """
+    Expõe as métricas agregadas de todos os workers.
+
+    GET retorna o formato texto do Prometheus; ?formato=json retorna os
+    percentis estimados (p50/p95/p99) de cada histograma. Exige o header
+    `Authorization: Bearer <METRICAS['TOKEN']>`; sem token configurado o
+    endpoint só responde com DEBUG ativo.
+    """
+    content_type = 'text/plain; version=0.0.4; charset=utf-8'
+
+    def get(self, request):
+        if not self._autorizado(request):
+            return HttpResponseNotFound()
+
+        if request.GET.get('formato') == 'json':
+            return JsonResponse(resumir_histogramas())
+        return HttpResponse(renderizar(), content_type=self.content_type)
+
+    def _autorizado(self, request) -> bool:
+        token = getattr(settings, 'METRICAS', {}).get('TOKEN')
+        if not token:
+            return settings.DEBUG
+        esquema, _, credencial = request.headers.get('Authorization', '').partition(' ')
+        return esquema.lower() == 'bearer' and hmac.compare_digest(credencial.encode(), token.encode())
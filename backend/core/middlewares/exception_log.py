@@ -4,18 +4,39 @@ Registra exceções antes que sejam processadas pelo handler DRF
 """
 
 import logging
-from django.utils.deprecation import MiddlewareMixin
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from core.rotas.registro import LOGGER_PADRAO, obter_metadados
 from core.tenancy.context import get_request_id, get_current_tenant, get_current_user
 
 
-class GlobalExceptionLogMiddleware(MiddlewareMixin):
-    """Middleware para log de exceções não tratadas antes do handler DRF"""
-    
+class GlobalExceptionLogMiddleware:
+    """
+    Middleware para log de exceções não tratadas antes do handler DRF.
+    Híbrido sync/async: só atua via process_exception, chamado pelo handler
+    do Django quando a view levanta uma exceção.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        return await self.get_response(request)
+
     def process_exception(self, request, exception):
         """Captura e loga exceções não tratadas"""
         try:
             # Determina o logger baseado no path da requisição
-            logger = self._get_logger_for_path(request.path)
+            logger = self._get_logger(request)
             
             # Extrai informações do contexto
             request_id = get_request_id()
@@ -60,27 +81,11 @@ class GlobalExceptionLogMiddleware(MiddlewareMixin):
         # Sempre retorna None para que a exceção seja processada pelo handler DRF
         return None
     
-    def _get_logger_for_path(self, path):
-        """Determina o logger apropriado baseado no path da requisição"""
-        path_lower = path.lower().strip('/')
-        
-        # Mapeia prefixos de path para loggers específicos
-        path_mappings = [
-            ('api/portfolios', 'apps.saas.portfolios'),
-            ('api/tenants', 'apps.tenants'), 
-            ('api/public', 'apps.public'),
-            ('api/planos', 'apps.planos'),
-            ('admin', 'django.admin'),
-            ('health', 'apps.public'),
-        ]
-        
-        for prefix, logger_name in path_mappings:
-            if path_lower.startswith(prefix):
-                return logging.getLogger(logger_name)
-        
-        # Logger padrão para paths não mapeados
-        return logging.getLogger('django.request')
-    
+    def _get_logger(self, request):
+        """Logger da rota, pré-calculado no registro de rotas (core.rotas)"""
+        metadados = obter_metadados(request)
+        return logging.getLogger(metadados.logger if metadados else LOGGER_PADRAO)
+
     def _get_remote_addr(self, request):
         """Extrai o endereço IP do cliente"""
         # Verifica headers de proxy primeiro
@@ -0,0 +1,67 @@
+"""
+Middleware de health check
+Responde /healthz/ (liveness) e /readyz/ (readiness) antes do restante da cadeia
+"""
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.http import JsonResponse
+from core.saude.verificacoes import obter_prontidao, prontidao_em_cache
+
+
+def _variantes(url: str) -> set:
+    # Aceita com e sem barra final: probes de load balancer não seguem redirect
+    return {url, url.rstrip('/')} - {''}
+
+
+class HealthCheckMiddleware:
+    """
+    Primeiro middleware da cadeia: as sondagens não passam por sessão,
+    autenticação, CSRF, redirect SSL nem validação de host.
+
+    HEALTH_CHECK_URL responde 200 se o processo atende requisições.
+    READINESS_CHECK_URL verifica banco e cache (resultado em cache por
+    HEALTH_CHECK_CACHE_SEGUNDOS) e responde 503 se alguma dependência falhar.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.urls_liveness = _variantes(getattr(settings, 'HEALTH_CHECK_URL', '/healthz/'))
+        self.urls_readiness = _variantes(getattr(settings, 'READINESS_CHECK_URL', '/readyz/'))
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+
+        path = request.path_info
+        if path in self.urls_liveness:
+            return self._liveness()
+        if path in self.urls_readiness:
+            return self._readiness(obter_prontidao())
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        path = request.path_info
+        if path in self.urls_liveness:
+            return self._liveness()
+        if path in self.urls_readiness:
+            # Banco e cache são síncronos; só troca de thread quando o cache expirou
+            resultado = prontidao_em_cache() or await sync_to_async(obter_prontidao)()
+            return self._readiness(resultado)
+        return await self.get_response(request)
+
+    def _liveness(self):
+        return self._responder({'status': 'ok'}, 200)
+
+    def _readiness(self, resultado):
+        return self._responder(resultado, 200 if resultado['status'] == 'ok' else 503)
+
+    def _responder(self, dados, status):
+        response = JsonResponse(dados, status=status, json_dumps_params={'ensure_ascii': False})
+        response['Cache-Control'] = 'no-store'
+        return response
@@ -4,49 +4,64 @@ Responsável por inicializar e limpar contexto global
 """
 
 import uuid
-from django.utils.deprecation import MiddlewareMixin
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
 from core.tenancy.context import (
     reset_context,
     set_request_id,
-    get_request_id,
-    set_current_user
 )
 
 
-class RequestContextMiddleware(MiddlewareMixin):
-    """Middleware para gerenciar o contexto global da requisição"""
-    
+class RequestContextMiddleware:
+    """
+    Middleware para gerenciar o contexto global da requisição.
+    Híbrido sync/async: sob ASGI roda no event loop, sem troca de thread.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+
+        self.process_request(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            # Limpa o contexto mesmo se uma camada interna propagar exceção
+            reset_context()
+        return self.process_response(request, response)
+
+    async def __acall__(self, request):
+        self.process_request(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            reset_context()
+        return self.process_response(request, response)
+
     def process_request(self, request):
         """Inicializa o contexto no início da requisição"""
         # Reset contexto para garantir estado limpo
         reset_context()
-        
+
         # Extrai ou gera request_id
         request_id = self._extrair_request_id(request)
         set_request_id(request_id)
-        
+
         # Armazena no request para acesso posterior
         request.request_id = request_id
-        
-        return None
-    
+
     def process_response(self, request, response):
-        """Limpa o contexto ao final da requisição"""
-        # Adiciona request_id ao header de resposta
-        request_id = get_request_id()
-        if request_id:
-            response['X-Request-ID'] = request_id
-        
-        # Reset contexto
-        reset_context()
-        
+        """Adiciona request_id ao header de resposta"""
+        response['X-Request-ID'] = request.request_id
         return response
-    
-    def process_exception(self, request, exception):
-        """Limpa o contexto em caso de exceção"""
-        reset_context()
-        return None
-    
+
     def _extrair_request_id(self, request) -> str:
         """Extrai request_id do header ou gera um novo"""
         # Tenta extrair do header X-Request-ID
@@ -3,54 +3,162 @@ Middleware para logging de requisições HTTP
 Registra início, fim e métricas de cada requisição
 """
 
+import random
+import threading
 import time
 import logging
-from django.utils.deprecation import MiddlewareMixin
+from collections import defaultdict
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from core.metricas.registro import Histograma
+from core.perfil.sql import obter_perfil
+from core.perfil.tempos import obter_tempos
+from core.rotas.registro import obter_metadados
 from core.tenancy.context import get_request_id, get_current_tenant, get_current_user
 
 logger = logging.getLogger('requests')
 
+_IGNORAR_PADRAO = ['/health', '/healthz', '/readyz', '/favicon.ico', '/metrics']
+
+DURACAO_REQUISICOES = Histograma(
+    'http_request_duration_seconds',
+    'Duração das requisições HTTP por rota e classe de status',
+    rotulos=('rota', 'status'),
+)
+
+_lock = threading.Lock()
+_contadores = defaultdict(lambda: {'requisicoes': 0, 'bytes': 0, 'duracao_ms': 0.0, 'logadas': 0,
+                                   '2xx': 0, '3xx': 0, '4xx': 0, '5xx': 0})
+
+
+def obter_contadores() -> dict:
+    """Contadores exatos por rota (independentes da amostragem do log)"""
+    with _lock:
+        return {rota: dict(valores) for rota, valores in _contadores.items()}
+
+
+class _ContadorBase:
+    """Repassa o conteúdo de uma resposta streaming contando os bytes enviados"""
+
+    def __init__(self, conteudo, ao_terminar):
+        self.conteudo = conteudo
+        self.ao_terminar = ao_terminar
+        self.total = 0
+        self.finalizado = False
+
+    def close(self):
+        # Chamado ao fim da iteração, na desconexão do cliente ou no close() da resposta
+        if not self.finalizado:
+            self.finalizado = True
+            self.ao_terminar(self.total)
+
+
+class _ContadorBytes(_ContadorBase):
+    def __iter__(self):
+        try:
+            for parte in self.conteudo:
+                self.total += len(parte)
+                yield parte
+        finally:
+            self.close()
+
+
+class _ContadorBytesAsync(_ContadorBase):
+    """Versão para StreamingHttpResponse com iterador assíncrono (ASGI)"""
+
+    async def __aiter__(self):
+        try:
+            async for parte in self.conteudo:
+                self.total += len(parte)
+                yield parte
+        finally:
+            self.close()
+
+
+class RequestLogMiddleware:
+    """
+    Middleware para log detalhado de requisições HTTP.
+    Híbrido sync/async: sob ASGI roda no event loop, sem troca de thread.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        self.process_request(request)
+        response = self.get_response(request)
+        return self.process_response(request, response)
+
+    async def __acall__(self, request):
+        self.process_request(request)
+        response = await self.get_response(request)
+        return self.process_response(request, response)
 
-class RequestLogMiddleware(MiddlewareMixin):
-    """Middleware para log detalhado de requisições HTTP"""
-    
     def process_request(self, request):
         """Marca o início da requisição"""
         request._start_time = time.perf_counter()
         return None
-    
+
     def process_response(self, request, response):
         """Registra a requisição completa"""
-        self._log_request(request, response)
+        if not self._should_log_request(request):
+            return response
+
+        exception = getattr(request, '_log_exception', None)
+
+        content_length = response.get('Content-Length')
+        if content_length is not None or not response.streaming:
+            # Tamanho conhecido: header ou corpo já em memória
+            self._log_request(request, response, self._get_content_length(response), exception)
+            return response
+
+        # Streaming sem Content-Length: registra quando o último byte for enviado
+        def ao_terminar(total):
+            self._log_request(request, response, total, exception)
+
+        contador = _ContadorBytesAsync if response.is_async else _ContadorBytes
+        response.streaming_content = contador(response.streaming_content, ao_terminar)
         return response
-    
+
     def process_exception(self, request, exception):
-        """Registra requisição que terminou com exceção"""
-        # Cria uma resposta fake com status 500 para o log
-        class FakeResponse:
-            status_code = 500
-            
-            def get(self, header, default=None):
-                return default
-        
-        fake_response = FakeResponse()
-        self._log_request(request, fake_response, exception=exception)
+        """Guarda a exceção para o registro feito em process_response"""
+        # O handler converte a exceção em resposta 500, que passa por process_response
+        request._log_exception = exception
         return None
-    
-    def _log_request(self, request, response, exception=None):
+
+    def _log_request(self, request, response, content_length, exception=None):
         """Faz o log da requisição"""
         try:
             # Calcula duração
             duration = self._calculate_duration(request)
-            
+
             # Extrai informações da requisição
             method = request.method
             path = request.get_full_path()
             status_code = response.status_code
-            content_length = self._get_content_length(response)
+            rota = self._get_route(request)
+
+            self._count_request(rota, status_code, content_length, duration)
+
+            # Amostragem por rota: erros 5xx e exceções são sempre registrados
+            sample_rate = self._get_sample_rate(request, rota)
+            if exception is None and status_code < 500 and random.random() >= sample_rate:
+                return
+            self._count_request(rota, logged=True)
+
             remote_addr = self._get_remote_addr(request)
             user_agent = request.headers.get('User-Agent', '-')[:200]  # Trunca
-            
+            perfil_sql = obter_perfil()
+            tempos = obter_tempos()
+
             # Monta mensagem de log
             if exception:
                 message = f"REQUEST_EXCEPTION {method} {path} - {status_code} - {duration:.0f}ms - {type(exception).__name__}: {str(exception)[:100]}"
@@ -58,7 +166,7 @@ class RequestLogMiddleware(MiddlewareMixin):
             else:
                 message = f"REQUEST {method} {path} - {status_code} - {duration:.0f}ms"
                 log_level = self._get_log_level(status_code)
-            
+
             # Faz o log com informações extras
             logger.log(
                 log_level,
@@ -66,57 +174,100 @@ class RequestLogMiddleware(MiddlewareMixin):
                 extra={
                     'method': method,
                     'path': path,
+                    'route': rota,
                     'status_code': status_code,
                     'duration_ms': round(duration, 2),
                     'content_length': content_length,
+                    'sample_rate': sample_rate,
                     'remote_addr': remote_addr,
                     'user_agent': user_agent,
+                    'db_queries': perfil_sql.consultas if perfil_sql else None,
+                    'db_time_ms': round(perfil_sql.tempo_ms, 2) if perfil_sql else None,
+                    'tempos_ms': tempos.como_dict() if tempos else None,
                     'exception_type': type(exception).__name__ if exception else None,
                     'exception_message': str(exception)[:200] if exception else None,
                 }
             )
-            
+
         except Exception as e:
             # Não deve falhar o request por erro no logging
             logger.error(f"Erro no RequestLogMiddleware: {e}", exc_info=True)
-    
+
     def _calculate_duration(self, request):
         """Calcula a duração da requisição em milissegundos"""
         start_time = getattr(request, '_start_time', None)
         if start_time:
             return (time.perf_counter() - start_time) * 1000
         return 0
-    
+
     def _get_content_length(self, response):
-        """Extrai o tamanho do conteúdo da resposta"""
+        """Extrai o tamanho do conteúdo da resposta sem ler corpos streaming"""
         try:
             content_length = response.get('Content-Length')
             if content_length:
                 return int(content_length)
-            
-            # Tenta estimar pelo conteúdo
-            if hasattr(response, 'content'):
+
+            # Corpo já materializado (HttpResponse comum)
+            if not response.streaming:
                 return len(response.content)
-            
+
         except (ValueError, AttributeError):
             pass
-        
+
         return 0
-    
+
+    def _get_route(self, request):
+        """Identificador estável da rota (nome da URL ou padrão), sem ids no path"""
+        match = getattr(request, 'resolver_match', None)
+        if match is not None:
+            return match.view_name or match.route or request.path
+        # Paths sem rota (404) ficam em um único contador para não crescer sem limite
+        return '<nao_resolvida>'
+
+    def _get_sample_rate(self, request, rota):
+        """Fração de requisições logadas: pelo nome da rota ou pelo prefixo do path"""
+        metadados = obter_metadados(request)
+        if metadados is not None:
+            # Pré-calculada por rota no registro de rotas (core.rotas)
+            return metadados.amostragem
+
+        # Sem rota resolvida (404): '<nao_resolvida>' ou prefixo do path
+        amostragem = self._get_config().get('AMOSTRAGEM', {})
+        if rota in amostragem:
+            return amostragem[rota]
+        for prefixo, taxa in amostragem.items():
+            if prefixo.startswith('/') and request.path.startswith(prefixo):
+                return taxa
+        return 1.0
+
+    def _count_request(self, rota, status_code=None, content_length=0, duration=0.0, logged=False):
+        """Atualiza os contadores exatos da rota e o histograma de latência"""
+        with _lock:
+            contadores = _contadores[rota]
+            if logged:
+                contadores['logadas'] += 1
+                return
+            contadores['requisicoes'] += 1
+            contadores['bytes'] += content_length or 0
+            contadores['duracao_ms'] += duration
+            classe = f'{min(max(status_code // 100, 2), 5)}xx'
+            contadores[classe] += 1
+        DURACAO_REQUISICOES.observar(duration / 1000, rota=rota, status=classe)
+
     def _get_remote_addr(self, request):
         """Extrai o endereço IP do cliente"""
         # Verifica headers de proxy primeiro
         x_forwarded_for = request.headers.get('X-Forwarded-For')
         if x_forwarded_for:
             return x_forwarded_for.split(',')[0].strip()
-        
+
         x_real_ip = request.headers.get('X-Real-IP')
         if x_real_ip:
             return x_real_ip
-        
+
         # Fallback para REMOTE_ADDR
         return request.META.get('REMOTE_ADDR', '-')
-    
+
     def _get_log_level(self, status_code):
         """Determina o nível de log baseado no status code"""
         if status_code >= 500:
@@ -125,17 +276,14 @@ class RequestLogMiddleware(MiddlewareMixin):
             return logging.WARNING
         else:
             return logging.INFO
-    
+
+    def _get_config(self):
+        return getattr(settings, 'REQUEST_LOG', {})
+
     def _should_log_request(self, request):
         """Determina se a requisição deve ser logada"""
-        # Pode ser usado para filtrar requisições (health checks, etc)
-        path = request.get_full_path().lower()
-        
-        # Lista de paths que não devem ser logados (opcional)
-        skip_paths = [
-            '/health',
-            '/healthz',
-            '/favicon.ico',
-        ]
-        
+        # Filtra requisições de infraestrutura (health checks, etc)
+        path = request.path.lower()
+        skip_paths = self._get_config().get('IGNORAR', _IGNORAR_PADRAO)
+
         return not any(path.startswith(skip_path) for skip_path in skip_paths)
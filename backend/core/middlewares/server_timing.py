@@ -0,0 +1,75 @@
+"""
+Middleware de Server-Timing
+Coleta as fases da requisição (core.perfil.tempos) e as expõe no header Server-Timing
+"""
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from core.perfil.sql import obter_perfil
+from core.perfil.tempos import finalizar_tempos, iniciar_tempos
+from core.tenancy.context import get_current_user
+
+
+class ServerTimingMiddleware:
+    """
+    Ativa a coleta de fases (auth, hash, serializer, render) por requisição,
+    soma o tempo de banco do profiler de SQL e envia o header Server-Timing
+    com DEBUG ou para usuários staff. As fases também vão para o log de
+    requisições (RequestLogMiddleware).
+
+    Com SERVER_TIMING['ATIVO'] desligado o middleware é removido da cadeia
+    (MiddlewareNotUsed) e medir() não custa mais que a leitura de um ContextVar.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'SERVER_TIMING', {}).get('ATIVO'):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+
+        tempos, token = iniciar_tempos()
+        try:
+            response = self.get_response(request)
+        finally:
+            finalizar_tempos(token)
+        return self.process_response(request, response, tempos)
+
+    async def __acall__(self, request):
+        tempos, token = iniciar_tempos()
+        try:
+            response = await self.get_response(request)
+        finally:
+            finalizar_tempos(token)
+        return self.process_response(request, response, tempos)
+
+    def process_response(self, request, response, tempos):
+        if self._exibir():
+            response['Server-Timing'] = self._montar_header(tempos)
+        return response
+
+    def _exibir(self) -> bool:
+        if settings.DEBUG:
+            return True
+        user = get_current_user()
+        return bool(user is not None and getattr(user, 'is_staff', False))
+
+    def _montar_header(self, tempos) -> str:
+        # As fases podem se sobrepor (ex.: consultas feitas durante a autenticação)
+        partes = [f'{fase};dur={duracao:.2f}' for fase, (duracao, _) in tempos.fases.items()]
+
+        perfil = obter_perfil()
+        if perfil is not None and perfil.consultas:
+            plural = 's' if perfil.consultas != 1 else ''
+            partes.append(f'db;dur={perfil.tempo_ms:.2f};desc="{perfil.consultas} consulta{plural}"')
+
+        partes.append(f'total;dur={tempos.total_ms():.2f}')
+        return ', '.join(partes)
@@ -0,0 +1,85 @@
+"""
+Middleware do profiler de SQL
+Abre um perfil por requisição e alerta consultas repetidas (N+1) ao final
+"""
+
+import logging
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from core.perfil.sql import configuracao, finalizar_perfil, iniciar_perfil
+from core.tenancy.context import get_request_id
+
+logger = logging.getLogger('core.sql')
+
+
+class SqlProfilerMiddleware:
+    """
+    Conta consultas e tempo de banco da requisição (core.perfil.sql).
+
+    Consultas executadas depois da resposta (ex.: ao iterar uma
+    StreamingHttpResponse) ficam fora do perfil, mas continuam nas métricas.
+    Com SQL_PROFILER['HEADERS'] os totais vão na resposta.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.config = configuracao()
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+
+        perfil, token = iniciar_perfil()
+        try:
+            response = self.get_response(request)
+        finally:
+            finalizar_perfil(token)
+        return self.process_response(request, response, perfil)
+
+    async def __acall__(self, request):
+        perfil, token = iniciar_perfil()
+        try:
+            response = await self.get_response(request)
+        finally:
+            finalizar_perfil(token)
+        return self.process_response(request, response, perfil)
+
+    def process_response(self, request, response, perfil):
+        if not perfil.consultas:
+            return response
+
+        repetidas = perfil.mais_repetidas(self.config['N_MAIS_UM_LIMIAR'])
+        if repetidas:
+            self._alertar_n_mais_um(request, perfil, repetidas)
+
+        if self.config['HEADERS']:
+            response['X-DB-Queries'] = str(perfil.consultas)
+            response['X-DB-Time-ms'] = f'{perfil.tempo_ms:.1f}'
+            response['X-DB-Repetidas'] = str(repetidas[0][1] if repetidas else 0)
+        return response
+
+    def _alertar_n_mais_um(self, request, perfil, repetidas):
+        try:
+            sql, quantidade = repetidas[0]
+            logger.warning(
+                f"N_PLUS_ONE {request.method} {request.path} - {quantidade}x de {perfil.consultas} consultas: {sql[:200]}",
+                extra={
+                    'request_id': get_request_id(),
+                    'method': request.method,
+                    'path': request.path,
+                    'db_queries': perfil.consultas,
+                    'db_time_ms': round(perfil.tempo_ms, 2),
+                    'repetidas': [
+                        {'fingerprint': sql, 'execucoes': quantidade}
+                        for sql, quantidade in repetidas[:5]
+                    ],
+                }
+            )
+        except Exception as e:
+            # Não deve falhar o request por erro no profiler
+            logger.error(f"Erro no SqlProfilerMiddleware: {e}", exc_info=True)
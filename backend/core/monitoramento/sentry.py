@@ -0,0 +1,75 @@
+"""
+Inicialização do Sentry
+Chamada pelo wsgi/asgi antes de montar a aplicação e, nos comandos de longa duração
+do manage.py (processar_emails, importar_usuarios...), pelo CoreConfig.ready.
+O SDK e as integrações só são importados quando há SENTRY_DSN, e nunca no import
+dos settings nem nos comandos administrativos rápidos.
+"""
+
+import logging
+import os
+import sys
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+_iniciado = False
+
+# Comandos curtos ou interativos: não pagam o import do SDK
+COMANDOS_LEVES = frozenset({
+    'changepassword', 'check', 'collectstatic', 'createsuperuser', 'dbshell',
+    'diffsettings', 'help', 'makemigrations', 'migrate', 'perfil_inicializacao',
+    'shell', 'showmigrations', 'sqlmigrate', 'test', 'version',
+})
+
+
+def iniciar_sentry() -> bool:
+    """Inicializa o sentry_sdk uma vez por processo; retorna se está ativo"""
+    global _iniciado
+    if _iniciado:
+        return True
+
+    dsn = getattr(settings, 'SENTRY_DSN', '')
+    if not dsn:
+        return False
+
+    try:
+        import sentry_sdk
+        from sentry_sdk.integrations.django import DjangoIntegration
+        from sentry_sdk.integrations.logging import LoggingIntegration
+        from sentry_sdk.integrations.redis import RedisIntegration
+    except ImportError:
+        logger.warning("SENTRY_DSN configurado, mas o sentry-sdk não está instalado")
+        return False
+
+    sentry_sdk.init(
+        dsn=dsn,
+        integrations=[
+            DjangoIntegration(transaction_style='url'),
+            RedisIntegration(),
+            LoggingIntegration(level=logging.INFO, event_level=logging.ERROR),
+        ],
+        traces_sample_rate=getattr(settings, 'SENTRY_TRACES_SAMPLE_RATE', 0.1),
+        send_default_pii=False,
+        environment=getattr(settings, 'SENTRY_ENVIRONMENT', 'production'),
+        release=getattr(settings, 'APP_VERSION', '1.0.0'),
+    )
+    _iniciado = True
+    return True
+
+
+def comando_atual():
+    """Subcomando do manage.py / django-admin em execução (None fora deles)"""
+    executavel = os.path.basename(sys.argv[0]) if sys.argv else ''
+    if executavel not in ('manage.py', 'django-admin', '__main__.py') or len(sys.argv) < 2:
+        return None
+    return sys.argv[1]
+
+
+def iniciar_sentry_em_comando() -> bool:
+    """Inicializa o Sentry em comandos de gerenciamento que não estão em COMANDOS_LEVES"""
+    comando = comando_atual()
+    if comando is None or comando.startswith('-') or comando in COMANDOS_LEVES:
+        return False
+    return iniciar_sentry()
@@ -0,0 +1,40 @@
+"""
+Contagem aproximada de linhas a partir das estatísticas do planner
+Evita o COUNT(*) completo em tabelas grandes; fora do PostgreSQL retorna None
+"""
+
+import json
+from typing import Optional
+
+from django.db import connections
+
+
+def contar_aproximado(queryset) -> Optional[int]:
+    """
+    Estimativa do número de linhas do queryset.
+
+    Sem filtros usa pg_class.reltuples (atualizado pelo ANALYZE/autovacuum);
+    com filtros usa o "Plan Rows" do EXPLAIN. Em outros bancos retorna None.
+    """
+    conexao = connections[queryset.db]
+    if conexao.vendor != 'postgresql':
+        return None
+
+    with conexao.cursor() as cursor:
+        if not queryset.query.where:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [queryset.model._meta.db_table],
+            )
+            linha = cursor.fetchone()
+            # reltuples = -1 indica tabela nunca analisada
+            if linha and linha[0] >= 0:
+                return int(linha[0])
+
+        sql, params = queryset.order_by().values('pk').query.sql_with_params()
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plano = cursor.fetchone()[0]
+
+    if isinstance(plano, str):
+        plano = json.loads(plano)
+    return int(plano[0]['Plan']['Plan Rows'])
@@ -0,0 +1,27 @@
+"""
+Paginator com contagem estimada para listagens grandes (ex.: changelist do admin)
+"""
+
+from django.core.paginator import Paginator
+from django.utils.functional import cached_property
+
+from .contagem import contar_aproximado
+
+# Abaixo disso o COUNT(*) exato é barato e a estimativa não compensa
+LIMITE_CONTAGEM_EXATA = 10_000
+
+
+class PaginadorContagemEstimada(Paginator):
+    """
+    Usa a estimativa do planner como total quando ela passa de
+    LIMITE_CONTAGEM_EXATA; caso contrário (ou fora do PostgreSQL) faz o
+    COUNT(*) normal. O número de páginas fica aproximado nas tabelas grandes.
+    """
+
+    @cached_property
+    def count(self):
+        if hasattr(self.object_list, 'query'):
+            estimativa = contar_aproximado(self.object_list)
+            if estimativa is not None and estimativa >= LIMITE_CONTAGEM_EXATA:
+                return estimativa
+        return super().count
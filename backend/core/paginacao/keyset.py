@@ -0,0 +1,140 @@
+"""
+Paginação por keyset com cursor opaco
+Cada página é um range scan no índice (campo, id): latência constante em qualquer profundidade
+"""
+
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .contagem import contar_aproximado
+
+
+class KeysetPagination(BasePagination):
+    """
+    Pagina por (campo_ordenacao, pk) sem OFFSET nem COUNT(*).
+
+    O cursor codifica o valor do campo e o pk do último (ou primeiro) item da
+    página e o sentido da navegação. O campo de ordenação não pode ser nulo e
+    deve haver um índice em (campo_ordenacao, id).
+
+    ?total=aproximado inclui `total_aproximado` com a estimativa do planner
+    (null fora do PostgreSQL).
+    """
+    campo_ordenacao = None
+    decrescente = True
+    page_size = 20
+    page_size_query_param = 'limite'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    total_query_param = 'total'
+    mensagem_cursor_invalido = 'Cursor inválido'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.limite = self.get_page_size(request)
+        posicao, self.voltando = self.decodificar_cursor(queryset.model, request)
+
+        self.total_aproximado = None
+        self.incluir_total = request.query_params.get(self.total_query_param) == 'aproximado'
+        if self.incluir_total:
+            self.total_aproximado = contar_aproximado(queryset)
+
+        # Voltando, percorre no sentido inverso e reordena a página no final
+        descendo = self.decrescente != self.voltando
+        campo = self.campo_ordenacao
+        if descendo:
+            ordenacao = (f'-{campo}', '-pk')
+        else:
+            ordenacao = (campo, 'pk')
+
+        if posicao is not None:
+            valor, pk = posicao
+            # `campo <= valor` delimita o range no índice; o OR só desempata
+            if descendo:
+                queryset = queryset.filter(
+                    Q(**{f'{campo}__lte': valor}) & (Q(**{f'{campo}__lt': valor}) | Q(pk__lt=pk)))
+            else:
+                queryset = queryset.filter(
+                    Q(**{f'{campo}__gte': valor}) & (Q(**{f'{campo}__gt': valor}) | Q(pk__gt=pk)))
+
+        itens = list(queryset.order_by(*ordenacao)[:self.limite + 1])
+        tem_mais = len(itens) > self.limite
+        itens = itens[:self.limite]
+        if self.voltando:
+            itens.reverse()
+
+        if self.voltando:
+            self.tem_proxima, self.tem_anterior = True, tem_mais
+        else:
+            self.tem_proxima, self.tem_anterior = tem_mais, posicao is not None
+
+        self.itens = itens
+        return itens
+
+    def get_page_size(self, request):
+        try:
+            limite = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        return max(1, min(limite, self.max_page_size))
+
+    def get_paginated_response(self, data):
+        resposta = {
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+        }
+        if self.incluir_total:
+            resposta['total_aproximado'] = self.total_aproximado
+        resposta['results'] = data
+        return Response(resposta)
+
+    def get_next_link(self):
+        if not self.tem_proxima or not self.itens:
+            return None
+        return self.montar_link(self.itens[-1], voltando=False)
+
+    def get_previous_link(self):
+        if not self.tem_anterior:
+            return None
+        if not self.itens:
+            # Página vazia após o último item: a anterior é a primeira página
+            return remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+        return self.montar_link(self.itens[0], voltando=True)
+
+    def montar_link(self, item, voltando):
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.codificar_cursor(item, voltando))
+
+    def codificar_cursor(self, item, voltando) -> str:
+        valor = getattr(item, self.campo_ordenacao)
+        if hasattr(valor, 'isoformat'):
+            valor = valor.isoformat()
+        conteudo = json.dumps([valor, item.pk, int(voltando)], separators=(',', ':'))
+        return base64.urlsafe_b64encode(conteudo.encode()).decode().rstrip('=')
+
+    def decodificar_cursor(self, model, request):
+        """Retorna ((valor, pk), voltando) ou (None, False) sem cursor"""
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None, False
+
+        try:
+            conteudo = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            valor, pk, voltando = json.loads(conteudo)
+            campo = model._meta.get_field(self.campo_ordenacao)
+            valor = campo.to_python(valor)
+            pk = model._meta.pk.to_python(pk)
+        except (binascii.Error, ValueError, TypeError, ValidationError):
+            raise NotFound(self.mensagem_cursor_invalido)
+
+        if valor is None or pk is None:
+            raise NotFound(self.mensagem_cursor_invalido)
+        return (valor, pk), bool(voltando)
@@ -0,0 +1,25 @@
+"""
+Integração do Server-Timing com o DRF
+Renderer e mixin de serializer que registram as fases 'render' e 'serializer'
+"""
+
+from rest_framework.renderers import JSONRenderer
+
+from .tempos import medir
+
+
+class JSONRendererMedido(JSONRenderer):
+    """JSONRenderer que registra a renderização como fase 'render'"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with medir('render'):
+            return super().render(data, accepted_media_type, renderer_context)
+
+
+class SerializacaoMedidaMixin:
+    """Registra a montagem de `serializer.data` como fase 'serializer'"""
+
+    @property
+    def data(self):
+        with medir('serializer'):
+            return super().data
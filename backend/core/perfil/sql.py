@@ -0,0 +1,185 @@
+"""
+Profiler de SQL por requisição
+Um execute_wrapper em cada conexão conta consultas e tempo de banco da requisição,
+agrupa consultas repetidas por fingerprint (N+1) e registra as lentas
+"""
+
+import logging
+import random
+import re
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from functools import lru_cache
+
+from django.conf import settings
+
+from core.metricas.banco import DURACAO_CONSULTAS, operacao_sql
+from core.tenancy.context import get_request_id
+
+logger = logging.getLogger('core.sql')
+
+_CONFIGURACAO_PADRAO = {
+    'N_MAIS_UM_LIMIAR': 10,  # Execuções da mesma consulta na requisição para alertar N+1
+    'AMOSTRA_EXPLAIN': 0.0,  # Fração das consultas lentas com o plano (EXPLAIN) no log
+    'HEADERS': False,  # X-DB-Queries / X-DB-Time-ms / X-DB-Repetidas na resposta
+}
+
+_perfil: ContextVar = ContextVar('perfil_sql', default=None)
+_explicando: ContextVar = ContextVar('perfil_sql_explicando', default=False)
+
+_RE_TEXTO = re.compile(r"'(?:[^']|'')*'")
+_RE_NUMERO = re.compile(r'\b\d+(?:\.\d+)?\b')
+_RE_LISTA = re.compile(r'\(\s*(?:%s|\?)(?:\s*,\s*(?:%s|\?))*\s*\)')
+_RE_ESPACOS = re.compile(r'\s+')
+
+
+def configuracao() -> dict:
+    """Mescla SQL_PROFILER com os valores padrão"""
+    resultado = dict(_CONFIGURACAO_PADRAO)
+    resultado.update(getattr(settings, 'SQL_PROFILER', {}))
+    resultado['LENTA_MS'] = getattr(settings, 'SLOW_DB_THRESHOLD_MS', 1000)
+    return resultado
+
+
+@lru_cache(maxsize=4096)
+def fingerprint(sql: str) -> str:
+    """
+    Forma normalizada da consulta: literais viram ?, listas IN de qualquer
+    tamanho viram (...). Consultas que só diferem nos parâmetros coincidem.
+    """
+    sql = _RE_TEXTO.sub('?', sql)
+    sql = _RE_NUMERO.sub('?', sql)
+    sql = _RE_LISTA.sub('(...)', sql)
+    return _RE_ESPACOS.sub(' ', sql).strip()
+
+
+class PerfilSql:
+    """Totais de banco de uma requisição"""
+
+    def __init__(self):
+        self.consultas = 0
+        self.tempo_ms = 0.0
+        self.repeticoes = Counter()
+        self._lock = threading.Lock()
+
+    def registrar(self, sql: str, duracao_ms: float):
+        # Threads criadas com submit_with_context compartilham o mesmo perfil
+        with self._lock:
+            self.consultas += 1
+            self.tempo_ms += duracao_ms
+            self.repeticoes[sql] += 1
+
+    def mais_repetidas(self, limiar: int):
+        """[(fingerprint, execuções)] com pelo menos `limiar` execuções"""
+        with self._lock:
+            repeticoes = list(self.repeticoes.items())
+        agrupadas = Counter()
+        for sql, quantidade in repeticoes:
+            agrupadas[fingerprint(sql)] += quantidade
+        return [(sql, quantidade) for sql, quantidade in agrupadas.most_common() if quantidade >= limiar]
+
+
+def iniciar_perfil() -> tuple:
+    """Ativa um perfil novo no contexto atual; retorna (perfil, token)"""
+    perfil = PerfilSql()
+    return perfil, _perfil.set(perfil)
+
+
+def finalizar_perfil(token):
+    _perfil.reset(token)
+
+
+def obter_perfil():
+    """Perfil da requisição em andamento (None fora de uma requisição)"""
+    return _perfil.get()
+
+
+class ProfilerConsultas:
+    """
+    execute_wrapper instalado em cada conexão: mede a consulta, alimenta o
+    histograma db_query_duration_seconds e o perfil da requisição e loga as
+    consultas acima de SLOW_DB_THRESHOLD_MS.
+    """
+
+    def __init__(self, alias: str):
+        self.alias = alias
+        self.config = configuracao()
+        self._explicadas = {}  # fingerprint -> instante do último EXPLAIN
+
+    def __call__(self, execute, sql, params, many, context):
+        if _explicando.get():
+            return execute(sql, params, many, context)
+
+        inicio = time.perf_counter()
+        sucesso = False
+        try:
+            resultado = execute(sql, params, many, context)
+            sucesso = True
+            return resultado
+        finally:
+            duracao = time.perf_counter() - inicio
+            DURACAO_CONSULTAS.observar(duracao, banco=self.alias, operacao=operacao_sql(sql))
+
+            duracao_ms = duracao * 1000
+            perfil = _perfil.get()
+            if perfil is not None:
+                perfil.registrar(sql, duracao_ms)
+            if duracao_ms >= self.config['LENTA_MS']:
+                self._registrar_lenta(sql, params, many, context, duracao_ms, sucesso)
+
+    def _registrar_lenta(self, sql, params, many, context, duracao_ms, sucesso):
+        try:
+            plano = None
+            if sucesso and not many and self._amostrar_explain(sql):
+                plano = self._explain(context['connection'], sql, params)
+
+            logger.warning(
+                f"SLOW_QUERY {duracao_ms:.0f}ms {self.alias}: {fingerprint(sql)[:200]}",
+                extra={
+                    'request_id': get_request_id(),
+                    'banco': self.alias,
+                    'duration_ms': round(duracao_ms, 2),
+                    'limiar_ms': self.config['LENTA_MS'],
+                    'fingerprint': fingerprint(sql),
+                    'plano': plano,
+                }
+            )
+        except Exception as e:
+            # Não deve falhar a consulta por erro no profiler
+            logger.error(f"Erro no profiler de SQL: {e}", exc_info=True)
+
+    def _amostrar_explain(self, sql) -> bool:
+        """Só SELECTs, na fração configurada e no máximo um EXPLAIN por minuto por fingerprint"""
+        if operacao_sql(sql) != 'SELECT' or random.random() >= self.config['AMOSTRA_EXPLAIN']:
+            return False
+        chave = fingerprint(sql)
+        agora = time.monotonic()
+        if agora - self._explicadas.get(chave, -60.0) < 60:
+            return False
+        if len(self._explicadas) >= 1000:
+            self._explicadas.clear()
+        self._explicadas[chave] = agora
+        return True
+
+    def _explain(self, connection, sql, params):
+        token = _explicando.set(True)
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(f'{connection.ops.explain_query_prefix()} {sql}', params)
+                return '\n'.join(' '.join(str(coluna) for coluna in linha) for linha in cursor.fetchall())
+        except Exception as e:
+            return f'EXPLAIN indisponível: {e}'
+        finally:
+            _explicando.reset(token)
+
+
+def instalar_profiler(sender, connection, **kwargs):
+    """
+    Receptor do sinal connection_created. A lista execute_wrappers pertence ao
+    DatabaseWrapper (um por thread) e sobrevive às reconexões, então o profiler
+    é instalado uma única vez por wrapper.
+    """
+    if not any(isinstance(wrapper, ProfilerConsultas) for wrapper in connection.execute_wrappers):
+        connection.execute_wrappers.append(ProfilerConsultas(connection.alias))
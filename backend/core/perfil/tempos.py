@@ -0,0 +1,78 @@
+"""
+Fases de tempo da requisição (auth, hash, serializer, render...) para o Server-Timing
+Sem coleta ativa no contexto, medir() devolve um context manager vazio compartilhado
+"""
+
+import time
+from contextlib import nullcontext
+from contextvars import ContextVar
+
+_tempos: ContextVar = ContextVar('tempos_requisicao', default=None)
+_NULO = nullcontext()
+
+
+class TemposRequisicao:
+    """Duração acumulada (ms) e número de ocorrências de cada fase da requisição"""
+
+    __slots__ = ('fases', 'inicio')
+
+    def __init__(self):
+        self.fases = {}
+        self.inicio = time.perf_counter()
+
+    def registrar(self, fase: str, duracao_ms: float):
+        acumulado, vezes = self.fases.get(fase, (0.0, 0))
+        self.fases[fase] = (acumulado + duracao_ms, vezes + 1)
+
+    def total_ms(self) -> float:
+        return (time.perf_counter() - self.inicio) * 1000
+
+    def como_dict(self) -> dict:
+        return {fase: round(duracao, 2) for fase, (duracao, _) in self.fases.items()}
+
+
+class _Fase:
+    __slots__ = ('tempos', 'fase', 'inicio')
+
+    def __init__(self, tempos, fase):
+        self.tempos = tempos
+        self.fase = fase
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.tempos.registrar(self.fase, (time.perf_counter() - self.inicio) * 1000)
+        return False
+
+
+def medir(fase: str):
+    """
+    Mede um trecho como fase da requisição:
+
+        with medir('hash'):
+            user.check_password(senha)
+
+    Fases repetidas na mesma requisição são somadas. Fora de uma requisição
+    com coleta ativa não mede nada.
+    """
+    tempos = _tempos.get()
+    if tempos is None:
+        return _NULO
+    return _Fase(tempos, fase)
+
+
+def iniciar_tempos() -> tuple:
+    """Ativa a coleta no contexto atual; retorna (tempos, token)"""
+    tempos = TemposRequisicao()
+    return tempos, _tempos.set(tempos)
+
+
+def finalizar_tempos(token):
+    _tempos.reset(token)
+
+
+def obter_tempos():
+    """Coleta da requisição em andamento (None se desativada)"""
+    return _tempos.get()
@@ -0,0 +1,160 @@
+"""
+Registro de metadados das rotas
+Montado uma vez por processo a partir do URL resolver; consultado em O(1) por
+request.resolver_match.route nos handlers e middlewares
+"""
+
+import threading
+from dataclasses import dataclass
+from typing import Optional
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.urls import URLPattern, URLResolver, get_resolver
+from rest_framework.permissions import AllowAny
+from rest_framework.views import APIView
+
+LOGGER_PADRAO = 'django.request'
+
+_lock = threading.Lock()
+_registro = None  # route -> MetadadosRota
+
+
+@dataclass(frozen=True, slots=True)
+class MetadadosRota:
+    """Metadados pré-calculados de uma rota do URLconf"""
+    route: str  # Padrão completo, igual a resolver_match.route
+    nome: Optional[str]  # view_name ('usuarios:custom_login')
+    api: bool  # View do DRF: erros no formato {"errors": ...}
+    logger: str  # Logger das exceções não tratadas
+    amostragem: float  # Fração logada pelo RequestLogMiddleware
+    autenticacao: Optional[bool]  # Exige usuário autenticado (None: view fora do DRF)
+
+
+def _classe_drf(callback):
+    classe = getattr(callback, 'cls', None)
+    if isinstance(classe, type) and issubclass(classe, APIView):
+        return classe
+    return None
+
+
+def _modulo_app(modulo) -> Optional[str]:
+    if modulo and modulo.startswith('apps.'):
+        return '.'.join(modulo.split('.')[:2])
+    return None
+
+
+def _logger(callback, modulo_urls=None) -> str:
+    """
+    Logger do app (apps.usuarios...) pela view ou, para views de terceiros
+    incluídas no URLconf de um app (dj-rest-auth), pelo módulo de URLs
+    """
+    modulo = getattr(callback, '__module__', '') or ''
+    app = _modulo_app(modulo) or _modulo_app(modulo_urls)
+    if app:
+        return app
+    if modulo.startswith('django.contrib.admin'):
+        return 'django.admin'
+    return LOGGER_PADRAO
+
+
+def _autenticacao(classe) -> Optional[bool]:
+    if classe is None:
+        return None
+    permissoes = getattr(classe, 'permission_classes', ())
+    # Composições (IsAuthenticated | X) não são classes: considera que exigem usuário
+    return not all(isinstance(p, type) and issubclass(p, AllowAny) for p in permissoes)
+
+
+def _amostragem(nome, route: str) -> float:
+    amostragem = getattr(settings, 'REQUEST_LOG', {}).get('AMOSTRAGEM', {})
+    if nome in amostragem:
+        return amostragem[nome]
+    path = '/' + route
+    for prefixo, taxa in amostragem.items():
+        if prefixo.startswith('/') and path.startswith(prefixo):
+            return taxa
+    return 1.0
+
+
+def _metadados(callback, nome, route: str, modulo_urls=None) -> MetadadosRota:
+    classe = _classe_drf(callback)
+    return MetadadosRota(
+        route=route,
+        nome=nome,
+        api=classe is not None,
+        logger=_logger(callback, modulo_urls),
+        amostragem=_amostragem(nome, route),
+        autenticacao=_autenticacao(classe),
+    )
+
+
+def _percorrer(padroes, prefixo='', namespace='', modulo_urls=None):
+    """
+    Gera (callback, view_name, route, módulo de URLs) de todas as rotas,
+    montando o route como o resolver monta resolver_match.route
+    """
+    for padrao in padroes:
+        if isinstance(padrao, URLResolver):
+            sub_namespace = namespace
+            if padrao.namespace:
+                sub_namespace = f'{namespace}{padrao.namespace}:'
+            # O primeiro URLconf de um app (apps.*) na cadeia de includes identifica o app
+            sub_modulo = modulo_urls
+            if _modulo_app(modulo_urls) is None:
+                urlconf = padrao.urlconf_name
+                sub_modulo = urlconf if isinstance(urlconf, str) else getattr(urlconf, '__name__', modulo_urls)
+            yield from _percorrer(
+                padrao.url_patterns,
+                URLResolver._join_route(prefixo, str(padrao.pattern)),
+                sub_namespace,
+                sub_modulo,
+            )
+        elif isinstance(padrao, URLPattern):
+            nome = f'{namespace}{padrao.name}' if padrao.name else None
+            route = URLResolver._join_route(prefixo, str(padrao.pattern))
+            yield padrao.callback, nome, route, modulo_urls
+
+
+def construir_registro() -> dict:
+    """Lê o URLconf e monta {route: MetadadosRota}"""
+    registro = {}
+    for callback, nome, route, modulo_urls in _percorrer(get_resolver().url_patterns):
+        # Como o resolver, a primeira rota com o mesmo padrão prevalece
+        if route not in registro:
+            registro[route] = _metadados(callback, nome, route, modulo_urls)
+    return registro
+
+
+def metadados_rotas() -> dict:
+    """Registro do processo, montado no primeiro acesso"""
+    global _registro
+    if _registro is None:
+        with _lock:
+            if _registro is None:
+                _registro = construir_registro()
+    return _registro
+
+
+def obter_metadados(request) -> Optional[MetadadosRota]:
+    """Metadados da rota resolvida da requisição (None antes da resolução ou em 404)"""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return None
+
+    registro = metadados_rotas()
+    metadados = registro.get(match.route)
+    if metadados is None:
+        # Rota fora do URLconf padrão (request.urlconf): calcula e guarda
+        metadados = registro[match.route] = _metadados(match.func, match.view_name, match.route)
+    return metadados
+
+
+def limpar_registro(**kwargs):
+    """Descarta o registro (URLconf ou REQUEST_LOG alterados, ex.: override_settings)"""
+    global _registro
+    if kwargs.get('setting') in (None, 'ROOT_URLCONF', 'REQUEST_LOG'):
+        _registro = None
+
+
+setting_changed.connect(limpar_registro, dispatch_uid='core.rotas.registro')
@@ -0,0 +1,96 @@
+"""
+Verificações de prontidão (banco e cache) com resultado em cache no processo
+Sondagens frequentes do load balancer reaproveitam o último resultado
+"""
+
+import logging
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_ultimo = None  # (expira_em, resultado)
+
+
+def _medir(nome, verificacao) -> dict:
+    """
+    Só o status vai na resposta (endpoint sem autenticação): a mensagem da
+    exceção pode trazer host ou trechos de credenciais e fica no log
+    """
+    inicio = time.perf_counter()
+    try:
+        verificacao()
+        return {'ok': True}
+    except Exception:
+        logger.warning(
+            f"Verificação de prontidão '{nome}' falhou após "
+            f"{(time.perf_counter() - inicio) * 1000:.0f}ms",
+            exc_info=True,
+        )
+        return {'ok': False}
+
+
+def _verificar_banco(alias):
+    with connections[alias].cursor() as cursor:
+        cursor.execute('SELECT 1')
+        cursor.fetchone()
+
+
+def _verificar_cache(alias):
+    # Backends com IGNORE_EXCEPTIONS (django-redis) não levantam erro: compara o valor lido
+    cache = caches[alias]
+    chave = 'saude:prontidao'
+    valor = uuid.uuid4().hex
+    cache.set(chave, valor, 30)
+    if cache.get(chave) != valor:
+        raise ConnectionError('valor gravado não foi lido de volta')
+
+
+def verificar_dependencias() -> dict:
+    """Executa todas as verificações agora"""
+    dependencias = {}
+    for alias in settings.DATABASES:
+        dependencias[f'db:{alias}'] = _medir(f'db:{alias}', lambda: _verificar_banco(alias))
+    for alias in settings.CACHES:
+        dependencias[f'cache:{alias}'] = _medir(f'cache:{alias}', lambda: _verificar_cache(alias))
+
+    return {
+        'status': 'ok' if all(item['ok'] for item in dependencias.values()) else 'erro',
+        'verificado_em': datetime.now(timezone.utc).isoformat(),
+        'dependencias': dependencias,
+    }
+
+
+def prontidao_em_cache():
+    """Último resultado se ainda válido, sem I/O (None se expirado)"""
+    ultimo = _ultimo
+    if ultimo is not None and ultimo[0] > time.monotonic():
+        return ultimo[1]
+    return None
+
+
+def obter_prontidao() -> dict:
+    """
+    Resultado das verificações, refeitas no máximo uma vez a cada
+    HEALTH_CHECK_CACHE_SEGUNDOS por processo. Requisições simultâneas
+    aguardam a mesma verificação em vez de repeti-la.
+    """
+    global _ultimo
+    resultado = prontidao_em_cache()
+    if resultado is not None:
+        return resultado
+
+    with _lock:
+        resultado = prontidao_em_cache()
+        if resultado is not None:
+            return resultado
+        resultado = verificar_dependencias()
+        _ultimo = (time.monotonic() + getattr(settings, 'HEALTH_CHECK_CACHE_SEGUNDOS', 5), resultado)
+        return resultado
@@ -0,0 +1,49 @@
+"""
+Contexto da requisição (request_id, tenant e usuário) baseado em contextvars
+Isolado por coroutine sob ASGI e por thread sob WSGI; leitura O(1) sem alocação
+"""
+
+from contextvars import ContextVar, copy_context
+
+_request_id: ContextVar = ContextVar('request_id', default=None)
+_tenant: ContextVar = ContextVar('tenant', default=None)
+_user: ContextVar = ContextVar('user', default=None)
+
+
+def get_request_id():
+    return _request_id.get()
+
+
+def set_request_id(request_id):
+    _request_id.set(request_id)
+
+
+def get_current_tenant():
+    return _tenant.get()
+
+
+def set_current_tenant(tenant):
+    _tenant.set(tenant)
+
+
+def get_current_user():
+    return _user.get()
+
+
+def set_current_user(user):
+    _user.set(user)
+
+
+def reset_context():
+    """Limpa o contexto (início e fim de cada requisição)"""
+    _request_id.set(None)
+    _tenant.set(None)
+    _user.set(None)
+
+
+def submit_with_context(executor, fn, *args, **kwargs):
+    """
+    executor.submit() propagando o contexto atual para a thread/tarefa.
+    sync_to_async (asgiref) já propaga o contexto; ThreadPoolExecutor não.
+    """
+    return executor.submit(copy_context().run, fn, *args, **kwargs)
@@ -0,0 +1,133 @@
+"""
+Cache em duas camadas sobre o locmem: camada local, recálculo único e trava entre processos
+"""
+
+import threading
+import time
+
+import pytest
+from django.core.cache import caches
+
+from core.cache.backends import CacheDuasCamadas, _Entrada
+
+
+@pytest.fixture
+def criar_cache(request):
+    """Cada instância com nome próprio simula um processo (camada local separada)"""
+    def criar(processo='a', **opcoes):
+        opcoes = {'REMOTO': 'default', 'ESPERA_MAXIMA': 0.2, **opcoes}
+        return CacheDuasCamadas(f'{request.node.name}:{processo}', {'TIMEOUT': 60, 'OPTIONS': opcoes})
+    return criar
+
+
+def test_leitura_local_nao_vai_ao_remoto(criar_cache):
+    cache = criar_cache()
+    cache.set('chave', {'valor': 1})
+    caches['default'].delete('chave')
+
+    assert cache.get('chave') == {'valor': 1}
+
+
+def test_outro_processo_ve_a_escrita_apos_o_ttl_local(criar_cache):
+    a, b = criar_cache('a', LOCAL_TTL=0.05), criar_cache('b', LOCAL_TTL=0.05)
+    a.set('chave', 'antigo')
+    assert b.get('chave') == 'antigo'
+
+    a.set('chave', 'novo')
+    assert b.get('chave') == 'antigo'
+    time.sleep(0.06)
+    assert b.get('chave') == 'novo'
+
+
+def test_delete_remove_das_duas_camadas(criar_cache):
+    cache = criar_cache()
+    cache.set_many({'x': 1, 'y': None})
+    assert cache.get_many(['x', 'y', 'z']) == {'x': 1, 'y': None}
+
+    cache.delete('x')
+
+    assert cache.get('x', 'ausente') == 'ausente'
+    assert caches['default'].get('x') is None
+    assert cache.has_key('y')
+
+
+def test_camada_local_limitada(criar_cache):
+    cache = criar_cache(LOCAL_MAX_ENTRADAS=2)
+    for chave in ('a', 'b', 'c'):
+        cache.set(chave, chave)
+    caches['default'].clear()
+
+    assert cache.get_many(['a', 'b', 'c']) == {'b': 'b', 'c': 'c'}
+
+
+def test_get_or_set_recalcula_uma_vez_entre_threads(criar_cache):
+    cache = criar_cache()
+    chamadas = []
+    barreira = threading.Barrier(8)
+    resultados = []
+
+    def calcular():
+        chamadas.append(True)
+        time.sleep(0.05)
+        return 'valor'
+
+    def ler():
+        barreira.wait()
+        resultados.append(cache.get_or_set('chave', calcular))
+
+    threads = [threading.Thread(target=ler) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(chamadas) == 1
+    assert resultados == ['valor'] * 8
+
+
+def test_valor_atual_servido_enquanto_outro_processo_recalcula(criar_cache):
+    cache = criar_cache()
+    # Custo de cálculo enorme: o XFetch sempre pede a renovação antecipada
+    cache._gravar('chave', 'atual', 60, None, delta=1e6)
+    caches['default'].add('chave:recalculando', 'outro-dono', 30)
+
+    assert cache.get_or_set('chave', lambda: 'novo') == 'atual'
+    assert caches['default'].get('chave:recalculando') == 'outro-dono'
+
+
+def test_espera_esgotada_nao_libera_trava_alheia(criar_cache):
+    cache = criar_cache()
+    caches['default'].add('chave:recalculando', 'outro-dono', 30)
+
+    assert cache.get_or_set('chave', lambda: 'calculado') == 'calculado'
+    assert caches['default'].get('chave:recalculando') == 'outro-dono'
+
+
+def test_trava_expirada_e_retomada_por_outro_dono_nao_e_removida(criar_cache):
+    cache = criar_cache()
+
+    def calcular():
+        # O cálculo passou de TRAVA_TTL: a trava expirou e outro processo a pegou
+        caches['default'].set('chave:recalculando', 'outro-dono', 30)
+        return 'valor'
+
+    assert cache.get_or_set('chave', calcular) == 'valor'
+    assert caches['default'].get('chave:recalculando') == 'outro-dono'
+
+
+def test_trava_propria_e_liberada(criar_cache):
+    cache = criar_cache()
+
+    cache.get_or_set('chave', lambda: 'valor')
+
+    assert caches['default'].get('chave:recalculando') is None
+
+
+def test_xfetch_antecipa_apenas_perto_da_expiracao():
+    longe = _Entrada('valor', delta=0.01, expira_em=time.time() + 3600)
+    expirada = _Entrada('valor', delta=0.01, expira_em=time.time() - 1)
+
+    assert not any(longe.renovar_antes(1.0) for _ in range(100))
+    assert expirada.renovar_antes(1.0)
+    assert not expirada.renovar_antes(0)
+    assert not _Entrada('valor', delta=0.01, expira_em=None).renovar_antes(1.0)
@@ -0,0 +1,80 @@
+"""
+Custo de inicialização dos settings e inicialização do Sentry fora do wsgi/asgi
+"""
+
+import subprocess
+import sys
+from io import StringIO
+from pathlib import Path
+
+import pytest
+from django.apps import apps
+from django.core.management import call_command
+
+from core.monitoramento import sentry
+
+# Mediana medida em torno de 10-15ms; o limite só pega regressões grosseiras
+LIMITE_SETTINGS_MS = 150
+
+
+@pytest.mark.benchmark
+def test_import_dos_settings_dentro_do_orcamento():
+    saida = StringIO()
+
+    call_command('perfil_inicializacao', alvo='settings', execucoes=3, limite_ms=LIMITE_SETTINGS_MS, stdout=saida)
+
+    assert 'Dentro do limite' in saida.getvalue()
+    assert 'escreveu' not in saida.getvalue()
+
+
+@pytest.mark.benchmark
+def test_import_dos_settings_nao_carrega_sdk_nem_drf():
+    codigo = (
+        'import sys, configurations\n'
+        "print(sorted(m for m in ('sentry_sdk', 'rest_framework', 'django.db.models') if m in sys.modules))\n"
+    )
+    resultado = subprocess.run(
+        [sys.executable, '-c', codigo],
+        capture_output=True,
+        text=True,
+        cwd=Path(__file__).resolve().parents[2],
+    )
+
+    assert resultado.returncode == 0, resultado.stderr
+    assert resultado.stdout.strip() == '[]'
+
+
+@pytest.fixture
+def inicializacoes(monkeypatch):
+    chamadas = []
+    monkeypatch.setattr(sentry, 'iniciar_sentry', lambda: chamadas.append(True) or True)
+    return chamadas
+
+
+@pytest.mark.parametrize('argv, esperado', [
+    (['manage.py', 'processar_emails'], True),
+    (['/app/manage.py', 'importar_usuarios', 'usuarios.csv'], True),
+    (['manage.py', 'migrate'], False),
+    (['manage.py', 'perfil_inicializacao'], False),
+    (['manage.py', '--help'], False),
+    (['manage.py'], False),
+    (['gunicorn', 'configurations.wsgi'], False),
+])
+def test_sentry_apenas_em_comandos_de_longa_duracao(monkeypatch, inicializacoes, argv, esperado):
+    monkeypatch.setattr(sys, 'argv', argv)
+
+    assert sentry.iniciar_sentry_em_comando() is esperado
+    assert inicializacoes == ([True] if esperado else [])
+
+
+def test_ready_inicializa_o_sentry_no_worker_quando_ha_dsn(monkeypatch, settings, inicializacoes):
+    monkeypatch.setattr(sys, 'argv', ['manage.py', 'processar_emails'])
+    configuracao = apps.get_app_config('core')
+
+    settings.SENTRY_DSN = ''
+    configuracao.ready()
+    assert inicializacoes == []
+
+    settings.SENTRY_DSN = 'https://chave@sentry.exemplo.com/1'
+    configuracao.ready()
+    assert inicializacoes == [True]
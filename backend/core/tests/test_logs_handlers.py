@@ -0,0 +1,144 @@
+"""
+HandlerNaoBloqueante: configuração pelo dictConfig, gravação em lote e descarte com fila cheia
+"""
+
+import json
+import logging
+import logging.config
+import os
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+from core.logs import handlers
+from core.logs.handlers import HandlerNaoBloqueante, obter_estatisticas
+
+
+def _configuracao(arquivo, **opcoes):
+    return {
+        'version': 1,
+        'disable_existing_loggers': False,
+        'formatters': {'json': {'()': 'core.logs.formatters.FormatadorJSON'}},
+        'handlers': {
+            'fila': {
+                'class': 'core.logs.handlers.HandlerNaoBloqueante',
+                'formatter': 'json',
+                'destino': 'arquivo',
+                'arquivo': str(arquivo),
+                **opcoes,
+            },
+        },
+        'loggers': {'testes.logs': {'handlers': ['fila'], 'level': 'INFO', 'propagate': False}},
+    }
+
+
+@pytest.fixture
+def logger_em_arquivo(tmp_path):
+    arquivo = tmp_path / 'logs' / 'app.log'
+    logging.config.dictConfig(_configuracao(arquivo))
+    logger = logging.getLogger('testes.logs')
+    yield logger, logger.handlers[0], arquivo
+    logger.handlers[0].close()
+    logger.handlers.clear()
+
+
+def _linhas(arquivo):
+    return [json.loads(linha) for linha in arquivo.read_text(encoding='utf-8').splitlines()]
+
+
+def test_dictconfig_monta_o_handler_e_grava_json(logger_em_arquivo):
+    logger, handler, arquivo = logger_em_arquivo
+    assert isinstance(handler, HandlerNaoBloqueante)
+
+    for numero in range(20):
+        logger.info('registro %s', numero, extra={'request_id': 'abc'})
+    handler.flush()
+
+    linhas = _linhas(arquivo)
+    assert [linha['message'] for linha in linhas] == [f'registro {n}' for n in range(20)]
+    assert linhas[0]['request_id'] == 'abc'
+    assert handler._thread.name == 'logs-em-lote'
+
+
+def test_traceback_e_formatado_na_thread_de_gravacao(logger_em_arquivo):
+    logger, handler, arquivo = logger_em_arquivo
+
+    try:
+        raise ValueError('falhou')
+    except ValueError:
+        logger.exception('erro no processamento')
+    handler.flush()
+
+    assert 'ValueError: falhou' in _linhas(arquivo)[0]['exc_info']
+
+
+def test_fila_cheia_descarta_sem_bloquear_e_avisa(tmp_path, monkeypatch):
+    liberar = threading.Event()
+    handler = HandlerNaoBloqueante('arquivo', str(tmp_path / 'app.log'), tamanho_fila=2, tamanho_lote=1)
+    emitir_lote = handler.destino.emitir_lote
+    monkeypatch.setattr(handler.destino, 'emitir_lote', lambda lote: liberar.wait(5) and emitir_lote(lote))
+    logger = logging.getLogger('testes.logs.cheia')
+    logger.addHandler(handler)
+    logger.propagate = False
+    descartados_antes = obter_estatisticas()['descartados']
+
+    try:
+        for numero in range(10):
+            logger.warning('registro %s', numero)
+        descartados = obter_estatisticas()['descartados'] - descartados_antes
+        liberar.set()
+        handler.flush()
+        logger.warning('depois')
+        handler.flush()
+    finally:
+        logger.removeHandler(handler)
+        handler.close()
+
+    assert descartados >= 7
+    conteudo = (tmp_path / 'app.log').read_text(encoding='utf-8')
+    assert 'LOGS_DESCARTADOS' in conteudo
+    assert 'depois' in conteudo
+
+
+def test_thread_nova_apos_fork(logger_em_arquivo, monkeypatch):
+    logger, handler, arquivo = logger_em_arquivo
+    logger.info('pai')
+    handler.flush()
+    thread_pai = handler._thread
+
+    # Simula o processo filho: o pid muda e a thread do pai não existe nele
+    monkeypatch.setattr(handlers.os, 'getpid', lambda: -1)
+    logger.info('filho')
+    handler.flush()
+
+    assert handler._thread is not thread_pai
+    assert [linha['message'] for linha in _linhas(arquivo)] == ['pai', 'filho']
+
+
+def test_logging_de_producao_configura(tmp_path):
+    """O LOGGING de configurations.prod passa pelo dictConfig (processo separado)"""
+    codigo = (
+        'import logging, logging.config\n'
+        'from configurations import prod\n'
+        'logging.config.dictConfig(prod.LOGGING)\n'
+        'logging.getLogger("django").warning("configurado")\n'
+        'logging.shutdown()\n'
+    )
+    ambiente = {
+        **os.environ,
+        'ENVIRONMENT': 'prod',
+        'ALLOWED_HOSTS': 'exemplo.com',
+        'CORS_ALLOWED_ORIGINS': 'https://exemplo.com',
+        'LOG_DESTINO': 'arquivo',
+        'LOG_DIR': str(tmp_path),
+    }
+    resultado = subprocess.run(
+        [sys.executable, '-c', codigo], capture_output=True, text=True,
+        cwd=Path(__file__).resolve().parents[2], env=ambiente, timeout=60,
+    )
+
+    assert resultado.returncode == 0, resultado.stderr
+    assert _linhas(tmp_path / 'app.log')[0]['message'] == 'configurado'
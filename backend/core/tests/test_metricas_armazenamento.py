@@ -0,0 +1,92 @@
+"""
+Arquivos de métricas por processo: consolidação dos pids encerrados e hooks do gunicorn
+"""
+
+import importlib.util
+import os
+import subprocess
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+from core.metricas.armazenamento import (
+    ArquivoMetricas,
+    caminho_arquivo,
+    consolidar_mortos,
+    consolidar_processo,
+    ler_diretorio,
+)
+
+
+def _pid_encerrado() -> int:
+    processo = subprocess.Popen([sys.executable, '-c', 'pass'])
+    processo.wait()
+    return processo.pid
+
+
+def _gravar(diretorio, pid, **valores):
+    arquivo = ArquivoMetricas(caminho_arquivo(str(diretorio), pid))
+    arquivo.incrementar_varios(valores.items())
+    arquivo.fechar()
+
+
+def _totais(diretorio):
+    totais = {}
+    for chave, valor in ler_diretorio(str(diretorio)):
+        totais[chave] = totais.get(chave, 0) + valor
+    return totais
+
+
+def _arquivos(diretorio):
+    return sorted(caminho.name for caminho in Path(diretorio).glob('metricas_*.db'))
+
+
+def test_consolida_pids_encerrados_sem_alterar_os_totais(tmp_path):
+    morto_1, morto_2 = _pid_encerrado(), _pid_encerrado()
+    _gravar(tmp_path, morto_1, requisicoes=3, erros=1)
+    _gravar(tmp_path, morto_2, requisicoes=2)
+    _gravar(tmp_path, os.getpid(), requisicoes=5)
+    antes = _totais(tmp_path)
+
+    assert consolidar_mortos(str(tmp_path)) == 2
+
+    assert _totais(tmp_path) == antes == {'requisicoes': 10, 'erros': 1}
+    assert _arquivos(tmp_path) == sorted(['metricas_consolidado.db', f'metricas_{os.getpid()}.db'])
+
+
+def test_consolidacoes_sucessivas_acumulam(tmp_path):
+    for _ in range(3):
+        _gravar(tmp_path, _pid_encerrado(), requisicoes=1)
+        consolidar_mortos(str(tmp_path))
+
+    assert _totais(tmp_path) == {'requisicoes': 3}
+    assert _arquivos(tmp_path) == ['metricas_consolidado.db']
+
+
+def test_consolidar_pid_sem_arquivo(tmp_path):
+    assert consolidar_processo(str(tmp_path), 999_999_999) is False
+
+
+@pytest.fixture
+def config_gunicorn(monkeypatch, tmp_path):
+    monkeypatch.setenv('METRICAS_DIR', str(tmp_path))
+    caminho = Path(__file__).resolve().parents[2] / 'gunicorn.conf.py'
+    especificacao = importlib.util.spec_from_file_location('gunicorn_conf', caminho)
+    modulo = importlib.util.module_from_spec(especificacao)
+    especificacao.loader.exec_module(modulo)
+    return modulo
+
+
+def test_hooks_do_gunicorn(config_gunicorn, tmp_path):
+    _gravar(tmp_path, 123, requisicoes=7)
+    config_gunicorn.on_starting(server=None)
+    assert _arquivos(tmp_path) == []
+
+    worker = types.SimpleNamespace(pid=_pid_encerrado())
+    _gravar(tmp_path, worker.pid, requisicoes=4)
+    config_gunicorn.child_exit(server=None, worker=worker)
+
+    assert _arquivos(tmp_path) == ['metricas_consolidado.db']
+    assert _totais(tmp_path) == {'requisicoes': 4}
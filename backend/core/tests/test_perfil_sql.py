@@ -0,0 +1,98 @@
+"""
+Profiler de SQL: limiar de consulta lenta e totais isolados por requisição
+"""
+
+import logging
+import time
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from core.middlewares.sql_profiler import SqlProfilerMiddleware
+from core.perfil.sql import ProfilerConsultas, obter_perfil
+
+User = get_user_model()
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def lentas(caplog):
+    caplog.set_level(logging.WARNING, logger='core.sql')
+    return lambda: [registro for registro in caplog.records if registro.getMessage().startswith('SLOW_QUERY')]
+
+
+def _execute_lento(milissegundos):
+    def execute(sql, params, many, context):
+        time.sleep(milissegundos / 1000)
+    return execute
+
+
+@pytest.mark.parametrize('limiar_ms, registradas', [(10, 1), (200, 0)])
+def test_slow_db_threshold_ms_define_a_consulta_lenta(settings, lentas, limiar_ms, registradas):
+    settings.SLOW_DB_THRESHOLD_MS = limiar_ms
+    profiler = ProfilerConsultas('default')
+
+    profiler(_execute_lento(30), 'SELECT 1 FROM auth_user WHERE id = 7', (), False, {'connection': connection})
+
+    assert len(lentas()) == registradas
+    if registradas:
+        assert lentas()[0].limiar_ms == limiar_ms
+        assert lentas()[0].fingerprint == 'SELECT ? FROM auth_user WHERE id = ?'
+
+
+def test_profiler_instalado_na_conexao_registra_consultas_lentas(settings, lentas):
+    settings.SLOW_DB_THRESHOLD_MS = 0
+
+    with connection.execute_wrapper(ProfilerConsultas('default')):
+        User.objects.filter(username='ninguem').exists()
+
+    assert [registro.banco for registro in lentas()] == ['default']
+
+
+@pytest.fixture
+def middleware(settings):
+    settings.SQL_PROFILER = {**settings.SQL_PROFILER, 'HEADERS': True}
+    perfis = []
+
+    def view(request):
+        perfis.append(obter_perfil())
+        for _ in range(int(request.GET['consultas'])):
+            User.objects.filter(username='ninguem').exists()
+        return HttpResponse()
+
+    return SqlProfilerMiddleware(view), perfis
+
+
+def test_totais_recomecam_a_cada_requisicao(middleware):
+    middleware, perfis = middleware
+
+    primeira = middleware(RequestFactory().get('/', {'consultas': 3}))
+    segunda = middleware(RequestFactory().get('/', {'consultas': 2}))
+
+    assert primeira['X-DB-Queries'] == '3'
+    assert segunda['X-DB-Queries'] == '2'
+    assert perfis[0] is not perfis[1]
+    assert obter_perfil() is None
+
+
+def test_requisicao_sem_consultas_nao_recebe_headers(middleware):
+    middleware, _ = middleware
+
+    resposta = middleware(RequestFactory().get('/', {'consultas': 0}))
+
+    assert not resposta.has_header('X-DB-Queries')
+
+
+def test_consultas_repetidas_contam_como_n_mais_um(middleware, settings, caplog):
+    settings.SQL_PROFILER = {**settings.SQL_PROFILER, 'HEADERS': True, 'N_MAIS_UM_LIMIAR': 3}
+    middleware = SqlProfilerMiddleware(middleware[0].get_response)
+    caplog.set_level(logging.WARNING, logger='core.sql')
+
+    resposta = middleware(RequestFactory().get('/', {'consultas': 4}))
+
+    assert resposta['X-DB-Repetidas'] == '4'
+    assert any(registro.getMessage().startswith('N_PLUS_ONE') for registro in caplog.records)
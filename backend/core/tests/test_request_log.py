@@ -0,0 +1,132 @@
+"""
+Log de requisições: bytes reais das respostas streaming e amostragem por rota
+"""
+
+import logging
+import types
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory
+
+from core.middlewares import request_log
+from core.middlewares.request_log import RequestLogMiddleware, obter_contadores
+
+ROTA = '<nao_resolvida>'
+
+
+@pytest.fixture
+def registros(caplog):
+    caplog.set_level(logging.INFO, logger='requests')
+    return lambda: [registro for registro in caplog.records if registro.name == 'requests']
+
+
+@pytest.fixture
+def sorteios(monkeypatch):
+    """Valores devolvidos por random.random() na decisão de amostragem"""
+    valores = []
+    monkeypatch.setattr(request_log, 'random', types.SimpleNamespace(random=lambda: valores.pop(0)))
+    return valores
+
+
+def _contadores():
+    return dict(obter_contadores().get(ROTA, {'requisicoes': 0, 'bytes': 0, 'logadas': 0, '5xx': 0}))
+
+
+def _diferenca(antes):
+    depois = _contadores()
+    return {chave: depois[chave] - antes.get(chave, 0) for chave in ('requisicoes', 'bytes', 'logadas', '5xx')}
+
+
+def test_streaming_registra_os_bytes_enviados_ao_terminar(registros):
+    antes = _contadores()
+    middleware = RequestLogMiddleware(lambda request: StreamingHttpResponse(iter([b'abc', b'de', b''])))
+    resposta = middleware(RequestFactory().get('/arquivo/'))
+
+    assert registros() == []  # nada enviado ainda
+    assert b''.join(resposta.streaming_content) == b'abcde'
+
+    [registro] = registros()
+    assert registro.content_length == 5
+    assert _diferenca(antes)['bytes'] == 5
+
+
+@pytest.mark.django_db  # close() dispara request_finished (close_old_connections)
+def test_streaming_interrompido_registra_o_que_foi_enviado(registros):
+    middleware = RequestLogMiddleware(lambda request: StreamingHttpResponse(iter([b'abc', b'de'])))
+    resposta = middleware(RequestFactory().get('/arquivo/'))
+
+    iterador = iter(resposta.streaming_content)
+    next(iterador)
+    resposta.close()  # cliente desconectou
+
+    assert [registro.content_length for registro in registros()] == [3]
+
+
+def test_streaming_async_conta_os_bytes(registros):
+    async def partes():
+        for parte in (b'um', b'dois'):
+            yield parte
+
+    async def view(request):
+        return StreamingHttpResponse(partes())
+
+    async def consumir():
+        resposta = await RequestLogMiddleware(view)(RequestFactory().get('/arquivo/'))
+        return b''.join([parte async for parte in resposta.streaming_content])
+
+    assert async_to_sync(consumir)() == b'umdois'
+    assert [registro.content_length for registro in registros()] == [6]
+
+
+def test_content_length_declarado_nao_envolve_o_streaming(registros):
+    resposta = StreamingHttpResponse(iter([b'abc']))
+    resposta['Content-Length'] = '3'
+
+    RequestLogMiddleware(lambda request: resposta)(RequestFactory().get('/arquivo/'))
+
+    # Registrado na hora, antes de o corpo ser enviado
+    assert [registro.content_length for registro in registros()] == [3]
+
+
+def test_amostragem_respeita_a_taxa_da_rota(settings, registros, sorteios):
+    settings.REQUEST_LOG = {**settings.REQUEST_LOG, 'AMOSTRAGEM': {'/amostrada/': 0.25}}
+    sorteios.extend([0.1, 0.3, 0.9, 0.24, 0.25])
+    middleware = RequestLogMiddleware(lambda request: HttpResponse('ok'))
+    antes = _contadores()
+
+    for _ in range(5):
+        middleware(RequestFactory().get('/amostrada/'))
+
+    assert len(registros()) == 2
+    assert _diferenca(antes) == {'requisicoes': 5, 'bytes': 10, 'logadas': 2, '5xx': 0}
+
+
+def test_erros_sempre_registrados(settings, registros, sorteios):
+    settings.REQUEST_LOG = {**settings.REQUEST_LOG, 'AMOSTRAGEM': {'/amostrada/': 0.0}}
+    sorteios.extend([0.5])
+
+    RequestLogMiddleware(lambda request: HttpResponse('ok'))(RequestFactory().get('/amostrada/'))
+    RequestLogMiddleware(lambda request: HttpResponse(status=503))(RequestFactory().get('/amostrada/'))
+
+    middleware = RequestLogMiddleware(lambda request: HttpResponse(status=500))
+    request = RequestFactory().get('/amostrada/')
+    middleware.process_exception(request, RuntimeError('falhou'))
+    middleware(request)
+
+    assert [registro.levelname for registro in registros()] == ['ERROR', 'ERROR']
+    assert registros()[1].exception_type == 'RuntimeError'
+    # Os erros não passam pelo sorteio
+    assert sorteios == []
+
+
+def test_proporcao_logada_proxima_da_taxa(settings, registros):
+    settings.REQUEST_LOG = {**settings.REQUEST_LOG, 'AMOSTRAGEM': {'/amostrada/': 0.1}}
+    middleware = RequestLogMiddleware(lambda request: HttpResponse('ok'))
+
+    for _ in range(2000):
+        middleware(RequestFactory().get('/amostrada/'))
+
+    # Média 200, desvio ~13: a faixa só falha com um sorteio muito improvável
+    assert 120 < len(registros()) < 280
@@ -0,0 +1,103 @@
+"""
+Registro de metadados das rotas montado a partir do URL resolver
+"""
+
+import logging
+
+import pytest
+from django.test import RequestFactory
+from django.urls import resolve
+
+from core.erros.handlers import _is_api_request
+from core.middlewares.exception_log import GlobalExceptionLogMiddleware
+from core.rotas.registro import metadados_rotas, obter_metadados
+
+
+@pytest.fixture(autouse=True)
+def registro_novo():
+    from core.rotas import registro
+    registro.limpar_registro()
+    yield
+    registro.limpar_registro()
+
+
+def _requisicao(path):
+    request = RequestFactory().get(path)
+    request.resolver_match = resolve(path)
+    return request
+
+
+def test_route_coincide_com_o_do_resolver():
+    for path in ('/api/usuarios/auth/login/custom/', '/api/usuarios/diretorio/', '/api/usuarios/auth/user/'):
+        assert resolve(path).route in metadados_rotas()
+
+
+def test_metadados_de_view_drf_do_app():
+    metadados = obter_metadados(_requisicao('/api/usuarios/auth/login/custom/'))
+
+    assert metadados.nome == 'usuarios:custom_login'
+    assert metadados.api is True
+    assert metadados.logger == 'apps.usuarios'
+    assert metadados.autenticacao is False
+    assert metadados.amostragem == 1.0
+
+
+def test_view_de_terceiros_usa_o_logger_do_app_que_a_inclui():
+    metadados = obter_metadados(_requisicao('/api/usuarios/auth/user/'))
+
+    assert metadados.nome == 'usuarios:rest_user_details'
+    assert metadados.logger == 'apps.usuarios'
+    assert metadados.autenticacao is True
+
+
+def test_view_fora_do_drf():
+    metadados = obter_metadados(_requisicao('/admin/'))
+
+    assert metadados.api is False
+    assert metadados.autenticacao is None
+    assert metadados.logger == 'django.admin'
+
+
+def test_amostragem_por_nome_e_por_prefixo(settings):
+    settings.REQUEST_LOG = {
+        **settings.REQUEST_LOG,
+        'AMOSTRAGEM': {'usuarios:custom_login': 0.5, '/api/usuarios/diretorio/': 0.1},
+    }
+
+    assert obter_metadados(_requisicao('/api/usuarios/auth/login/custom/')).amostragem == 0.5
+    assert obter_metadados(_requisicao('/api/usuarios/diretorio/')).amostragem == 0.1
+
+
+def test_sem_resolucao_nao_ha_metadados():
+    assert obter_metadados(RequestFactory().get('/inexistente/')) is None
+
+
+def test_registro_montado_uma_vez_por_processo():
+    assert metadados_rotas() is metadados_rotas()
+
+
+# Benchmark: consultas do caminho de exceção (handler do DRF e middleware de log).
+# Mediana em torno de 2µs; com 10k rotas a mais o custo não muda (dict por route)
+LIMITE_CAMINHO_EXCECAO_US = 50
+ROTAS_EXTRAS = 10_000
+
+
+@pytest.mark.benchmark
+def test_caminho_de_excecao_em_tempo_constante(mediana_us):
+    request = _requisicao('/api/usuarios/diretorio/')
+    middleware = GlobalExceptionLogMiddleware(lambda request: None)
+
+    def caminho_de_excecao():
+        return _is_api_request(request), middleware._get_logger(request)
+
+    assert caminho_de_excecao() == (True, logging.getLogger('apps.usuarios'))
+    poucas_rotas = mediana_us(caminho_de_excecao, repeticoes=2000)
+
+    registro = metadados_rotas()
+    metadados = obter_metadados(request)
+    registro.update({f'api/extra/{indice}/': metadados for indice in range(ROTAS_EXTRAS)})
+    muitas_rotas = mediana_us(caminho_de_excecao, repeticoes=2000)
+
+    # Uma varredura linear de 10k prefixos leva mais de 1ms
+    assert poucas_rotas < LIMITE_CAMINHO_EXCECAO_US
+    assert muitas_rotas < LIMITE_CAMINHO_EXCECAO_US
@@ -0,0 +1,46 @@
+"""
+Readiness (/readyz/): status por dependência, sem detalhes das falhas na resposta
+"""
+
+import logging
+
+import pytest
+from django.db import OperationalError
+from django.test import Client
+
+from core.saude import verificacoes
+
+
+@pytest.fixture(autouse=True)
+def sem_resultado_em_cache(monkeypatch):
+    monkeypatch.setattr(verificacoes, '_ultimo', None)
+
+
+@pytest.mark.django_db
+def test_dependencias_ok(settings):
+    resposta = Client().get(settings.READINESS_CHECK_URL)
+
+    assert resposta.status_code == 200
+    assert resposta['Cache-Control'] == 'no-store'
+    assert resposta.json()['status'] == 'ok'
+    assert all(item == {'ok': True} for item in resposta.json()['dependencias'].values())
+
+
+def test_falha_responde_503_sem_expor_a_mensagem(settings, monkeypatch, caplog):
+    def banco_fora(alias):
+        raise OperationalError('could not connect to server: host=db-interno.local password=segredo')
+
+    monkeypatch.setattr(verificacoes, '_verificar_banco', banco_fora)
+    caplog.set_level(logging.WARNING, logger='core.saude.verificacoes')
+
+    resposta = Client().get(settings.READINESS_CHECK_URL)
+
+    assert resposta.status_code == 503
+    corpo = resposta.content.decode()
+    assert 'db-interno' not in corpo and 'segredo' not in corpo
+    assert resposta.json()['dependencias']['db:default'] == {'ok': False}
+    assert resposta.json()['dependencias']['cache:default'] == {'ok': True}
+    # O detalhe fica no log do servidor
+    [registro] = [registro for registro in caplog.records if registro.name == 'core.saude.verificacoes']
+    assert "'db:default'" in registro.getMessage()
+    assert 'db-interno' in str(registro.exc_info[1])
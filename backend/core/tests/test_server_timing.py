@@ -0,0 +1,46 @@
+"""
+Header Server-Timing com as fases da requisição (auth, db, render)
+"""
+
+import re
+
+import pytest
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+pytestmark = pytest.mark.django_db
+
+URL_PERFIL = reverse('usuarios:user_profile')
+
+
+@pytest.fixture
+def cliente_autenticado(api_client, usuario):
+    api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(usuario)}')
+    return api_client
+
+
+def _fases(header):
+    return {parte.split(';')[0]: parte for parte in (parte.strip() for parte in header.split(','))}
+
+
+def test_header_com_as_fases_da_requisicao(settings, cliente_autenticado):
+    settings.DEBUG = True
+
+    resposta = cliente_autenticado.get(URL_PERFIL)
+
+    fases = _fases(resposta['Server-Timing'])
+    assert {'auth', 'db', 'render', 'total'} <= fases.keys()
+    assert re.fullmatch(r'db;dur=\d+\.\d{2};desc="\d+ consultas?"', fases['db'])
+    assert re.fullmatch(r'auth;dur=\d+\.\d{2}', fases['auth'])
+
+
+def test_header_apenas_para_staff_fora_do_debug(settings, cliente_autenticado, usuario,
+                                                django_capture_on_commit_callbacks):
+    settings.DEBUG = False
+    assert not cliente_autenticado.get(URL_PERFIL).has_header('Server-Timing')
+
+    with django_capture_on_commit_callbacks(execute=True):
+        usuario.is_staff = True
+        usuario.save()
+
+    assert 'render' in _fases(cliente_autenticado.get(URL_PERFIL)['Server-Timing'])
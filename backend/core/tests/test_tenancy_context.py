@@ -0,0 +1,123 @@
+"""
+Contexto da requisição em contextvars: isolamento entre coroutines, threads e executores
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from asgiref.sync import async_to_sync, sync_to_async
+from django.http import HttpResponse
+from django.test import AsyncRequestFactory, RequestFactory
+
+from core.middlewares.request_context import RequestContextMiddleware
+from core.tenancy.context import (
+    get_current_tenant,
+    get_current_user,
+    get_request_id,
+    reset_context,
+    set_current_tenant,
+    set_current_user,
+    set_request_id,
+    submit_with_context,
+)
+
+
+@pytest.fixture(autouse=True)
+def contexto_limpo():
+    reset_context()
+    yield
+    reset_context()
+
+
+def test_milhares_de_tarefas_intercaladas_nao_se_misturam():
+    async def requisicao(numero):
+        set_request_id(f'req-{numero}')
+        set_current_tenant(numero)
+        await asyncio.sleep(0)  # cede o loop para as outras tarefas
+        lido_no_loop = (get_request_id(), get_current_tenant())
+        lido_na_thread = await sync_to_async(lambda: (get_request_id(), get_current_tenant()))()
+        await asyncio.sleep(0)
+        return lido_no_loop, lido_na_thread, (get_request_id(), get_current_tenant())
+
+    async def principal():
+        return await asyncio.gather(*(requisicao(numero) for numero in range(2000)))
+
+    resultados = async_to_sync(principal)()
+
+    for numero, leituras in enumerate(resultados):
+        assert set(leituras) == {(f'req-{numero}', numero)}
+    assert get_request_id() is None
+
+
+def test_threads_tem_contexto_proprio():
+    barreira = threading.Barrier(8)
+    lidos = {}
+
+    def requisicao(numero):
+        set_current_user(f'usuario-{numero}')
+        barreira.wait()
+        lidos[numero] = get_current_user()
+
+    threads = [threading.Thread(target=requisicao, args=(numero,)) for numero in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert lidos == {numero: f'usuario-{numero}' for numero in range(8)}
+    assert get_current_user() is None
+
+
+def test_submit_with_context_propaga_para_o_executor():
+    set_request_id('req-executor')
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        com_contexto = submit_with_context(executor, get_request_id).result()
+        sem_contexto = executor.submit(get_request_id).result()
+
+    assert com_contexto == 'req-executor'
+    assert sem_contexto is None
+
+
+def test_alteracao_na_thread_do_executor_nao_vaza_para_a_chamadora():
+    set_current_tenant('original')
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        submit_with_context(executor, set_current_tenant, 'alterado').result()
+
+    assert get_current_tenant() == 'original'
+
+
+def test_middleware_sync_limpa_o_contexto_apos_a_requisicao():
+    vistos = []
+
+    def view(request):
+        vistos.append(get_request_id())
+        return HttpResponse()
+
+    resposta = RequestContextMiddleware(view)(RequestFactory().get('/'))
+
+    assert vistos == [resposta['X-Request-ID']]
+    assert get_request_id() is None
+
+
+def test_middleware_async_isola_requisicoes_concorrentes():
+    async def view(request):
+        await asyncio.sleep(0)
+        return HttpResponse(get_request_id())
+
+    middleware = RequestContextMiddleware(view)
+    ids = [f'00000000-0000-4000-8000-{numero:012d}' for numero in range(200)]
+
+    async def principal():
+        fabrica = AsyncRequestFactory()
+        return await asyncio.gather(*(
+            middleware(fabrica.get('/', headers={'X-Request-ID': request_id})) for request_id in ids
+        ))
+
+    respostas = async_to_sync(principal)()
+
+    assert [resposta.content.decode() for resposta in respostas] == ids
+    assert [resposta['X-Request-ID'] for resposta in respostas] == ids
@@ -0,0 +1,129 @@
+"""
+Throttles de janela deslizante: contabilidade das cotas por IP, email e global
+"""
+
+import threading
+import types
+
+import pytest
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory
+from rest_framework.views import APIView
+
+from core.throttling import throttles
+from core.throttling.throttles import AUTH_THROTTLE_CLASSES, SlidingWindowThrottle
+
+INICIO_JANELA = 600_000 * 60.0
+
+
+class ViewLimitada(APIView):
+    authentication_classes = []
+    permission_classes = []
+    throttle_classes = AUTH_THROTTLE_CLASSES
+    throttle_scope = 'auth'
+
+    def post(self, request):
+        return Response({'ok': True})
+
+
+@pytest.fixture(autouse=True)
+def taxas(settings):
+    settings.REST_FRAMEWORK = {
+        **settings.REST_FRAMEWORK,
+        'DEFAULT_THROTTLE_RATES': {'auth_ip': '3/min', 'auth_email': '2/min', 'auth_global': '5/min'},
+    }
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    """Relógio fixo no início de uma janela de 1 minuto"""
+    relogio = types.SimpleNamespace(agora=INICIO_JANELA + 1)
+    monkeypatch.setattr(throttles, 'time', types.SimpleNamespace(time=lambda: relogio.agora))
+    return relogio
+
+
+def _post(ip, email=None):
+    dados = {'email': email} if email else {}
+    request = APIRequestFactory().post('/', dados, format='json', REMOTE_ADDR=ip)
+    return ViewLimitada.as_view()(request)
+
+
+def _contador(sufixo, identificador):
+    janela = int(INICIO_JANELA // 60)
+    return throttles.default_cache.get(f'throttle:auth{sufixo}:{identificador}:{janela}')
+
+
+def test_base_e_abstrata():
+    with pytest.raises(TypeError):
+        SlidingWindowThrottle()
+
+
+def test_limite_por_ip_responde_429_com_retry_after(relogio):
+    codigos = [_post('10.0.0.1').status_code for _ in range(4)]
+
+    assert codigos == [200, 200, 200, 429]
+    assert int(_post('10.0.0.1')['Retry-After']) >= 1
+
+
+def test_requisicao_recusada_nao_e_contada(relogio):
+    for _ in range(10):
+        _post('10.0.0.1')
+
+    assert _contador('_ip', '10.0.0.1') == 3
+    assert _contador('_global', 'global') == 3
+
+
+def test_rajada_de_um_ip_nao_esgota_a_cota_global(relogio):
+    for _ in range(50):
+        _post('10.0.0.1')
+
+    assert _post('10.0.0.2').status_code == 200
+    assert _post('10.0.0.3').status_code == 200
+    # A cota global (5) acabou com as requisições aceitas, não com as recusadas
+    assert _post('10.0.0.4').status_code == 429
+
+
+def test_recusa_por_email_nao_consome_a_cota_global(relogio):
+    codigos = [_post(f'10.0.1.{i}', 'maria@exemplo.com').status_code for i in range(4)]
+
+    assert codigos == [200, 200, 429, 429]
+    assert _contador('_global', 'global') == 2
+
+
+def test_janela_anterior_pesa_na_estimativa(relogio):
+    for _ in range(3):
+        _post('10.0.0.1')
+
+    relogio.agora += 60  # início da janela seguinte: anterior pesa ~100%
+    assert _post('10.0.0.1').status_code == 429
+
+    relogio.agora += 40  # 2/3 da janela: anterior pesa ~1/3
+    assert _post('10.0.0.1').status_code == 200
+
+
+def test_recusa_por_email_devolve_a_cota_do_ip(relogio):
+    codigos = [_post('10.0.0.1', 'maria@exemplo.com').status_code for _ in range(3)]
+
+    assert codigos == [200, 200, 429]
+    assert _contador('_ip', '10.0.0.1') == 2
+    assert _post('10.0.0.1', 'joana@exemplo.com').status_code == 200
+
+
+def test_requisicoes_concorrentes_respeitam_o_limite(relogio):
+    barreira = threading.Barrier(20)
+    codigos = []
+
+    def requisitar(numero):
+        barreira.wait()
+        codigos.append(_post(f'10.0.2.{numero}', 'maria@exemplo.com').status_code)
+
+    threads = [threading.Thread(target=requisitar, args=(numero,)) for numero in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(codigos) == [200] * 2 + [429] * 18
+    assert _contador('_email', throttles.EmailSlidingWindowThrottle().get_identificador(
+        types.SimpleNamespace(data={'email': 'maria@exemplo.com'}))) == 2
+    assert _contador('_global', 'global') == 2
@@ -0,0 +1,154 @@
+"""
+Throttling por janela deslizante com contadores atômicos no cache
+Usado nos endpoints que disparam hashing de senha ou envio de email
+"""
+
+import hashlib
+import math
+import time
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from django.core.cache import cache as default_cache
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+_DURACOES = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+class SlidingWindowThrottle(BaseThrottle, ABC):
+    """
+    Aproximação de janela deslizante com dois contadores de janela fixa:
+    estimado = anterior * (fração restante da janela anterior) + atual
+
+    Cada verificação custa um `add` + `incr` e um `get` no cache, sem consultas
+    ao banco. A decisão usa o valor devolvido pelo `incr`: requisições
+    concorrentes recebem contagens distintas e só as que cabem no limite passam;
+    a recusada desfaz o próprio incremento com `decr`. O escopo vem de
+    `view.throttle_scope` somado ao `sufixo` da classe (ex.: 'auth' + '_ip' -> taxa 'auth_ip').
+
+    O DRF consulta todos os throttles da view mesmo depois de uma recusa; quando
+    um throttle anterior já recusou a requisição, os seguintes não a contam, e a
+    recusa desfaz os incrementos dos throttles que já a tinham aceitado (uma
+    rajada barrada por email não consome a cota do IP nem a global).
+    """
+    cache = default_cache
+    sufixo = None
+    prefixo_chave = 'throttle'
+
+    def __init__(self):
+        self.espera = None
+
+    @abstractmethod
+    def get_identificador(self, request) -> Optional[str]:
+        """Identificador do cliente/alvo; None desativa a verificação"""
+
+    def get_taxa(self, view) -> Optional[str]:
+        escopo = getattr(view, 'throttle_scope', None)
+        if not escopo:
+            return None
+        return api_settings.DEFAULT_THROTTLE_RATES.get(f"{escopo}{self.sufixo}")
+
+    def parse_taxa(self, taxa: str):
+        """Converte '10/min' em (10, 60)"""
+        num, periodo = taxa.split('/')
+        return int(num), _DURACOES[periodo[0]]
+
+    def allow_request(self, request, view):
+        if getattr(request, '_throttle_recusado', False):
+            return True
+
+        taxa = self.get_taxa(view)
+        if taxa is None:
+            return True
+
+        identificador = self.get_identificador(request)
+        if identificador is None:
+            return True
+
+        limite, duracao = self.parse_taxa(taxa)
+        agora = time.time()
+        janela = int(agora // duracao)
+        decorrido = agora - janela * duracao
+
+        base = f"{self.prefixo_chave}:{view.throttle_scope}{self.sufixo}:{identificador}"
+        chave_atual = f"{base}:{janela}"
+        chave_anterior = f"{base}:{janela - 1}"
+
+        # Contagem atômica: add cria a chave se não existir, incr é atômico no cache
+        self.cache.add(chave_atual, 0, duracao * 2)
+        try:
+            atual = self.cache.incr(chave_atual)
+        except ValueError:
+            # Chave expirou entre o add e o incr
+            self.cache.set(chave_atual, 1, duracao * 2)
+            atual = 1
+        anterior = self.cache.get(chave_anterior, 0)
+
+        peso_anterior = 1 - decorrido / duracao
+        if anterior * peso_anterior + atual > limite:
+            self.espera = self._calcular_espera(limite, duracao, decorrido, atual, anterior)
+            request._throttle_recusado = True
+            # Desfaz este incremento e os dos throttles que já tinham aceitado
+            for cache, chave in [*getattr(request, '_throttle_contados', []), (self.cache, chave_atual)]:
+                self._desfazer(cache, chave)
+            request._throttle_contados = []
+            return False
+
+        request._throttle_contados = [*getattr(request, '_throttle_contados', []), (self.cache, chave_atual)]
+        return True
+
+    @staticmethod
+    def _desfazer(cache, chave):
+        try:
+            cache.decr(chave)
+        except ValueError:
+            # Chave já expirou: não há o que desfazer
+            pass
+
+    def _calcular_espera(self, limite, duracao, decorrido, atual, anterior) -> float:
+        """Segundos até a estimativa voltar para dentro do limite"""
+        if atual >= limite or not anterior:
+            return duracao - decorrido
+        return max(1.0, duracao * (1 - (limite - atual) / anterior) - decorrido)
+
+    def wait(self):
+        if self.espera is None:
+            return None
+        return math.ceil(self.espera)
+
+
+class IPSlidingWindowThrottle(SlidingWindowThrottle):
+    """Limita por endereço IP do cliente (taxa '<escopo>_ip')"""
+    sufixo = '_ip'
+
+    def get_identificador(self, request):
+        return self.get_ident(request)
+
+
+class EmailSlidingWindowThrottle(SlidingWindowThrottle):
+    """Limita por email alvo informado no corpo da requisição (taxa '<escopo>_email')"""
+    sufixo = '_email'
+
+    def get_identificador(self, request):
+        dados = getattr(request, 'data', None)
+        email = dados.get('email') if hasattr(dados, 'get') else None
+        if not email or not isinstance(email, str):
+            return None
+        # Hash evita caracteres inválidos em chaves de cache (ex.: memcached)
+        return hashlib.sha256(email.strip().lower().encode()).hexdigest()[:32]
+
+
+class GlobalSlidingWindowThrottle(SlidingWindowThrottle):
+    """Limite global do endpoint, somando todos os clientes (taxa '<escopo>_global')"""
+    sufixo = '_global'
+
+    def get_identificador(self, request):
+        return 'global'
+
+
+AUTH_THROTTLE_CLASSES = [
+    IPSlidingWindowThrottle,
+    EmailSlidingWindowThrottle,
+    GlobalSlidingWindowThrottle,
+]
@@ -0,0 +1,37 @@
+"""
+Configuração do gunicorn (lida automaticamente quando iniciado a partir de backend/)
+
+    gunicorn configurations.wsgi
+    gunicorn configurations.asgi -k uvicorn.workers.UvicornWorker
+
+Os hooks mantêm o diretório de métricas (METRICAS_DIR, core.metricas) limpo:
+arquivos de execuções anteriores são removidos ao subir o servidor e o arquivo
+de cada worker encerrado é somado ao consolidado.
+"""
+
+import os
+
+from decouple import config
+
+from core.metricas.armazenamento import consolidar_processo, limpar_diretorio
+
+bind = config('GUNICORN_BIND', default='0.0.0.0:8000')
+workers = config('GUNICORN_WORKERS', default=4, cast=int)
+
+
+def _diretorio_metricas() -> str:
+    # Mesma variável lida por METRICAS['DIRETORIO'] nos settings
+    return config('METRICAS_DIR', default='')
+
+
+def on_starting(server):
+    diretorio = _diretorio_metricas()
+    if diretorio:
+        os.makedirs(diretorio, exist_ok=True)
+        limpar_diretorio(diretorio)
+
+
+def child_exit(server, worker):
+    diretorio = _diretorio_metricas()
+    if diretorio:
+        consolidar_processo(diretorio, worker.pid)
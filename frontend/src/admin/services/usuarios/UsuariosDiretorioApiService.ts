@@ -0,0 +1,107 @@
+/**
+ * Serviço do diretório de usuários
+ * Consome /usuarios/diretorio/ com paginação por cursor (sem COUNT(*) no servidor)
+ */
+
+import requestConfig from "../../../config/requestConfig";
+
+// ================================
+// TIPOS E INTERFACES
+// ================================
+
+export interface UsuarioDiretorio {
+  pk: number;
+  username: string;
+  email: string;
+  first_name: string;
+  last_name: string;
+  is_staff: boolean;
+  is_active: boolean;
+  date_joined: string;
+  last_login: string | null;
+}
+
+export interface UsuariosDiretorioFiltros {
+  busca?: string;
+  is_active?: boolean;
+  is_staff?: boolean;
+  desde?: string;
+  ate?: string;
+  limite?: number;
+  /** Solicita a estimativa de total do banco (pode ser null fora do PostgreSQL) */
+  incluirTotal?: boolean;
+}
+
+export interface UsuariosDiretorioPagina {
+  results: UsuarioDiretorio[];
+  /** Cursores opacos: repasse-os sem alterar para navegar entre as páginas */
+  nextCursor: string | null;
+  previousCursor: string | null;
+  totalAproximado?: number | null;
+}
+
+interface UsuariosDiretorioResposta {
+  results: UsuarioDiretorio[];
+  next: string | null;
+  previous: string | null;
+  total_aproximado?: number | null;
+}
+
+// ================================
+// SERVIÇO DO DIRETÓRIO DE USUÁRIOS
+// ================================
+
+export class UsuariosDiretorioApiService {
+  /**
+   * Lista uma página de usuários. Sem cursor retorna a primeira página;
+   * um cursor vazio ("") em previousCursor também indica a primeira página.
+   */
+  static async listar(
+    filtros: UsuariosDiretorioFiltros = {},
+    cursor?: string | null
+  ): Promise<UsuariosDiretorioPagina> {
+    const params = new URLSearchParams();
+
+    if (filtros.busca) params.set("busca", filtros.busca);
+    if (filtros.is_active !== undefined)
+      params.set("is_active", String(filtros.is_active));
+    if (filtros.is_staff !== undefined)
+      params.set("is_staff", String(filtros.is_staff));
+    if (filtros.desde) params.set("desde", filtros.desde);
+    if (filtros.ate) params.set("ate", filtros.ate);
+    if (filtros.limite) params.set("limite", String(filtros.limite));
+    if (filtros.incluirTotal) params.set("total", "aproximado");
+    if (cursor) params.set("cursor", cursor);
+
+    const query = params.toString();
+
+    try {
+      const response = await requestConfig.getRaw<UsuariosDiretorioResposta>(
+        `/usuarios/diretorio/${query ? `?${query}` : ""}`,
+        {
+          skipTenant: true,
+        }
+      );
+
+      return {
+        results: response.results,
+        nextCursor: this.extrairCursor(response.next),
+        previousCursor: this.extrairCursor(response.previous),
+        totalAproximado: response.total_aproximado,
+      };
+    } catch (error: any) {
+      console.error("Erro ao listar usuários:", error);
+      throw new Error(error.message || "Erro ao carregar usuários");
+    }
+  }
+
+  /**
+   * Extrai o cursor dos links next/previous retornados pela API
+   */
+  private static extrairCursor(link: string | null): string | null {
+    if (!link) return null;
+    return new URL(link).searchParams.get("cursor") ?? "";
+  }
+}
+
+export default UsuariosDiretorioApiService;